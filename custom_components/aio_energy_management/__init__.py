@@ -10,8 +10,8 @@ import voluptuous as vol
 
 from homeassistant import core
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import SERVICE_RELOAD, Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, SERVICE_RELOAD, Platform
+from homeassistant.core import Event, HomeAssistant, ServiceCall
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.discovery import async_load_platform
@@ -22,39 +22,103 @@ from homeassistant.helpers.reload import (
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
+    CONF_ALLOCATION_MODE,
+    CONF_BATTERY_POLICY,
+    CONF_BATTERY_POWER_SENSOR,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_BATTERY_SOC_TARGET,
+    CONF_BATTERY_SPLIT,
     CONF_BUFFER,
     CONF_CONSUMPTION,
     CONF_ENTITY_CALENDAR,
     CONF_ENTITY_CHEAPEST_HOURS,
     CONF_ENTITY_EXCESS_SOLAR,
+    CONF_EVALUATION_INTERVAL,
     CONF_EXCESS_SOLAR,
+    CONF_EXPORT_LIMIT,
+    CONF_FAST_SHED_THRESHOLD,
+    CONF_FILTER_WINDOW,
+    CONF_FORECAST_ATTRIBUTE,
+    CONF_FORECAST_BASE_LOAD,
+    CONF_FORECAST_ENTITY,
+    CONF_GRID_FILTER,
     CONF_GRID_POWER_SENSOR,
+    CONF_GRID_POWER_SENSOR_L1,
+    CONF_GRID_POWER_SENSOR_L2,
+    CONF_GRID_POWER_SENSOR_L3,
+    CONF_HISTORY,
     CONF_IS_ON_SCHEDULE,
+    CONF_MIN_POWER,
     CONF_MINIMUM_OFF_TIME,
     CONF_MINIMUM_ON_TIME,
+    CONF_MODULATING,
     CONF_NAME,
+    CONF_OFF_DELAY,
+    CONF_OFF_THRESHOLD,
+    CONF_ON_DELAY,
+    CONF_ON_THRESHOLD,
+    CONF_PHASE,
     CONF_POWER_DEVICES,
+    CONF_POWER_STEP,
+    CONF_PRICE_ADJUSTMENT,
+    CONF_PRICE_HIGH,
+    CONF_PRICE_LOW,
+    CONF_PRICE_SOURCE,
     CONF_PRIORITY,
+    CONF_RAMP_RATE,
+    CONF_SHADOW_STRATEGIES,
     CONF_UNIQUE_ID,
     COORDINATOR,
     DOMAIN,
     EXCESS_SOLAR_ENABLED_SWITCHES,
     EXCESS_SOLAR_MANAGER,
+    EXCESS_SOLAR_SETPOINT_SENSORS,
+    EXCESS_SOLAR_STATISTIC_SENSORS,
     EXCESS_SOLAR_SWITCH,
     YAML_EXCESS_SOLAR_INSTANCE_KEY,
 )
 from .coordinator import EnergyManagementCoordinator
 from .excess_solar import (
     ExcessSolarMasterSwitch,
+    ExcessSolarModulatingBinarySensor,
     build_sensors_from_config,
     create_manager_from_config,
 )
+from .excess_solar.allocation import ALLOCATION_INCREMENTAL, ALLOCATION_MODES
+from .excess_solar.battery import (
+    BATTERY_FIRST,
+    BATTERY_POLICIES,
+    DEFAULT_BATTERY_SOC_TARGET,
+    DEFAULT_BATTERY_SPLIT,
+)
+from .excess_solar.filters import (
+    DEFAULT_EVALUATION_INTERVAL,
+    DEFAULT_FILTER_WINDOW,
+    FILTER_LAST,
+    FILTER_TYPES,
+)
+from .excess_solar.forecast import DEFAULT_FORECAST_ATTRIBUTE
+from .excess_solar.modulation import DEFAULT_POWER_STEP, DEFAULT_RAMP_RATE
+from .excess_solar.phases import PHASE_ALL, PHASE_OPTIONS
+from .excess_solar.prices import DEFAULT_PRICE_ADJUSTMENT, DEFAULT_PRICE_LOW
+from .excess_solar.shadow import SHADOW_STRATEGIES
+from .history import HISTORY_DB_FILE, ScheduleHistory
+from .ics import EnergyManagementIcsView
 from .services import async_setup_services
 
 PLATFORMS = [
     Platform.BINARY_SENSOR,
     Platform.CALENDAR,
     Platform.NUMBER,
+    Platform.SENSOR,
+    Platform.SWITCH,
+]
+
+# Platforms of a single excess solar instance
+EXCESS_SOLAR_PLATFORMS = [
+    Platform.BINARY_SENSOR,
+    Platform.NUMBER,
+    Platform.SENSOR,
     Platform.SWITCH,
 ]
 
@@ -77,6 +141,17 @@ POWER_DEVICE_SCHEMA = vol.Schema(
         vol.Optional(CONF_IS_ON_SCHEDULE): cv.entity_id,
         vol.Optional(CONF_MINIMUM_ON_TIME, default=0): cv.positive_int,
         vol.Optional(CONF_MINIMUM_OFF_TIME): cv.positive_int,
+        vol.Optional(CONF_MODULATING, default=False): cv.boolean,
+        vol.Optional(CONF_MIN_POWER, default=0): cv.positive_int,
+        vol.Optional(CONF_POWER_STEP, default=DEFAULT_POWER_STEP): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(CONF_RAMP_RATE, default=DEFAULT_RAMP_RATE): cv.positive_int,
+        vol.Optional(CONF_PHASE, default=PHASE_ALL): vol.In(PHASE_OPTIONS),
+        vol.Optional(CONF_ON_THRESHOLD, default=0): cv.positive_int,
+        vol.Optional(CONF_OFF_THRESHOLD, default=0): cv.positive_int,
+        vol.Optional(CONF_ON_DELAY, default=0): cv.positive_int,
+        vol.Optional(CONF_OFF_DELAY, default=0): cv.positive_int,
     },
     extra=vol.REMOVE_EXTRA,
 )
@@ -84,10 +159,50 @@ POWER_DEVICE_SCHEMA = vol.Schema(
 EXCESS_SOLAR_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_GRID_POWER_SENSOR): cv.entity_id,
+        vol.Optional(CONF_GRID_POWER_SENSOR_L1): cv.entity_id,
+        vol.Optional(CONF_GRID_POWER_SENSOR_L2): cv.entity_id,
+        vol.Optional(CONF_GRID_POWER_SENSOR_L3): cv.entity_id,
         vol.Required(CONF_POWER_DEVICES): vol.All(
             cv.ensure_list, [POWER_DEVICE_SCHEMA]
         ),
         vol.Optional(CONF_BUFFER, default=0): cv.positive_int,
+        vol.Optional(
+            CONF_EVALUATION_INTERVAL, default=DEFAULT_EVALUATION_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(CONF_GRID_FILTER, default=FILTER_LAST): vol.In(FILTER_TYPES),
+        vol.Optional(CONF_FILTER_WINDOW, default=DEFAULT_FILTER_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(CONF_ALLOCATION_MODE, default=ALLOCATION_INCREMENTAL): vol.In(
+            ALLOCATION_MODES
+        ),
+        vol.Optional(CONF_FAST_SHED_THRESHOLD, default=0): cv.positive_int,
+        vol.Optional(CONF_BATTERY_POWER_SENSOR): cv.entity_id,
+        vol.Optional(CONF_BATTERY_SOC_SENSOR): cv.entity_id,
+        vol.Optional(CONF_BATTERY_POLICY, default=BATTERY_FIRST): vol.In(
+            BATTERY_POLICIES
+        ),
+        vol.Optional(
+            CONF_BATTERY_SOC_TARGET, default=DEFAULT_BATTERY_SOC_TARGET
+        ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+        vol.Optional(CONF_BATTERY_SPLIT, default=DEFAULT_BATTERY_SPLIT): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(CONF_FORECAST_ENTITY): cv.entity_id,
+        vol.Optional(
+            CONF_FORECAST_ATTRIBUTE, default=DEFAULT_FORECAST_ATTRIBUTE
+        ): cv.string,
+        vol.Optional(CONF_FORECAST_BASE_LOAD, default=0): cv.positive_int,
+        vol.Optional(CONF_PRICE_SOURCE): cv.string,
+        vol.Optional(CONF_PRICE_LOW, default=DEFAULT_PRICE_LOW): vol.Coerce(float),
+        vol.Optional(CONF_PRICE_HIGH): vol.Coerce(float),
+        vol.Optional(
+            CONF_PRICE_ADJUSTMENT, default=DEFAULT_PRICE_ADJUSTMENT
+        ): cv.positive_int,
+        vol.Optional(CONF_SHADOW_STRATEGIES, default=[]): vol.All(
+            cv.ensure_list, [vol.In(SHADOW_STRATEGIES)]
+        ),
+        vol.Optional(CONF_EXPORT_LIMIT): vol.All(vol.Coerce(float), vol.Range(min=0)),
     },
     extra=vol.REMOVE_EXTRA,
 )
@@ -100,6 +215,7 @@ async def async_setup(hass: core.HomeAssistant, config: ConfigType) -> bool:
         coordinator = EnergyManagementCoordinator(hass)
         await coordinator.async_load_data()
         hass.data[DOMAIN] = {COORDINATOR: coordinator}
+        hass.http.register_view(EnergyManagementIcsView(coordinator))
 
     async def reload_service_handler(service: ServiceCall) -> None:
         """Remove all user-defined groups and load new ones from config."""
@@ -136,6 +252,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         coordinator = EnergyManagementCoordinator(hass)
         await coordinator.async_load_data()
         hass.data[DOMAIN] = {COORDINATOR: coordinator}
+        hass.http.register_view(EnergyManagementIcsView(coordinator))
         # Services
         await async_setup_services(hass)
 
@@ -175,6 +292,14 @@ async def _async_setup_excess_solar_from_entry_data(
     )
     manager.sensors = sensors
     manager.sort_sensors()
+    setpoint_sensors = [
+        s.setpoint_sensor
+        for s in sensors
+        if isinstance(s, ExcessSolarModulatingBinarySensor)
+    ]
+    statistic_sensors = [
+        statistic_sensor for s in sensors for statistic_sensor in s.statistic_sensors
+    ]
 
     master_switch = ExcessSolarMasterSwitch(
         manager=manager,
@@ -187,6 +312,8 @@ async def _async_setup_excess_solar_from_entry_data(
         "excess_solar_sensors": sensors,
         "excess_solar_number_entities": number_entities,
         EXCESS_SOLAR_ENABLED_SWITCHES: enabled_switches,
+        EXCESS_SOLAR_SETPOINT_SENSORS: setpoint_sensors,
+        EXCESS_SOLAR_STATISTIC_SENSORS: statistic_sensors,
         EXCESS_SOLAR_SWITCH: master_switch,
     }
 
@@ -202,9 +329,7 @@ async def _async_setup_excess_solar_entry(
         master_switch_unique_id=f"excess_solar_master_switch_{entry.entry_id}",
     )
 
-    await hass.config_entries.async_forward_entry_setups(
-        entry, [Platform.BINARY_SENSOR, Platform.NUMBER, Platform.SWITCH]
-    )
+    await hass.config_entries.async_forward_entry_setups(entry, EXCESS_SOLAR_PLATFORMS)
     manager = hass.data[DOMAIN][entry.entry_id][EXCESS_SOLAR_MANAGER]
     await manager.async_start()
     _LOGGER.info(
@@ -232,7 +357,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if manager is not None:
             await manager.async_stop()
         unload_ok = await hass.config_entries.async_unload_platforms(
-            entry, [Platform.BINARY_SENSOR, Platform.NUMBER, Platform.SWITCH]
+            entry, EXCESS_SOLAR_PLATFORMS
         )
     else:
         unload_ok = True
@@ -256,6 +381,10 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
 
 async def _async_process_config(hass: HomeAssistant, config: dict) -> bool:
     """Process YAML configuration (legacy support)."""
+    # Long-term schedule history
+    if config[DOMAIN].get(CONF_HISTORY):
+        await _async_setup_history(hass)
+
     # Cheapest hours
     if cheapest_hours_entries := config[DOMAIN].get(CONF_ENTITY_CHEAPEST_HOURS):
         for entry in cheapest_hours_entries:
@@ -286,11 +415,7 @@ async def _async_process_config(hass: HomeAssistant, config: dict) -> bool:
                 master_switch_unique_id="excess_solar_master_switch",
             )
 
-            for platform in (
-                Platform.BINARY_SENSOR,
-                Platform.NUMBER,
-                Platform.SWITCH,
-            ):
+            for platform in EXCESS_SOLAR_PLATFORMS:
                 hass.async_create_task(
                     async_load_platform(hass, platform, DOMAIN, excess_entry, config)
                 )
@@ -317,6 +442,22 @@ async def _async_process_config(hass: HomeAssistant, config: dict) -> bool:
     return True
 
 
+async def _async_setup_history(hass: HomeAssistant) -> None:
+    """Enable the SQLite schedule history on the coordinator."""
+    coordinator = hass.data[DOMAIN][COORDINATOR]
+    if coordinator.history is not None:
+        return
+
+    history = ScheduleHistory(hass, hass.config.path(HISTORY_DB_FILE))
+    await history.async_setup()
+    coordinator.history = history
+
+    async def _async_close_history(event: Event) -> None:
+        await history.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_history)
+
+
 async def _async_stop_excess_solar(hass: HomeAssistant) -> None:
     """Stop and remove the excess solar manager if running."""
     if DOMAIN not in hass.data:
@@ -336,4 +477,6 @@ async def _async_stop_excess_solar(hass: HomeAssistant) -> None:
     domain_data.pop("excess_solar_sensors", None)
     domain_data.pop("excess_solar_number_entities", None)
     domain_data.pop(EXCESS_SOLAR_ENABLED_SWITCHES, None)
+    domain_data.pop(EXCESS_SOLAR_SETPOINT_SENSORS, None)
+    domain_data.pop(EXCESS_SOLAR_STATISTIC_SENSORS, None)
     domain_data.pop(EXCESS_SOLAR_SWITCH, None)
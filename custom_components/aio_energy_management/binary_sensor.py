@@ -112,7 +112,7 @@ async def async_setup_entry(
         return
 
     try:
-        entity = _create_cheapest_hours_entity(hass, entry.data)
+        entity = create_cheapest_hours_entity(hass, entry.data)
         async_add_entities([entity])
     except Exception as e:
         _LOGGER.error(
@@ -135,7 +135,7 @@ async def async_setup_platform(
     if entry_type == CONF_ENTITY_CHEAPEST_HOURS:
         try:
             CHEAPEST_HOURS_PLATFORM_SCHEMA(discovery_info)
-            entities.append(_create_cheapest_hours_entity(hass, discovery_info))
+            entities.append(create_cheapest_hours_entity(hass, discovery_info))
         except Invalid as e:
             _LOGGER.error(
                 "Configuration validation error for nord pool cheapest hours sensor: %s",
@@ -157,9 +157,10 @@ async def async_setup_platform(
     async_add_entities(entities)
 
 # Cheapest hours
-def _create_cheapest_hours_entity(
+def create_cheapest_hours_entity(
     hass: HomeAssistant, discovery_info: DiscoveryInfoType | None = None
 ) -> CheapestHoursBinarySensor:
+    """Create a cheapest hours entity from entry data or YAML discovery info."""
     nordpool_entity = discovery_info.get(CONF_NORDPOOL_ENTITY)
     nordpool_official_config_entry = discovery_info.get(
         CONF_NORDPOOL_OFFICIAL_CONFIG_ENTRY
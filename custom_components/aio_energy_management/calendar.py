@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
 import logging
 
@@ -10,13 +11,14 @@ from voluptuous import ALLOW_EXTRA, Invalid, Schema
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 import homeassistant.util.dt as dt_util
 
 from .const import CONF_ENTITY_CALENDAR, CONF_NAME, CONF_UNIQUE_ID, COORDINATOR, DOMAIN
 from .coordinator import EnergyManagementCoordinator
+from .helpers import create_event_uid
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -86,9 +88,85 @@ async def async_setup_platform(
             )
 
 
+class CalendarEventIndex:
+    """Events of all entities sorted by start time.
+
+    Events are cached per entity so that a change of one entity does not rebuild
+    the events of the others. Next to the sorted start times a running maximum
+    of the end times is kept. As it never decreases, the first event that has not
+    ended yet can be searched with bisect as well.
+    """
+
+    def __init__(self) -> None:
+        """Init empty index."""
+        self._by_entity: dict[str, list[CalendarEvent]] = {}
+        self._events: list[CalendarEvent] = []  # Sorted by (start, uid)
+        self._starts: list[datetime] = []
+        self._max_ends: list[datetime] = []  # Running maximum of event ends
+
+    @property
+    def events(self) -> list[CalendarEvent]:
+        """Return all events sorted by start time."""
+        return self._events
+
+    def set_entity_events(self, entity_id: str, events: list[CalendarEvent]) -> None:
+        """Replace events of a single entity."""
+        old = self._by_entity.pop(entity_id, [])
+        if events:
+            self._by_entity[entity_id] = events
+
+        if not old and not events:
+            return
+
+        first_changed = len(self._events)
+        if old:
+            old_uids = {event.uid for event in old}
+            first_changed = bisect_left(self._events, _sort_key(old[0]), key=_sort_key)
+            self._events = [
+                event for event in self._events if event.uid not in old_uids
+            ]
+        for event in events:
+            index = bisect_left(self._events, _sort_key(event), key=_sort_key)
+            first_changed = min(first_changed, index)
+            insort(self._events, event, key=_sort_key)
+
+        self._rebuild_from(min(first_changed, len(self._events)))
+
+    def current_or_next(self, now: datetime) -> CalendarEvent | None:
+        """Return the current event or the next upcoming event in O(log n)."""
+        index = bisect_left(self._max_ends, now)
+        if index == len(self._events):
+            return None
+        # All earlier events have ended. This one is either ongoing or, if it has
+        # not started yet, the earliest upcoming one
+        return self._events[index]
+
+    def between(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        """Return events overlapping the given range."""
+        lo = bisect_left(self._max_ends, start)
+        hi = bisect_right(self._starts, end)
+        return [event for event in self._events[lo:hi] if event.end >= start]
+
+    def _rebuild_from(self, index: int) -> None:
+        """Rebuild start times and running maximum of ends from the given index."""
+        del self._starts[index:]
+        del self._max_ends[index:]
+        max_end = self._max_ends[-1] if self._max_ends else None
+        for event in self._events[index:]:
+            self._starts.append(event.start)
+            max_end = event.end if max_end is None else max(max_end, event.end)
+            self._max_ends.append(max_end)
+
+
+def _sort_key(event: CalendarEvent) -> tuple[datetime, str]:
+    return (event.start, event.uid)
+
+
 class EnergyManagementCalendar(CalendarEntity):
     """Calendar entity."""
 
+    _attr_should_poll = False
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -101,25 +179,12 @@ class EnergyManagementCalendar(CalendarEntity):
         self._attr_unique_id = unique_id.replace(" ", "_")
         self._attr_name = name
         self._coordinator = coordinator
-        self._events = []
+        self._index = CalendarEventIndex()
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the current or next upcoming event."""
-        now = dt_util.now()
-
-        # First check for current event
-        for event in self._events:
-            if event.start <= now <= event.end:
-                return event
-
-        # If no current event, find the next upcoming event
-        future_events = [event for event in self._events if event.start > now]
-        if not future_events:
-            return None
-
-        # Return the earliest upcoming event
-        return min(future_events, key=lambda x: x.start)
+        return self._index.current_or_next(dt_util.now())
 
     async def async_get_events(
         self,
@@ -128,79 +193,60 @@ class EnergyManagementCalendar(CalendarEntity):
         end_date: datetime,
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
-        return [
-            event
-            for event in self._events
-            if event.start <= end_date and event.end >= start_date
-        ]
-
-    async def async_update(self) -> None:
-        """Update loop of calendar. Only update when data is changed."""
-        if self._coordinator.requires_calendar_update is True:
-            self._events = self._get_all_events()
-            self._coordinator.requires_calendar_update = False
-
-    def _get_all_events(
-        self,
-    ) -> list[CalendarEvent]:
-        """Get calendar events within a datetime range."""
-        events: list[CalendarEvent] = []
+        return self._index.between(start_date, end_date)
+
+    async def async_added_to_hass(self) -> None:
+        """Build the events and subscribe to coordinator data changes."""
+        await super().async_added_to_hass()
+        for entity_id in self._coordinator.data:
+            self._index.set_entity_events(entity_id, self._get_entity_events(entity_id))
+        self.async_on_remove(
+            self._coordinator.async_add_change_listener(
+                self._async_handle_coordinator_change
+            )
+        )
 
-        for k, v in self._coordinator.data.items():
-            # Don't add to calendar if disabled by config
-            if v.get("calendar") is False:
-                continue
-            # Combine current and archived data
-            combined_data = v.get("list", []) + v.get("archived", [])
-
-            if combined_data:
-                for value in combined_data:
-                    start = value.get("start")
-                    end = value.get("end")
-                    if start is not None and end is not None:
-                        events.append(
-                            CalendarEvent(
-                                summary=v.get("name") or k,
-                                start=start,
-                                end=end,
-                                uid=self._uid(k, start, end),
-                                description="",
-                            )
-                        )
-            if next_data := v.get("next"):
-                if next_list := next_data.get("list", []):
-                    for value in next_list:
-                        start = value.get("start")
-                        end = value.get("end")
-                        if start is not None and end is not None:
-                            events.append(
-                                CalendarEvent(
-                                    summary=v.get("name") or k,
-                                    start=start,
-                                    end=end,
-                                    uid=self._uid(k, start, end),
-                                    description="",
-                                )
-                            )
-
-        # Sort events by start time
-        events.sort(key=lambda x: x.start)
+    @callback
+    def _async_handle_coordinator_change(
+        self, entity_ids: set[str], version: int
+    ) -> None:
+        """Update events of the changed entities."""
+        for entity_id in entity_ids:
+            self._index.set_entity_events(entity_id, self._get_entity_events(entity_id))
+        self.async_write_ha_state()
+
+    def _get_entity_events(self, entity_id: str) -> list[CalendarEvent]:
+        """Get calendar events of a single entity sorted by start time."""
+        v = self._coordinator.data.get(entity_id)
+        # Don't add to calendar if removed or disabled by config
+        if v is None or v.get("calendar") is False:
+            return []
+
+        # Combine current, archived and next data
+        combined_data = v.get("list", []) + v.get("archived", [])
+        if next_data := v.get("next"):
+            combined_data = combined_data + (next_data.get("list") or [])
+
+        events: list[CalendarEvent] = []
+        for value in combined_data:
+            start = value.get("start")
+            end = value.get("end")
+            if start is not None and end is not None:
+                events.append(
+                    CalendarEvent(
+                        summary=v.get("name") or entity_id,
+                        start=start,
+                        end=end,
+                        uid=self._uid(entity_id, start, end),
+                        description="",
+                    )
+                )
 
+        events.sort(key=_sort_key)
         return events
 
     def _uid(
         self, unqiue_id: str, event_start_time: datetime, event_end_time: datetime
     ) -> str:
-        """Generate a deterministic unique id for an event.
-
-        The uid is generated from the event start and end times converted to
-        UTC and formatted as YYYYmmddTHHMMSSZ for compactness and stability.
-        """
-        # Ensure we work with timezone-aware UTC datetimes for stability
-        start_utc = dt_util.as_utc(event_start_time)
-        end_utc = dt_util.as_utc(event_end_time)
-
-        start_str = start_utc.strftime("%Y%m%dT%H%M%SZ")
-        end_str = end_utc.strftime("%Y%m%dT%H%M%SZ")
-
-        return f"{unqiue_id}_{start_str}_{end_str}"
+        """Generate a deterministic unique id for an event."""
+        return create_event_uid(unqiue_id, event_start_time, event_end_time)
@@ -1,6 +1,8 @@
 """Nord pool cheapet hours binary sensor."""
 
 from datetime import date, datetime, timedelta
+import hashlib
+import json
 import logging
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
@@ -106,6 +108,7 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
         self._area = area
 
         self._archived = None
+        self._archived_extra = None
         self._price_modifications = price_modifications
         if mtu is None:
             self._mtu = 60
@@ -127,8 +130,16 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
             self._trigger_time = from_str_to_time(trigger_time)
 
         self.hass = hass
+        self._fingerprint = self._create_fingerprint()
+        self._warm_start_checked = False
         self._data = self._coordinator.get_data(self._attr_unique_id)
 
+    async def async_added_to_hass(self) -> None:
+        """Adopt the stored schedule so the state is correct right after startup."""
+        self._data = self._coordinator.get_data(self._attr_unique_id)
+        self._check_warm_start()
+        await self._swap_list_if_needed()
+
     async def async_update(self) -> None:
         """Update sensor."""
         await self._async_operate()
@@ -175,6 +186,7 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
     async def _async_operate(self) -> None:
         # Always get new data from coordinator as other components might have modified the data
         self._data = self._coordinator.get_data(self._attr_unique_id)
+        self._check_warm_start()
 
         await self._swap_list_if_needed()
 
@@ -216,10 +228,15 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
 
         self._data["failsafe"] = self._create_failsafe()
 
-        # Price array from integrations
+        # Price array from integrations. Reuse the stored series if still valid
         today: list = None
         tomorrow: list = None
-        if self._nordpool_official_config_entry is not None:
+        stored_prices = self._get_stored_prices()
+        if stored_prices is not None:
+            _LOGGER.debug("Using stored prices for %s", self._attr_unique_id)
+            (today, tomorrow) = stored_prices
+
+        elif self._nordpool_official_config_entry is not None:
             try:
                 (
                     today,
@@ -301,40 +318,11 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
                     self._data["list"] = []
                 return
 
-        cheapest = None
+        if stored_prices is None:
+            self._store_prices(today, tomorrow)
 
-        # Apply possible price modifications from template
-        if price_modifications := self._price_modifications:
-            today = self._apply_price_modifications(today, price_modifications)
-            tomorrow = self._apply_price_modifications(tomorrow, price_modifications)
-
-        # today and tomorrow are lists of HourPrice objects from now on
-        # Use proper method if sequential or non-sequential
         try:
-            if self._sequential:
-                cheapest = calculate_sequential_cheapest_hours(
-                    today,
-                    tomorrow,
-                    self._data["active_number_of_slots"],
-                    self._starting_today,
-                    self._first_hour,
-                    self._last_hour,
-                    self._inversed,
-                    self._data.get("active_price_limit"),
-                    self._mtu,
-                )
-            else:
-                cheapest = calculate_non_sequential_cheapest_hours(
-                    today,
-                    tomorrow,
-                    self._data["active_number_of_slots"],
-                    self._starting_today,
-                    self._first_hour,
-                    self._last_hour,
-                    self._inversed,
-                    self._data.get("active_price_limit"),
-                    self._mtu,
-                )
+            cheapest = self._calculate(today, tomorrow)
         except InvalidInput:
             # Logging already made on math.py, just return
             return
@@ -356,10 +344,73 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
             )
 
         self._data["fetch_date"] = self._create_fetch_date()
+        self._data["fingerprint"] = self._fingerprint
 
         # Finally store the data
         await self._store_data()
 
+    def _calculate(self, today: list, tomorrow: list) -> dict:
+        """Calculate the cheapest slots from normalized price series.
+
+        Raises InvalidInput on invalid configuration.
+        """
+        # Apply possible price modifications from template
+        if price_modifications := self._price_modifications:
+            today = self._apply_price_modifications(today, price_modifications)
+            tomorrow = self._apply_price_modifications(tomorrow, price_modifications)
+
+        # today and tomorrow are lists of HourPrice objects from now on
+        # Use proper method if sequential or non-sequential
+        calculate = (
+            calculate_sequential_cheapest_hours
+            if self._sequential
+            else calculate_non_sequential_cheapest_hours
+        )
+        return calculate(
+            today,
+            tomorrow,
+            self._data["active_number_of_slots"],
+            self._starting_today,
+            self._first_hour,
+            self._last_hour,
+            self._inversed,
+            self._data.get("active_price_limit"),
+            self._mtu,
+        )
+
+    def preview(self) -> dict | None:
+        """Calculate the schedule from cached prices without side effects.
+
+        Uses the normalized prices stored today by this or another cheapest
+        hours entity with the same price source, the price provider is not
+        called and nothing is stored. Returns the slots (offsets applied) and
+        the mean, min and max price, None without cached prices.
+
+        Raises InvalidEntityState, InvalidInput or ValueNotFound like the
+        calculation of the entity.
+        """
+        prices = self._find_cached_prices()
+        if prices is None:
+            return None
+        # Work on scratch data, the stored data of the entity is not touched
+        self._data = {"list": []}
+        self._update_entity_variables()
+        cheapest = self._calculate(*prices)
+        slots, _ = self._add_offset(
+            cheapest.get("list") or [], self._create_expiration()
+        )
+        return {"list": slots, **(cheapest.get("extra") or {})}
+
+    def _find_cached_prices(self) -> tuple[list, list] | None:
+        """Return price series stored today from the price source of this entity."""
+        candidates = [self._data, *self._coordinator.data.values()]
+        for data in candidates:
+            if isinstance(data, dict) and (
+                prices := self._parse_stored_prices(data.get("prices"))
+            ):
+                return prices
+        return None
+
     async def _store_data(self) -> None:
         await self._coordinator.async_set_data(
             self._attr_unique_id,
@@ -368,6 +419,7 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
             self.__class__.__name__,
             self._data,
             self._archived,
+            self._archived_extra,
         )
 
     async def _swap_list_if_needed(self) -> bool:
@@ -404,6 +456,9 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
         """Set list data."""
         # Archive previous
         self._archived = self._data["list"]
+        self._archived_extra = self._data.get("extra") or {
+            key: self._data.get(key) for key in ("mean_price", "min_price", "max_price")
+        }
 
         if is_swap is False:
             list_data, expiration = self._add_offset(list_data, expiration)
@@ -456,6 +511,93 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
 
         return (list, new_expiration)
 
+    def _check_warm_start(self) -> None:
+        """Drop the stored schedule once if it was calculated with another configuration."""
+        if self._warm_start_checked:
+            return
+        self._warm_start_checked = True
+
+        stored = self._data.get("fingerprint")
+        if stored is None or stored == self._fingerprint:
+            # Unchanged configuration (or data stored by an older version): adopt as is
+            return
+
+        _LOGGER.debug(
+            "Configuration of %s has changed, recalculating the schedule",
+            self._attr_unique_id,
+        )
+        for key in ("next", "expiration", "fetch_date", "extra", "fingerprint"):
+            self._data.pop(key, None)
+        self._data["list"] = []
+
+    def _create_fingerprint(self) -> str:
+        """Create fingerprint of the configuration affecting the calculated schedule."""
+        config = {
+            "source": self._price_source(),
+            "first_hour": self._first_hour,
+            "last_hour": self._last_hour,
+            "starting_today": self._starting_today,
+            "sequential": self._sequential,
+            "number_of_hours": self._number_of_hours,
+            "number_of_slots": self._number_of_slots,
+            "failsafe_starting_hour": self._failsafe_starting_hour,
+            "inversed": self._inversed,
+            "trigger_time": self._trigger_time,
+            "trigger_hour": self._trigger_hour,
+            "price_limit": self._price_limit,
+            "offset": self._offset,
+            "mtu": self._mtu,
+            "price_modifications": getattr(
+                self._price_modifications, "template", self._price_modifications
+            ),
+        }
+        dump = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha1(dump.encode()).hexdigest()
+
+    def _price_source(self) -> str:
+        """Return key identifying the price source."""
+        if self._nordpool_official_config_entry is not None:
+            return (
+                f"nordpool_official:{self._nordpool_official_config_entry}:{self._area}"
+            )
+        if self._nordpool_entity is not None:
+            return f"nordpool:{self._nordpool_entity}"
+        if self._entsoe_entity is not None:
+            return f"entsoe:{self._entsoe_entity}"
+        return f"stromligning:{self._stromligning_entity}:{self._stromligning_tomorrow_entity}"
+
+    def _get_stored_prices(self) -> tuple[list, list] | None:
+        """Return stored price series if fetched today from the same source."""
+        return self._parse_stored_prices(self._data.get("prices"))
+
+    def _parse_stored_prices(self, prices: dict | None) -> tuple[list, list] | None:
+        """Return the series of `prices` if usable by this entity."""
+        if prices is None:
+            return None
+        if (
+            prices.get("fetch_date") != self._create_fetch_date()
+            or prices.get("mtu") != self._mtu
+            or prices.get("source") != self._price_source()
+            or not prices.get("tomorrow")
+        ):
+            return None
+
+        today = [hour_price.HourPrice.from_stored(item) for item in prices["today"]]
+        tomorrow = [
+            hour_price.HourPrice.from_stored(item) for item in prices["tomorrow"]
+        ]
+        return (today, tomorrow)
+
+    def _store_prices(self, today: list, tomorrow: list) -> None:
+        """Store normalized price series so that they can be reused after restart."""
+        self._data["prices"] = {
+            "source": self._price_source(),
+            "mtu": self._mtu,
+            "fetch_date": self._create_fetch_date(),
+            "today": [item.as_dict() for item in today],
+            "tomorrow": [item.as_dict() for item in tomorrow],
+        }
+
     def _is_expired(self) -> bool:
         """Check if data is expired."""
         if self._data is not None:
@@ -861,15 +1003,19 @@ class CheapestHoursBinarySensor(BinarySensorEntity):
         return False
 
     def _construct_data_attributes(self) -> dict:
-        # Make some manipulation of the data stucture returned to the user
-        d = self._data
+        # Make some manipulation of the data stucture returned to the user.
+        # Stored prices and fingerprint are internal and not exposed as attributes
+        d = {
+            key: value
+            for key, value in self._data.items()
+            if key not in ("prices", "fingerprint")
+        }
 
         # Move extra data from 'extra' to root
-        if extras := self._data.get("extra"):
+        if extras := d.pop("extra", None):
             d["max_price"] = extras.get("max_price")
             d["min_price"] = extras.get("min_price")
             d["mean_price"] = extras.get("mean_price")
-            d.pop("extra", None)
         return d
 
     def _construct_static_attributes(self) -> dict:
@@ -9,8 +9,10 @@ import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry, ConfigFlowResult
 from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers import selector
 import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
 
 from ..const import (
     CONF_ALLOW_DYNAMIC_ENTITIES,
@@ -41,23 +43,50 @@ from ..const import (
     CONF_START,
     CONF_START_HOURS_ENTITY,
     CONF_START_MINUTES_ENTITY,
+    CONF_STROMLIGNING_ENTITY,
+    CONF_STROMLIGNING_TOMORROW_ENTITY,
     CONF_TRIGGER_HOUR,
     CONF_TRIGGER_HOUR_ENTITY,
     CONF_UNIQUE_ID,
     CONF_USE_OFFSET,
+    COORDINATOR,
     DATA_PROVIDER_ENTSOE,
     DATA_PROVIDER_NORDPOOL,
     DATA_PROVIDER_NORDPOOL_OFFICIAL,
     DATA_PROVIDER_STROMLIGNING,
-    CONF_STROMLIGNING_ENTITY,
-    CONF_STROMLIGNING_TOMORROW_ENTITY,
+    DOMAIN,
 )
+from ..exceptions import InvalidEntityState, InvalidInput, ValueNotFound
 
 _LOGGER = logging.getLogger(__name__)
 
 CONF_ENTRY_TYPE = "entry_type"
 ENTRY_TYPE_CHEAPEST_HOURS = "cheapest_hours"
 
+# Settings of the basic, advanced and offset steps, cleared when adjusting
+# the settings after a preview
+PREVIEW_SETTING_KEYS = (
+    CONF_NUMBER_OF_SLOTS,
+    CONF_NUMBER_OF_SLOTS_ENTITY,
+    CONF_FIRST_HOUR,
+    CONF_LAST_HOUR,
+    CONF_SEQUENTIAL,
+    CONF_FAILSAFE_STARTING_HOUR,
+    CONF_INVERSED,
+    CONF_TRIGGER_HOUR,
+    CONF_TRIGGER_HOUR_ENTITY,
+    CONF_PRICE_LIMIT,
+    CONF_PRICE_LIMIT_ENTITY,
+    CONF_RETENTION_DAYS,
+    CONF_PRICE_MODIFICATIONS,
+    CONF_USE_OFFSET,
+    CONF_OFFSET,
+    CONF_START_HOURS_ENTITY,
+    CONF_START_MINUTES_ENTITY,
+    CONF_END_HOURS_ENTITY,
+    CONF_END_MINUTES_ENTITY,
+)
+
 
 def _get_data_provider_type_schema(default: str | None = None) -> vol.Schema:
     """Get data provider type selection schema."""
@@ -722,6 +751,49 @@ def _validate_offset_integer_fields(user_input: dict[str, Any]) -> dict[str, str
     return errors
 
 
+def _calculate_preview(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> dict[str, str] | None:
+    """Return preview placeholders of the settings in `data`.
+
+    The schedule is calculated by a cheapest hours entity built from `data`
+    from the prices already stored by the integration, so no provider is
+    called. Returns None when it cannot be calculated, e.g. without stored
+    prices for today and tomorrow from the same price source.
+    """
+    from ..binary_sensor import create_cheapest_hours_entity
+
+    if hass.data.get(DOMAIN, {}).get(COORDINATOR) is None:
+        return None
+    try:
+        result = create_cheapest_hours_entity(hass, data).preview()
+    except (InvalidEntityState, InvalidInput, ValueNotFound, vol.Invalid) as e:
+        _LOGGER.debug("No preview for %s: %s", data.get(CONF_NAME), e)
+        return None
+    if result is None:
+        return None
+    return _format_preview(result)
+
+
+def _format_preview(result: dict[str, Any]) -> dict[str, str]:
+    """Return description placeholders of a preview result."""
+
+    def price(value: float | None) -> str:
+        return "-" if value is None else f"{value:.3f}"
+
+    slots = [
+        f"- {dt_util.as_local(item['start']):%a %H:%M} – "
+        f"{dt_util.as_local(item['end']):%a %H:%M}"
+        for item in result.get("list") or []
+    ]
+    return {
+        "slots": "\n".join(slots) or "-",
+        "mean_price": price(result.get("mean_price")),
+        "min_price": price(result.get("min_price")),
+        "max_price": price(result.get("max_price")),
+    }
+
+
 class CheapestHoursConfigFlowMixin:
     """Mixin for cheapest hours config flow steps."""
 
@@ -820,6 +892,76 @@ class CheapestHoursConfigFlowMixin:
             data_schema=_get_stromligning_schema(existing_data or user_input),
         )
 
+    def _cheapest_hours_entry_data(self) -> dict[str, Any]:
+        """Return the entry data the current settings would be saved as."""
+        if hasattr(self, "_config_entry"):
+            return {
+                **self._config_data,
+                CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS,
+                CONF_UNIQUE_ID: self._config_entry.data.get(CONF_UNIQUE_ID),
+                CONF_NAME: self._config_entry.data.get(CONF_NAME),
+                CONF_DATA_PROVIDER_TYPE: self._data_provider_type,
+            }
+        return {
+            **self._config_data,
+            CONF_UNIQUE_ID: self._config_data[CONF_NAME].lower().replace(" ", "_"),
+            CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS,
+        }
+
+    def _cheapest_hours_defaults(self) -> dict[str, Any] | None:
+        """Return a copy of the values the settings forms are filled in with."""
+        if defaults := getattr(self, "_cheapest_hours_adjusted", None):
+            return dict(defaults)
+        if hasattr(self, "_config_entry"):
+            return dict(self._config_entry.data)
+        return None
+
+    async def async_step_cheapest_hours_preview(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Show the preview of the settings, save them if it is not available."""
+        placeholders = _calculate_preview(self.hass, self._cheapest_hours_entry_data())
+        if placeholders is None:
+            return await self.async_step_cheapest_hours_save()
+        return self.async_show_menu(
+            step_id="cheapest_hours_preview",
+            menu_options=["cheapest_hours_save", "cheapest_hours_adjust"],
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_cheapest_hours_save(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Save the cheapest hours settings."""
+        new_data = self._cheapest_hours_entry_data()
+        if hasattr(self, "_config_entry"):
+            self.hass.config_entries.async_update_entry(
+                self._config_entry,
+                data=new_data,
+            )
+            return self.async_create_entry(title="", data={})
+
+        self._config_data = new_data
+        await self.async_set_unique_id(new_data[CONF_UNIQUE_ID])
+        self._abort_if_unique_id_configured()
+
+        return self.async_create_entry(
+            title=self._config_data[CONF_NAME],
+            data=self._config_data,
+        )
+
+    async def async_step_cheapest_hours_adjust(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Go back to the settings, filled in with the previewed values."""
+        self._cheapest_hours_adjusted = {
+            **(self._cheapest_hours_defaults() or {}),
+            **self._config_data,
+        }
+        for key in PREVIEW_SETTING_KEYS:
+            self._config_data.pop(key, None)
+        return await self.async_step_cheapest_hours_basic()
+
     async def async_step_cheapest_hours_basic(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -837,9 +979,7 @@ class CheapestHoursConfigFlowMixin:
                 self._config_data.update(user_input)
                 return await self.async_step_cheapest_hours_advanced()
 
-        existing_data = None
-        if hasattr(self, "_config_entry"):
-            existing_data = dict(self._config_entry.data)
+        existing_data = self._cheapest_hours_defaults()
 
         allow_dynamic = self._config_data.get(CONF_ALLOW_DYNAMIC_ENTITIES, True)
         return self.async_show_form(
@@ -877,36 +1017,10 @@ class CheapestHoursConfigFlowMixin:
                 if use_offset:
                     return await self.async_step_cheapest_hours_offset()
 
-                if hasattr(self, "_config_entry"):
-                    new_data = {
-                        **self._config_data,
-                        CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS,
-                        CONF_UNIQUE_ID: self._config_entry.data.get(CONF_UNIQUE_ID),
-                        CONF_NAME: self._config_entry.data.get(CONF_NAME),
-                        CONF_DATA_PROVIDER_TYPE: self._data_provider_type,
-                    }
-
-                    self.hass.config_entries.async_update_entry(
-                        self._config_entry,
-                        data=new_data,
-                    )
-                    return self.async_create_entry(title="", data={})
-
-                unique_id = self._config_data[CONF_NAME].lower().replace(" ", "_")
-                self._config_data[CONF_UNIQUE_ID] = unique_id
-                self._config_data[CONF_ENTRY_TYPE] = ENTRY_TYPE_CHEAPEST_HOURS
-
-                await self.async_set_unique_id(unique_id)
-                self._abort_if_unique_id_configured()
-
-                return self.async_create_entry(
-                    title=self._config_data[CONF_NAME],
-                    data=self._config_data,
-                )
+                return await self.async_step_cheapest_hours_preview()
 
-        existing_data = None
+        existing_data = self._cheapest_hours_defaults()
         if hasattr(self, "_config_entry"):
-            existing_data = {**self._config_entry.data}
             existing_data[CONF_CALENDAR] = self._config_data.get(CONF_CALENDAR, True)
 
         allow_dynamic = self._config_data.get(CONF_ALLOW_DYNAMIC_ENTITIES, True)
@@ -940,44 +1054,13 @@ class CheapestHoursConfigFlowMixin:
                     self._config_data[CONF_OFFSET] = offset
                 self._config_data.update(entities)
 
-                if hasattr(self, "_config_entry"):
-                    new_data = {
-                        **self._config_data,
-                        CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS,
-                        CONF_UNIQUE_ID: self._config_entry.data.get(CONF_UNIQUE_ID),
-                        CONF_NAME: self._config_entry.data.get(CONF_NAME),
-                        CONF_DATA_PROVIDER_TYPE: self._data_provider_type,
-                    }
-
-                    self.hass.config_entries.async_update_entry(
-                        self._config_entry,
-                        data=new_data,
-                    )
-                    return self.async_create_entry(title="", data={})
-
-                unique_id = self._config_data[CONF_NAME].lower().replace(" ", "_")
-                self._config_data[CONF_UNIQUE_ID] = unique_id
-                self._config_data[CONF_ENTRY_TYPE] = ENTRY_TYPE_CHEAPEST_HOURS
-
-                await self.async_set_unique_id(unique_id)
-                self._abort_if_unique_id_configured()
-
-                return self.async_create_entry(
-                    title=self._config_data[CONF_NAME],
-                    data=self._config_data,
-                )
+                return await self.async_step_cheapest_hours_preview()
 
-        offset_data = {}
-        if hasattr(self, "_config_entry"):
-            offset_data = {
-                **self._config_entry.data.get(CONF_OFFSET, {}),
-                **self._config_entry.data,
-            }
-        else:
-            offset_data = {
-                **self._config_data.get(CONF_OFFSET, {}),
-                **self._config_data,
-            }
+        existing_data = self._cheapest_hours_defaults() or self._config_data
+        offset_data = {
+            **existing_data.get(CONF_OFFSET, {}),
+            **existing_data,
+        }
 
         allow_dynamic = self._config_data.get(CONF_ALLOW_DYNAMIC_ENTITIES, True)
         return self.async_show_form(
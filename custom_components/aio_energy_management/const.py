@@ -59,6 +59,7 @@ CONF_ENTITY_EXCESS_SOLAR = "excess_solar"
 # Common
 CONF_UNIQUE_ID = "unique_id"
 CONF_NAME = "name"
+CONF_HISTORY = "history"
 
 # Data
 COORDINATOR = "coordinator"
@@ -68,13 +69,46 @@ CONF_EXCESS_SOLAR = "excess_solar"
 # Legacy YAML instance bucket under hass.data[DOMAIN] (single excess solar block)
 YAML_EXCESS_SOLAR_INSTANCE_KEY = "yaml_excess_solar"
 CONF_GRID_POWER_SENSOR = "sensor"
+CONF_GRID_POWER_SENSOR_L1 = "sensor_l1"
+CONF_GRID_POWER_SENSOR_L2 = "sensor_l2"
+CONF_GRID_POWER_SENSOR_L3 = "sensor_l3"
+CONF_BATTERY_POWER_SENSOR = "battery_power_sensor"
+CONF_BATTERY_SOC_SENSOR = "battery_soc_sensor"
+CONF_BATTERY_POLICY = "battery_policy"
+CONF_BATTERY_SOC_TARGET = "battery_soc_target"
+CONF_BATTERY_SPLIT = "battery_split"
+CONF_FORECAST_ENTITY = "forecast_entity"
+CONF_FORECAST_ATTRIBUTE = "forecast_attribute"
+CONF_FORECAST_BASE_LOAD = "forecast_base_load"
+CONF_PRICE_SOURCE = "price_source"
+CONF_PRICE_LOW = "price_low"
+CONF_PRICE_HIGH = "price_high"
+CONF_PRICE_ADJUSTMENT = "price_adjustment"
+CONF_SHADOW_STRATEGIES = "shadow_strategies"
+CONF_EXPORT_LIMIT = "export_limit"
 CONF_POWER_DEVICES = "power_devices"
 CONF_BUFFER = "buffer"
+CONF_EVALUATION_INTERVAL = "evaluation_interval"
+CONF_GRID_FILTER = "grid_filter"
+CONF_FILTER_WINDOW = "filter_window"
+CONF_ALLOCATION_MODE = "allocation_mode"
+CONF_FAST_SHED_THRESHOLD = "fast_shed_threshold"
 CONF_CONSUMPTION = "consumption"
 CONF_PRIORITY = "priority"
 CONF_IS_ON_SCHEDULE = "is_on_schedule"
 CONF_MINIMUM_ON_TIME = "minimum_on_time"
 CONF_MINIMUM_OFF_TIME = "minimum_off_time"
+CONF_MODULATING = "modulating"
+CONF_MIN_POWER = "min_power"
+CONF_POWER_STEP = "power_step"
+CONF_RAMP_RATE = "ramp_rate"
+CONF_PHASE = "phase"
+CONF_ON_THRESHOLD = "on_threshold"
+CONF_OFF_THRESHOLD = "off_threshold"
+CONF_ON_DELAY = "on_delay"
+CONF_OFF_DELAY = "off_delay"
 EXCESS_SOLAR_MANAGER = "excess_solar_manager"
 EXCESS_SOLAR_SWITCH = "excess_solar_switch"
 EXCESS_SOLAR_ENABLED_SWITCHES = "excess_solar_enabled_switches"
+EXCESS_SOLAR_SETPOINT_SENSORS = "excess_solar_setpoint_sensors"
+EXCESS_SOLAR_STATISTIC_SENSORS = "excess_solar_statistic_sensors"
@@ -1,19 +1,26 @@
 """Data coordinator. Owns all the data."""
 
+from collections.abc import Callable, Iterable
 from datetime import datetime, timedelta
 import logging
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 import homeassistant.util.dt as dt_util
 
 from .helpers import convert_datetime, from_str_to_datetime
+from .history import ScheduleHistory
 
 STORAGE_VERSION = 1
 STORAGE_KEY = "aio_energy_management.storage"
+# Data key of the learned excess solar device consumption
+CONSUMPTION_MODELS = "excess_solar_consumption"
 _LOGGER = logging.getLogger(__name__)
 
+# Called with the set of changed entity ids and the new coordinator version
+ChangeListener = Callable[[set[str], int], None]
+
 
 # TODO: .. version migration
 class EnergyManagementCoordinator:
@@ -24,7 +31,64 @@ class EnergyManagementCoordinator:
         self._store = Store[dict[str, Any]](hass, STORAGE_VERSION, STORAGE_KEY)
         self.listeners = []
         self.data = {}
-        self.requires_calendar_update = False
+        self.history: ScheduleHistory | None = None  # Optional long-term history
+        self._version = 0
+        self._entity_versions: dict[str, int] = {}
+        self._change_listeners: list[tuple[ChangeListener, set[str] | None]] = []
+
+    @property
+    def version(self) -> int:
+        """Return the change version. Increases on every data modification."""
+        return self._version
+
+    def entity_version(self, entity_id: str) -> int:
+        """Return the version in which the entity was last modified (0 if never)."""
+        return self._entity_versions.get(entity_id, 0)
+
+    def changes_since(self, version: int) -> set[str]:
+        """Return entity ids modified after the given version."""
+        return {
+            entity_id
+            for entity_id, entity_version in self._entity_versions.items()
+            if entity_version > version
+        }
+
+    @callback
+    def async_add_change_listener(
+        self,
+        listener: ChangeListener,
+        entity_ids: Iterable[str] | None = None,
+    ) -> CALLBACK_TYPE:
+        """Listen for data changes. Optionally only for the given entity ids.
+
+        Returns a callable that removes the listener.
+        """
+        entry = (listener, set(entity_ids) if entity_ids is not None else None)
+        self._change_listeners.append(entry)
+
+        @callback
+        def remove_listener() -> None:
+            if entry in self._change_listeners:
+                self._change_listeners.remove(entry)
+
+        return remove_listener
+
+    @callback
+    def _async_notify_changed(self, entity_ids: Iterable[str]) -> None:
+        """Bump the version of changed entities and inform the listeners."""
+        changed = set(entity_ids)
+        if not changed:
+            return
+
+        self._version += 1
+        for entity_id in changed:
+            self._entity_versions[entity_id] = self._version
+
+        _LOGGER.debug("Data changed for %s (version %d)", changed, self._version)
+        for listener, entity_filter in list(self._change_listeners):
+            relevant = changed if entity_filter is None else changed & entity_filter
+            if relevant:
+                listener(relevant, self._version)
 
     async def _async_save_data(self) -> None:
         """Save data to store."""
@@ -41,6 +105,7 @@ class EnergyManagementCoordinator:
         _LOGGER.debug("Request to clear data for %s", unique_id)
         if self.data.get(unique_id) is not None:
             self.data.pop(unique_id, None)
+            self._async_notify_changed([unique_id])
             await self._async_save_data()
 
     async def async_load_data(self):
@@ -48,8 +113,9 @@ class EnergyManagementCoordinator:
         stored = await self._store.async_load()
         if stored:
             _LOGGER.debug("Load data from store: %s", stored)
+            previous = set(self.data)
             self.data = self.convert_datetimes(stored)
-            self.requires_calendar_update = True
+            self._async_notify_changed(previous | set(self.data))
 
     async def async_set_data(
         self,
@@ -59,6 +125,7 @@ class EnergyManagementCoordinator:
         module: str,
         dict: dict,  # Data that is currently active or upcoming
         archived: list | None,  # Data that is to be moved on the archive
+        archived_extra: dict | None = None,  # Price info of the archived data
     ) -> None:
         """Set entity data."""
         prev_archived = {}
@@ -82,9 +149,19 @@ class EnergyManagementCoordinator:
             [self.data[entity_id]["archived"]],
         )
 
-        self.requires_calendar_update = True
+        self._async_notify_changed([entity_id])
         await self._async_save_data()
 
+        if self.history is not None and archived:
+            known_starts = {item.get("start") for item in prev_archived or []}
+            finished = [
+                item for item in archived if item.get("start") not in known_starts
+            ]
+            if finished:
+                await self.history.async_append(
+                    entity_id, name, finished, archived_extra
+                )
+
     def _update_archived(
         self, entity_id: str, existing_archive: list | None, new_data: list | None
     ) -> list:
@@ -134,6 +211,29 @@ class EnergyManagementCoordinator:
                 entity_id,
                 filtered_archived,
             )
+            if len(filtered_archived) != len(archived):
+                self._async_notify_changed([entity_id])
+
+    def get_consumption_models(self) -> dict[str, dict]:
+        """Return the learned excess solar consumption by sensor unique_id."""
+        return (self.data.get(CONSUMPTION_MODELS) or {}).get("devices") or {}
+
+    async def async_set_consumption_models(self, models: dict[str, dict]) -> None:
+        """Store learned excess solar consumption by sensor unique_id.
+
+        Models of other sensors are kept, so several managers share the entry.
+        """
+        entry = self.data.setdefault(
+            CONSUMPTION_MODELS,
+            {
+                "name": "Excess solar consumption",
+                "type": "excess_solar",
+                "calendar": False,
+            },
+        )
+        entry.setdefault("devices", {}).update(models)
+        self._async_notify_changed([CONSUMPTION_MODELS])
+        await self._async_save_data()
 
     def get_data(self, entity_id: str) -> dict | None:
         """Get entity data."""
@@ -172,6 +272,13 @@ class EnergyManagementCoordinator:
             if value := dictionary.get(field):
                 dictionary[field] = convert_datetime(value)
 
+        if prices := dictionary.get("prices"):
+            for field in ("today", "tomorrow"):
+                if value := prices.get(field):
+                    prices[field] = convert_datetime(value)
+            if isinstance(fetch_date := prices.get("fetch_date"), str):
+                prices["fetch_date"] = dt_util.parse_date(fetch_date)
+
         if data_next := dictionary.get("next"):
             if list_next := data_next.get("list"):
                 dictionary["next"]["list"] = convert_datetime(list_next)
@@ -0,0 +1,28 @@
+"""Diagnostics support for AIO Energy Management."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, EXCESS_SOLAR_MANAGER
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics of a config entry.
+
+    Excess solar entries include the manager state and its decision log.
+    """
+    diagnostics: dict[str, Any] = {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+    }
+    bucket = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if isinstance(bucket, dict) and (manager := bucket.get(EXCESS_SOLAR_MANAGER)):
+        diagnostics["excess_solar"] = manager.diagnostic_info
+        diagnostics["decisions"] = manager.decision_log.entries()
+    return diagnostics
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from ..const import CONF_ENTITY_EXCESS_SOLAR  # noqa: TID252
-from .binary_sensor import ExcessSolarBinarySensor
+from .binary_sensor import ExcessSolarBinarySensor, ExcessSolarModulatingBinarySensor
 from .config_flow import ExcessSolarConfigFlowMixin
 from .manager import (
     ExcessSolarManager,
@@ -11,6 +11,7 @@ from .manager import (
     create_manager_from_config,
 )
 from .number import ExcessSolarPriorityNumber
+from .sensor import ExcessSolarSetpointSensor
 from .switch import ExcessSolarDeviceEnabledSwitch, ExcessSolarMasterSwitch
 
 __all__ = [
@@ -20,7 +21,9 @@ __all__ = [
     "ExcessSolarDeviceEnabledSwitch",
     "ExcessSolarManager",
     "ExcessSolarMasterSwitch",
+    "ExcessSolarModulatingBinarySensor",
     "ExcessSolarPriorityNumber",
+    "ExcessSolarSetpointSensor",
     "build_sensors_from_config",
     "create_manager_from_config",
 ]
@@ -0,0 +1,120 @@
+"""Allocation of excess solar to power devices in a single evaluation.
+
+The planner works on plain snapshots of the devices, so it is independent of
+Home Assistant and easy to test.
+
+Devices are handled by priority level (devices sharing the same priority form
+one level). A higher level always wins over any combination of lower levels,
+the same rule the incremental mode follows when swapping devices. Within a
+level a 0/1 knapsack picks the combination that uses the most of the
+remaining power.
+"""
+
+from __future__ import annotations
+
+from itertools import groupby
+
+ALLOCATION_INCREMENTAL = "incremental"
+ALLOCATION_KNAPSACK = "knapsack"
+ALLOCATION_MODES = [ALLOCATION_INCREMENTAL, ALLOCATION_KNAPSACK]
+
+# Power resolution of the knapsack table. Keeps the table small with large capacities
+KNAPSACK_RESOLUTION = 10  # W
+
+
+class AllocationCandidate:
+    """Snapshot of a single device for the planner."""
+
+    def __init__(
+        self,
+        key: str,
+        priority: int,
+        consumption: float,
+        is_on: bool,
+        can_change: bool,
+        eligible: bool = True,
+    ) -> None:
+        """Init candidate.
+
+        Args:
+            key: Identifier of the device.
+            priority: Lower number is allocated first.
+            consumption: Power (W) the device uses. Current consumption for
+                active devices, expected consumption for inactive ones.
+            is_on: Whether the device is currently active.
+            can_change: Whether the state may be changed now (minimum on/off
+                times, schedule).
+            eligible: Whether the device may be active (e.g. enabled switch).
+        """
+        self.key = key
+        self.priority = priority
+        self.consumption = consumption
+        self.is_on = is_on
+        self.can_change = can_change
+        self.eligible = eligible
+
+
+def plan_allocation(
+    candidates: list[AllocationCandidate], surplus: float, buffer: float = 0
+) -> set[str]:
+    """Return keys of the devices that should be active.
+
+    Args:
+        candidates: Device snapshots.
+        surplus: Current export to the grid in W (negative when importing).
+            Consumption of active devices is already included in this value.
+        buffer: Allowed import in W, same meaning as in incremental mode.
+    """
+    target: set[str] = set()
+    flexible: list[AllocationCandidate] = []
+    capacity = surplus + buffer
+
+    for candidate in candidates:
+        if not candidate.can_change:
+            # State is locked, active devices keep using their power
+            if candidate.is_on:
+                target.add(candidate.key)
+            continue
+        if candidate.is_on:
+            # Power of an active device can be given to another one
+            capacity += candidate.consumption
+        if candidate.eligible and candidate.consumption > 0:
+            flexible.append(candidate)
+        elif candidate.eligible and candidate.is_on:
+            # Active device with no measurable consumption keeps running
+            target.add(candidate.key)
+
+    flexible.sort(key=lambda c: c.priority)
+    for _priority, level in groupby(flexible, key=lambda c: c.priority):
+        if capacity <= 0:
+            break
+        chosen = _knapsack(list(level), capacity)
+        for candidate in chosen:
+            target.add(candidate.key)
+            capacity -= candidate.consumption
+
+    return target
+
+
+def _knapsack(
+    items: list[AllocationCandidate], capacity: float
+) -> list[AllocationCandidate]:
+    """Return items using most of the capacity. Active devices win ties."""
+    if len(items) == 1:
+        return items if items[0].consumption <= capacity else []
+
+    slots = int(capacity // KNAPSACK_RESOLUTION)
+    # best[c] = (used power, active devices kept, chosen indexes) within c slots
+    best: list[tuple[float, int, tuple[int, ...]]] = [(0.0, 0, ())] * (slots + 1)
+    for index, item in enumerate(items):
+        # Round weights up so the chosen set never exceeds the capacity
+        weight = -(-int(item.consumption) // KNAPSACK_RESOLUTION)
+        if weight > slots:
+            continue
+        for c in range(slots, weight - 1, -1):
+            used, kept, chosen = best[c - weight]
+            value = (used + item.consumption, kept + int(item.is_on))
+            if value > best[c][:2]:
+                best[c] = (*value, (*chosen, index))
+
+    return [items[index] for index in best[slots][2]]
@@ -0,0 +1,68 @@
+"""Battery-aware surplus for the Excess Solar manager.
+
+With a home battery the grid sensor stays close to zero while the battery
+absorbs the surplus, so the grid power alone never shows excess solar. The
+battery power is combined with the grid power into the effective grid power
+the manager filters and evaluates:
+
+- Battery discharge always counts as import, devices are never run from the
+  battery.
+- A share of the charging power counts as export, decided by the policy:
+  ``battery_first`` gives nothing to the devices until the battery reaches the
+  target state of charge, ``devices_first`` gives all of it and ``split``
+  gives the configured percentage until the target is reached.
+
+Once the target state of charge is reached every policy gives all of the
+charging power to the devices.
+"""
+
+from __future__ import annotations
+
+BATTERY_FIRST = "battery_first"
+BATTERY_DEVICES_FIRST = "devices_first"
+BATTERY_SPLIT = "split"
+BATTERY_POLICIES = [BATTERY_FIRST, BATTERY_DEVICES_FIRST, BATTERY_SPLIT]
+
+DEFAULT_BATTERY_SOC_TARGET = 80  # %
+DEFAULT_BATTERY_SPLIT = 50  # % of the charging power given to devices
+
+
+class BatteryPolicy:
+    """Share the battery charging power with the devices."""
+
+    def __init__(
+        self,
+        policy: str = BATTERY_FIRST,
+        soc_target: float = DEFAULT_BATTERY_SOC_TARGET,
+        split: float = DEFAULT_BATTERY_SPLIT,
+    ) -> None:
+        """Init policy. `soc_target` and `split` are percentages."""
+        self.policy = policy
+        self.soc_target = soc_target
+        self.split = split
+
+    def device_share(self, soc: float | None) -> float:
+        """Return the share (0..1) of the charging power given to devices.
+
+        An unknown state of charge is treated as below the target.
+        """
+        if self.policy == BATTERY_DEVICES_FIRST:
+            return 1.0
+        if soc is not None and soc >= self.soc_target:
+            return 1.0
+        if self.policy == BATTERY_SPLIT:
+            return min(max(self.split, 0), 100) / 100
+        return 0.0
+
+    def grid_power(
+        self, grid_power: float, battery_power: float | None, soc: float | None
+    ) -> float:
+        """Return the effective grid power (W, positive import).
+
+        `battery_power` is positive when charging and negative when discharging.
+        """
+        if battery_power is None:
+            return grid_power
+        if battery_power < 0:
+            return grid_power - battery_power
+        return grid_power - battery_power * self.device_share(soc)
@@ -2,15 +2,28 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Mapping
 from datetime import timedelta
 import logging
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.const import STATE_ON
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.restore_state import RestoreEntity
 import homeassistant.util.dt as dt_util
 
+from .clock import DEFAULT_CLOCK, Clock
+from .consumption import ConsumptionModel
+from .hysteresis import DeviceHysteresis
+from .inputs import SCHEDULE_ON_STATES
+from .modulation import DEFAULT_POWER_STEP, DEFAULT_RAMP_RATE, SetpointController
+from .phases import PHASE_ALL
+from .statistics import DeviceStatistics
+
 if TYPE_CHECKING:
+    from .inputs import DeviceInputTable
+    from .sensor import ExcessSolarSetpointSensor, ExcessSolarStatisticSensor
     from .switch import ExcessSolarDeviceEnabledSwitch
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,7 +32,7 @@ _LOGGER = logging.getLogger(__name__)
 DEFAULT_MINIMUM_OFF_TIME = 1  # minute: minimum wait after "off" before turning "on"
 
 
-class ExcessSolarBinarySensor(BinarySensorEntity):
+class ExcessSolarBinarySensor(RestoreEntity, BinarySensorEntity):
     """Binary sensor for a single excess-solar-managed power device.
 
     State is **on**  → use solar power for this device.
@@ -29,6 +42,16 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
     - ``_is_on``         – current managed state
     - ``_last_turned_on``  – timestamp when turned on by manager
     - ``_last_turned_off`` – timestamp when turned off by manager
+
+    While the manager runs, ``inputs`` holds its device input table and the
+    consumption and schedule entities are read from it instead of the state
+    machine. Timestamps are taken from ``clock``, set by the manager. The
+    learned consumption of the device is kept in ``consumption_model`` and
+    its runtime counters in ``statistics``, published by the
+    ``statistic_sensors``.
+
+    The state and both timestamps are restored from the last known state, so
+    the short-cycle guards survive Home Assistant restarts.
     """
 
     def __init__(
@@ -45,6 +68,8 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
         minimum_on_time: int = 0,  # minutes
         minimum_off_time: int = DEFAULT_MINIMUM_OFF_TIME,  # minutes
         priority_number_entity: Any = None,
+        phase: str = PHASE_ALL,
+        hysteresis: DeviceHysteresis | None = None,
     ) -> None:
         """Initialise the excess solar binary sensor."""
         self.hass = hass
@@ -58,8 +83,22 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
         self._priority_number_entity = priority_number_entity
         self.is_on_schedule_entity = is_on_schedule_entity
         self._enabled_switch = enabled_switch
+        if enabled_switch is not None:
+            enabled_switch.set_enabled_change_callback(self._async_enabled_changed)
         self.minimum_on_time = timedelta(minutes=minimum_on_time)
         self.minimum_off_time = timedelta(minutes=minimum_off_time)
+        self.phase = phase
+        self.hysteresis = hysteresis or DeviceHysteresis()
+        self.consumption_model = ConsumptionModel()
+        self.statistics = DeviceStatistics()
+        self.statistic_sensors: list[ExcessSolarStatisticSensor] = []
+
+        self.inputs: DeviceInputTable | None = None
+        self.clock: Clock = DEFAULT_CLOCK
+        # Called after the sensor was turned on or off, enabled or disabled
+        self.state_listener: Callable[[ExcessSolarBinarySensor], None] | None = None
+        # Called after the sensor was added to Home Assistant and restored
+        self.added_listener: Callable[[ExcessSolarBinarySensor], None] | None = None
 
         self._attr_is_on: bool = False
         self._last_turned_on: Any = None
@@ -69,6 +108,11 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
     # State helpers used by the manager
     # ------------------------------------------------------------------
 
+    @property
+    def consumption_entity(self) -> str | None:
+        """Return the live consumption entity."""
+        return self._consumption_entity
+
     @property
     def priority(self) -> int:
         """Return current priority from number entity or initial value."""
@@ -80,49 +124,57 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
         """Return device consumption in Watts.
 
         When ``consumption_entity`` is configured, its current HA state value
-        is used.  Otherwise the static ``consumption`` wattage is returned
-        while the sensor is **on**, and ``0 W`` is returned while it is **off**
-        (an inactive device consumes nothing from the solar budget).
+        is used.  Otherwise the expected consumption is returned while the
+        sensor is **on**, and ``0 W`` is returned while it is **off** (an
+        inactive device consumes nothing from the solar budget).
         """
-        if self._consumption_entity is not None:
-            state = self.hass.states.get(self._consumption_entity)
-            if state is None:
-                _LOGGER.warning(
-                    "Consumption entity %s not found for %s, falling back to static value",
-                    self._consumption_entity,
-                    self.name,
-                )
-            else:
-                try:
-                    return float(state.state)
-                except ValueError:
-                    _LOGGER.warning(
-                        "Cannot parse consumption from %s: '%s', falling back to static value",
-                        self._consumption_entity,
-                        state.state,
-                    )
+        if (measured := self._get_measured_consumption()) is not None:
+            return measured
 
         # No consumption_entity (or entity unavailable): only count watts while on.
         if not self._attr_is_on:
             return 0.0
-        try:
-            return float(self._consumption)
-        except (TypeError, ValueError):
-            _LOGGER.error(
-                "Invalid consumption value for %s: %r – check your configuration",
+        return self.get_expected_consumption()
+
+    def _get_measured_consumption(self) -> float | None:
+        """Return ``consumption_entity`` value or None if not available."""
+        if self._consumption_entity is None:
+            return None
+        if self.inputs is not None and self.inputs.has_number(self._consumption_entity):
+            return self.inputs.number(self._consumption_entity)
+        state = self.hass.states.get(self._consumption_entity)
+        if state is None:
+            _LOGGER.warning(
+                "Consumption entity %s not found for %s, falling back to static value",
+                self._consumption_entity,
                 self.name,
-                self._consumption,
             )
-            return 0.0
+            return None
+        try:
+            return float(state.state)
+        except ValueError:
+            _LOGGER.warning(
+                "Cannot parse consumption from %s: '%s', falling back to static value",
+                self._consumption_entity,
+                state.state,
+            )
+            return None
 
     def get_expected_consumption(self) -> float:
-        """Return the static configured consumption in Watts for budget planning.
+        """Return the consumption in Watts for budget planning.
 
-        This always returns the configured ``consumption`` wattage regardless of
-        the current on/off state or any ``consumption_entity`` reading.
+        This is the learned consumption once the model has enough samples,
+        the configured ``consumption`` wattage before that, regardless of the
+        current on/off state or any ``consumption_entity`` reading.
         The manager uses this value to decide whether there is enough solar
         surplus to activate a sensor *before* it is turned on.
         """
+        if self.consumption_model.learned:
+            return self.consumption_model.watts
+        return self.get_configured_consumption()
+
+    def get_configured_consumption(self) -> float:
+        """Return the static configured consumption in Watts."""
         try:
             return float(self._consumption)
         except (TypeError, ValueError):
@@ -133,12 +185,24 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
             )
             return 0.0
 
+    def observe_consumption(self) -> None:
+        """Feed the consumption entity reading of the running device to the model."""
+        if not self._attr_is_on or self._consumption_entity is None:
+            return
+        if self.inputs is None or not self.inputs.has_number(self._consumption_entity):
+            return
+        measured = self.inputs.number(self._consumption_entity)
+        if measured is not None and measured > 0:
+            self.consumption_model.observe(measured)
+
     def is_on_schedule(self) -> bool:
         """Return True if device is on its own schedule (manager hands off)."""
         if self.is_on_schedule_entity is None:
             return False
+        if self.inputs is not None and self.inputs.has_flag(self.is_on_schedule_entity):
+            return self.inputs.flag(self.is_on_schedule_entity)
         state = self.hass.states.get(self.is_on_schedule_entity)
-        return state is not None and state.state in ("on", "true", "True", "1")
+        return state is not None and state.state in SCHEDULE_ON_STATES
 
     def is_enabled(self) -> bool:
         """Return True if this device participates in solar management."""
@@ -146,11 +210,16 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
             return True
         return self._enabled_switch.is_on
 
+    def _async_enabled_changed(self) -> None:
+        """Report the enable switch turned on or off."""
+        if self.state_listener is not None:
+            self.state_listener(self)
+
     def can_turn_on(self) -> bool:
         """Return True if minimum_off_time since last turn-off has elapsed."""
         if self._last_turned_off is None:
             return True
-        elapsed = dt_util.now() - self._last_turned_off
+        elapsed = self.clock.now() - self._last_turned_off
         if elapsed < self.minimum_off_time:
             _LOGGER.debug(
                 "Sensor %s: minimum_off_time not elapsed (%s remaining)",
@@ -169,7 +238,7 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
         """
         if self._last_turned_on is None:
             return True
-        elapsed = dt_util.now() - self._last_turned_on
+        elapsed = self.clock.now() - self._last_turned_on
         if elapsed < self.minimum_on_time:
             _LOGGER.debug(
                 "Sensor %s: minimum_on_time not elapsed (%s remaining)",
@@ -182,19 +251,62 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
     def activate(self) -> None:
         """Mark sensor as active (turn on) and record timestamp."""
         self._attr_is_on = True
-        self._last_turned_on = dt_util.now()
+        self._last_turned_on = self.clock.now()
+        self.hysteresis.sync(True)
+        self.statistics.switched(True, self._routed_power(), self._last_turned_on)
+        if self.state_listener is not None:
+            self.state_listener(self)
         self.async_write_ha_state()
+        self._write_statistics()
 
     def deactivate(self) -> None:
         """Mark sensor as inactive (turn off) and record timestamp."""
         self._attr_is_on = False
-        self._last_turned_off = dt_util.now()
+        self._last_turned_off = self.clock.now()
+        self.hysteresis.sync(False)
+        self.statistics.switched(False, 0.0, self._last_turned_off)
+        if self.state_listener is not None:
+            self.state_listener(self)
         self.async_write_ha_state()
+        self._write_statistics()
+
+    def _routed_power(self) -> float:
+        """Return the power (W) counted as routed to the device while on."""
+        return self.get_expected_consumption()
+
+    def _write_statistics(self) -> None:
+        for sensor in self.statistic_sensors:
+            sensor.async_update_statistic()
 
     # ------------------------------------------------------------------
     # BinarySensorEntity
     # ------------------------------------------------------------------
 
+    async def async_added_to_hass(self) -> None:
+        """Restore state and guard timestamps from the last known state."""
+        await super().async_added_to_hass()
+        if (last_state := await self.async_get_last_state()) is not None:
+            self._restore_state(last_state.state == STATE_ON, last_state.attributes)
+            _LOGGER.debug(
+                "Restored %s to %s (last on %s, last off %s)",
+                self.name,
+                "on" if self._attr_is_on else "off",
+                self._last_turned_on,
+                self._last_turned_off,
+            )
+            if self.state_listener is not None:
+                self.state_listener(self)
+        if self.added_listener is not None:
+            self.added_listener(self)
+
+    def _restore_state(self, is_on: bool, attributes: Mapping[str, Any]) -> None:
+        self._attr_is_on = is_on
+        self.hysteresis.sync(is_on)
+        self._last_turned_on = _parse_timestamp(attributes.get("last_turned_on"))
+        self._last_turned_off = _parse_timestamp(attributes.get("last_turned_off"))
+        # The time Home Assistant was down is not counted
+        self.statistics.update(is_on, self._routed_power(), self.clock.now())
+
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra attributes."""
@@ -204,12 +316,15 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
             "consumption_w": self.get_consumption(),
             "is_on_schedule": self.is_on_schedule(),
             "is_enabled": self.is_enabled(),
+            "phase": self.phase,
             "last_turned_on": (
                 self._last_turned_on.isoformat() if self._last_turned_on else None
             ),
             "last_turned_off": (
                 self._last_turned_off.isoformat() if self._last_turned_off else None
             ),
+            "hysteresis": self.hysteresis.state,
+            "writes_avoided": self.hysteresis.writes_avoided,
         }
 
         if self._priority_number_entity is not None:
@@ -219,3 +334,127 @@ class ExcessSolarBinarySensor(BinarySensorEntity):
             )
             attrs["priority_entity"] = entity_ref
         return attrs
+
+
+class ExcessSolarModulatingBinarySensor(ExcessSolarBinarySensor):
+    """Binary sensor for a power device that can modulate its consumption.
+
+    State **on** means the device runs, the power it should draw is the
+    ``setpoint`` (W), published by the linked setpoint sensor. The configured
+    ``consumption`` is the maximum setpoint and ``min_power`` is the power
+    needed to start the device.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        min_power: int = 0,
+        power_step: int = DEFAULT_POWER_STEP,
+        ramp_rate: int = DEFAULT_RAMP_RATE,
+        **kwargs: Any,
+    ) -> None:
+        """Initialise the modulating binary sensor."""
+        super().__init__(*args, **kwargs)
+        max_power = super().get_expected_consumption()
+        # Without a minimum the device starts at one step
+        self.controller = SetpointController(
+            min_power=min(min_power or power_step, max_power),
+            max_power=max_power,
+            step=power_step,
+            ramp_rate=ramp_rate,
+        )
+        self.setpoint_sensor: ExcessSolarSetpointSensor | None = None
+        self._setpoint: float = 0.0
+        self._setpoint_changed: Any = None
+
+    @property
+    def setpoint(self) -> float:
+        """Return the power setpoint in Watts (0 while off)."""
+        return self._setpoint
+
+    def get_consumption(self) -> float:
+        """Return device consumption in Watts.
+
+        Uses ``consumption_entity`` when available, the setpoint otherwise.
+        """
+        if (measured := self._get_measured_consumption()) is not None:
+            return measured
+        return self._setpoint if self._attr_is_on else 0.0
+
+    def get_expected_consumption(self) -> float:
+        """Return the power needed to start the device."""
+        return float(self.controller.min_power)
+
+    def _routed_power(self) -> float:
+        return self._setpoint
+
+    def modulate(self, surplus: float) -> float:
+        """Move the setpoint towards the surplus.
+
+        Returns the part of the surplus claimed by this device: the setpoint
+        will follow it over the next evaluations, so it must not be offered
+        to other devices.
+        """
+        claimed = self.controller.headroom(self._setpoint, surplus)
+        if claimed == 0:
+            return 0.0
+
+        now = self.clock.now()
+        elapsed = (now - self._setpoint_changed).total_seconds()
+        setpoint = self.controller.next_setpoint(self._setpoint, claimed, elapsed)
+        if setpoint != self._setpoint:
+            _LOGGER.debug(
+                "Sensor %s: setpoint %.0fW -> %.0fW (surplus %.1fW)",
+                self.name,
+                self._setpoint,
+                setpoint,
+                surplus,
+            )
+            self._set_setpoint(setpoint, now)
+            self.async_write_ha_state()
+        return claimed
+
+    def activate(self) -> None:
+        """Turn on at the minimum setpoint."""
+        self._set_setpoint(self.controller.min_power, self.clock.now())
+        super().activate()
+
+    def deactivate(self) -> None:
+        """Turn off and drop the setpoint to 0."""
+        self._set_setpoint(0.0, self.clock.now())
+        super().deactivate()
+
+    def _restore_state(self, is_on: bool, attributes: Mapping[str, Any]) -> None:
+        super()._restore_state(is_on, attributes)
+        setpoint = attributes.get("setpoint_w") if is_on else None
+        if isinstance(setpoint, (int, float)):
+            setpoint = min(
+                max(setpoint, self.controller.min_power), self.controller.max_power
+            )
+        else:
+            setpoint = self.controller.min_power if is_on else 0.0
+        self._set_setpoint(float(setpoint), self.clock.now())
+
+    def _set_setpoint(self, setpoint: float, now: Any) -> None:
+        self._setpoint = setpoint
+        self._setpoint_changed = now
+        if self._attr_is_on:
+            self.statistics.update(True, setpoint, now)
+        if self.setpoint_sensor is not None:
+            self.setpoint_sensor.update_setpoint(setpoint)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return extra attributes."""
+        attrs = super().extra_state_attributes
+        attrs["setpoint_w"] = self._setpoint
+        attrs["min_power_w"] = self.controller.min_power
+        attrs["max_power_w"] = self.controller.max_power
+        return attrs
+
+
+def _parse_timestamp(value: Any) -> Any:
+    """Return a restored timestamp attribute as datetime, None if missing."""
+    if not isinstance(value, str):
+        return None
+    return dt_util.parse_datetime(value)
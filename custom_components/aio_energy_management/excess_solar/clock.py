@@ -0,0 +1,42 @@
+"""Time source of the Excess Solar manager and sensors.
+
+The manager and its sensors read the time and schedule evaluations only
+through a ``Clock``, so a replay simulator can drive them with virtual time
+(see ``tests/benchmarks``). The default clock uses Home Assistant.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+import homeassistant.util.dt as dt_util
+
+
+class Clock:
+    """Wall clock, monotonic clock and timers of Home Assistant."""
+
+    def now(self) -> datetime:
+        """Return the current local time."""
+        return dt_util.now()
+
+    def monotonic(self) -> float:
+        """Return monotonic seconds for measuring intervals."""
+        return time.monotonic()
+
+    def timestamp(self) -> float:
+        """Return the current time as epoch seconds."""
+        return time.time()
+
+    def call_later(
+        self, hass: HomeAssistant, delay: float, action: Callable[[Any], None]
+    ) -> Callable[[], None]:
+        """Call `action` after `delay` seconds. Returns a cancel callable."""
+        return async_call_later(hass, delay, action)
+
+
+DEFAULT_CLOCK = Clock()
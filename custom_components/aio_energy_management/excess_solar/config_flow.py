@@ -12,18 +12,67 @@ from homeassistant.helpers import selector
 import homeassistant.helpers.config_validation as cv
 
 from ..const import (
+    CONF_ALLOCATION_MODE,
+    CONF_BATTERY_POLICY,
+    CONF_BATTERY_POWER_SENSOR,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_BATTERY_SOC_TARGET,
+    CONF_BATTERY_SPLIT,
     CONF_BUFFER,
     CONF_CONSUMPTION,
     CONF_ENTITY_EXCESS_SOLAR,
+    CONF_EVALUATION_INTERVAL,
+    CONF_EXPORT_LIMIT,
+    CONF_FAST_SHED_THRESHOLD,
+    CONF_FILTER_WINDOW,
+    CONF_FORECAST_ATTRIBUTE,
+    CONF_FORECAST_BASE_LOAD,
+    CONF_FORECAST_ENTITY,
+    CONF_GRID_FILTER,
     CONF_GRID_POWER_SENSOR,
+    CONF_GRID_POWER_SENSOR_L1,
+    CONF_GRID_POWER_SENSOR_L2,
+    CONF_GRID_POWER_SENSOR_L3,
     CONF_IS_ON_SCHEDULE,
+    CONF_MIN_POWER,
     CONF_MINIMUM_OFF_TIME,
     CONF_MINIMUM_ON_TIME,
+    CONF_MODULATING,
     CONF_NAME,
+    CONF_OFF_DELAY,
+    CONF_OFF_THRESHOLD,
+    CONF_ON_DELAY,
+    CONF_ON_THRESHOLD,
+    CONF_PHASE,
     CONF_POWER_DEVICES,
+    CONF_POWER_STEP,
+    CONF_PRICE_ADJUSTMENT,
+    CONF_PRICE_HIGH,
+    CONF_PRICE_LOW,
+    CONF_PRICE_SOURCE,
     CONF_PRIORITY,
+    CONF_RAMP_RATE,
+    CONF_SHADOW_STRATEGIES,
     CONF_UNIQUE_ID,
 )
+from .allocation import ALLOCATION_INCREMENTAL, ALLOCATION_MODES
+from .battery import (
+    BATTERY_FIRST,
+    BATTERY_POLICIES,
+    DEFAULT_BATTERY_SOC_TARGET,
+    DEFAULT_BATTERY_SPLIT,
+)
+from .filters import (
+    DEFAULT_EVALUATION_INTERVAL,
+    DEFAULT_FILTER_WINDOW,
+    FILTER_LAST,
+    FILTER_TYPES,
+)
+from .forecast import DEFAULT_FORECAST_ATTRIBUTE
+from .modulation import DEFAULT_POWER_STEP, DEFAULT_RAMP_RATE
+from .phases import PHASE_ALL, PHASE_OPTIONS
+from .prices import DEFAULT_PRICE_ADJUSTMENT, DEFAULT_PRICE_LOW
+from .shadow import SHADOW_STRATEGIES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +87,237 @@ ACTION_EDIT_SETTINGS = "edit_settings"
 ACTION_ADD_DEVICE = "add_device"
 ACTION_REMOVE_DEVICES = "remove_devices"
 
+# Optional sensors of the control loop, removed from the entry when cleared
+OPTIONAL_SENSOR_KEYS = (
+    CONF_GRID_POWER_SENSOR_L1,
+    CONF_GRID_POWER_SENSOR_L2,
+    CONF_GRID_POWER_SENSOR_L3,
+    CONF_BATTERY_POWER_SENSOR,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_FORECAST_ENTITY,
+)
+
+# Optional control loop settings without a default, removed when cleared
+OPTIONAL_KEYS = (
+    *OPTIONAL_SENSOR_KEYS,
+    CONF_PRICE_SOURCE,
+    CONF_PRICE_HIGH,
+    CONF_EXPORT_LIMIT,
+)
+
+
+def _control_loop_schema(data: dict[str, Any]) -> dict:
+    """Get control loop fields shared by the global and edit settings schemas."""
+    return {
+        **{
+            vol.Optional(
+                key, description={"suggested_value": data.get(key)}
+            ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor"))
+            for key in OPTIONAL_SENSOR_KEYS
+        },
+        vol.Optional(
+            CONF_EVALUATION_INTERVAL,
+            default=int(
+                data.get(CONF_EVALUATION_INTERVAL, DEFAULT_EVALUATION_INTERVAL)
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=3600,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_GRID_FILTER,
+            default=data.get(CONF_GRID_FILTER, FILTER_LAST),
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=FILTER_TYPES,
+                translation_key=CONF_GRID_FILTER,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        ),
+        vol.Optional(
+            CONF_FILTER_WINDOW,
+            default=int(data.get(CONF_FILTER_WINDOW, DEFAULT_FILTER_WINDOW)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=1,
+                max=3600,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_ALLOCATION_MODE,
+            default=data.get(CONF_ALLOCATION_MODE, ALLOCATION_INCREMENTAL),
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=ALLOCATION_MODES,
+                translation_key=CONF_ALLOCATION_MODE,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        ),
+        vol.Optional(
+            CONF_FAST_SHED_THRESHOLD,
+            default=int(data.get(CONF_FAST_SHED_THRESHOLD, 0)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=50000,
+                step=100,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_BATTERY_POLICY,
+            default=data.get(CONF_BATTERY_POLICY, BATTERY_FIRST),
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=BATTERY_POLICIES,
+                translation_key=CONF_BATTERY_POLICY,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        ),
+        vol.Optional(
+            CONF_BATTERY_SOC_TARGET,
+            default=int(data.get(CONF_BATTERY_SOC_TARGET, DEFAULT_BATTERY_SOC_TARGET)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100,
+                step=1,
+                unit_of_measurement="%",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_BATTERY_SPLIT,
+            default=int(data.get(CONF_BATTERY_SPLIT, DEFAULT_BATTERY_SPLIT)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100,
+                step=1,
+                unit_of_measurement="%",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_FORECAST_ATTRIBUTE,
+            default=data.get(CONF_FORECAST_ATTRIBUTE, DEFAULT_FORECAST_ATTRIBUTE),
+        ): cv.string,
+        vol.Optional(
+            CONF_FORECAST_BASE_LOAD,
+            default=int(data.get(CONF_FORECAST_BASE_LOAD, 0)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=50000,
+                step=10,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_PRICE_SOURCE,
+            description={"suggested_value": data.get(CONF_PRICE_SOURCE)},
+        ): cv.string,
+        vol.Optional(
+            CONF_PRICE_LOW,
+            default=float(data.get(CONF_PRICE_LOW, DEFAULT_PRICE_LOW)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                step="any", mode=selector.NumberSelectorMode.BOX
+            )
+        ),
+        vol.Optional(
+            CONF_PRICE_HIGH,
+            description={"suggested_value": data.get(CONF_PRICE_HIGH)},
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                step="any", mode=selector.NumberSelectorMode.BOX
+            )
+        ),
+        vol.Optional(
+            CONF_PRICE_ADJUSTMENT,
+            default=int(data.get(CONF_PRICE_ADJUSTMENT, DEFAULT_PRICE_ADJUSTMENT)),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=50000,
+                step=10,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_SHADOW_STRATEGIES,
+            default=list(data.get(CONF_SHADOW_STRATEGIES, [])),
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=SHADOW_STRATEGIES,
+                translation_key=CONF_SHADOW_STRATEGIES,
+                multiple=True,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        ),
+        vol.Optional(
+            CONF_EXPORT_LIMIT,
+            description={"suggested_value": data.get(CONF_EXPORT_LIMIT)},
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=50000,
+                step=10,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+    }
+
+
+def _process_control_loop_input(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Return control loop settings from user input."""
+    return {
+        **{
+            key: user_input[key]
+            for key in OPTIONAL_KEYS
+            if user_input.get(key) not in (None, "")
+        },
+        CONF_EVALUATION_INTERVAL: int(
+            user_input.get(CONF_EVALUATION_INTERVAL, DEFAULT_EVALUATION_INTERVAL)
+        ),
+        CONF_GRID_FILTER: user_input.get(CONF_GRID_FILTER, FILTER_LAST),
+        CONF_FILTER_WINDOW: int(
+            user_input.get(CONF_FILTER_WINDOW, DEFAULT_FILTER_WINDOW)
+        ),
+        CONF_ALLOCATION_MODE: user_input.get(
+            CONF_ALLOCATION_MODE, ALLOCATION_INCREMENTAL
+        ),
+        CONF_FAST_SHED_THRESHOLD: int(user_input.get(CONF_FAST_SHED_THRESHOLD, 0)),
+        CONF_BATTERY_POLICY: user_input.get(CONF_BATTERY_POLICY, BATTERY_FIRST),
+        CONF_BATTERY_SOC_TARGET: int(
+            user_input.get(CONF_BATTERY_SOC_TARGET, DEFAULT_BATTERY_SOC_TARGET)
+        ),
+        CONF_BATTERY_SPLIT: int(
+            user_input.get(CONF_BATTERY_SPLIT, DEFAULT_BATTERY_SPLIT)
+        ),
+        CONF_FORECAST_ATTRIBUTE: user_input.get(
+            CONF_FORECAST_ATTRIBUTE, DEFAULT_FORECAST_ATTRIBUTE
+        ),
+        CONF_FORECAST_BASE_LOAD: int(user_input.get(CONF_FORECAST_BASE_LOAD, 0)),
+        CONF_PRICE_LOW: float(user_input.get(CONF_PRICE_LOW, DEFAULT_PRICE_LOW)),
+        CONF_PRICE_ADJUSTMENT: int(
+            user_input.get(CONF_PRICE_ADJUSTMENT, DEFAULT_PRICE_ADJUSTMENT)
+        ),
+        CONF_SHADOW_STRATEGIES: list(user_input.get(CONF_SHADOW_STRATEGIES, [])),
+    }
+
 
 def _get_excess_solar_global_schema(
     user_input: dict[str, Any] | None = None,
@@ -69,6 +349,7 @@ def _get_excess_solar_global_schema(
                     mode=selector.NumberSelectorMode.BOX,
                 )
             ),
+            **_control_loop_schema(user_input or {}),
         }
     )
 
@@ -95,6 +376,7 @@ def _get_excess_solar_edit_settings_schema(
                     mode=selector.NumberSelectorMode.BOX,
                 )
             ),
+            **_control_loop_schema(entry_data),
         }
     )
 
@@ -112,6 +394,11 @@ def _build_device_schema_defaults(
             "is_on_schedule": None,
             "minimum_on_time": 0,
             "minimum_off_time": None,
+            "modulating": False,
+            "min_power": 0,
+            "power_step": DEFAULT_POWER_STEP,
+            "ramp_rate": DEFAULT_RAMP_RATE,
+            "phase": PHASE_ALL,
         }
 
     # When consumption is an entity string from a previous submission
@@ -129,6 +416,15 @@ def _build_device_schema_defaults(
         "is_on_schedule": user_input.get(CONF_IS_ON_SCHEDULE),
         "minimum_on_time": int(user_input.get(CONF_MINIMUM_ON_TIME, 0)),
         "minimum_off_time": user_input.get(CONF_MINIMUM_OFF_TIME),
+        "modulating": bool(user_input.get(CONF_MODULATING, False)),
+        "min_power": int(user_input.get(CONF_MIN_POWER, 0)),
+        "power_step": int(user_input.get(CONF_POWER_STEP, DEFAULT_POWER_STEP)),
+        "ramp_rate": int(user_input.get(CONF_RAMP_RATE, DEFAULT_RAMP_RATE)),
+        "phase": user_input.get(CONF_PHASE, PHASE_ALL),
+        "on_threshold": int(user_input.get(CONF_ON_THRESHOLD, 0)),
+        "off_threshold": int(user_input.get(CONF_OFF_THRESHOLD, 0)),
+        "on_delay": int(user_input.get(CONF_ON_DELAY, 0)),
+        "off_delay": int(user_input.get(CONF_OFF_DELAY, 0)),
     }
 
 
@@ -197,6 +493,98 @@ def _get_excess_solar_device_schema(
                 mode=selector.NumberSelectorMode.BOX,
             )
         ),
+        vol.Optional(
+            CONF_ON_THRESHOLD,
+            default=d["on_threshold"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100000,
+                step=1,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_OFF_THRESHOLD,
+            default=d["off_threshold"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100000,
+                step=1,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_ON_DELAY,
+            default=d["on_delay"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=3600,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_OFF_DELAY,
+            default=d["off_delay"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=3600,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_MODULATING, default=d["modulating"]): cv.boolean,
+        vol.Optional(
+            CONF_MIN_POWER,
+            default=d["min_power"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100000,
+                step=10,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_POWER_STEP,
+            default=d["power_step"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=1,
+                max=10000,
+                step=1,
+                unit_of_measurement="W",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_RAMP_RATE,
+            default=d["ramp_rate"],
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=10000,
+                step=1,
+                unit_of_measurement="W/s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_PHASE, default=d["phase"]): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=PHASE_OPTIONS,
+                translation_key=CONF_PHASE,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        ),
     }
 
     return vol.Schema(schema_dict)
@@ -237,6 +625,28 @@ def _process_device_input(
     if minimum_off_time is not None:
         device[CONF_MINIMUM_OFF_TIME] = int(minimum_off_time)
 
+    device[CONF_PHASE] = user_input.get(CONF_PHASE, PHASE_ALL)
+
+    for hysteresis_key in (
+        CONF_ON_THRESHOLD,
+        CONF_OFF_THRESHOLD,
+        CONF_ON_DELAY,
+        CONF_OFF_DELAY,
+    ):
+        if value := int(user_input.get(hysteresis_key, 0)):
+            device[hysteresis_key] = value
+
+    if user_input.get(CONF_MODULATING):
+        device[CONF_MODULATING] = True
+        device[CONF_MIN_POWER] = int(user_input.get(CONF_MIN_POWER, 0))
+        device[CONF_POWER_STEP] = int(
+            user_input.get(CONF_POWER_STEP, DEFAULT_POWER_STEP)
+        )
+        device[CONF_RAMP_RATE] = int(user_input.get(CONF_RAMP_RATE, DEFAULT_RAMP_RATE))
+        # The configured consumption is the maximum setpoint
+        if device[CONF_MIN_POWER] > device[CONF_CONSUMPTION]:
+            errors[CONF_MIN_POWER] = "min_power_over_consumption"
+
     return device, errors
 
 
@@ -257,6 +667,7 @@ class ExcessSolarConfigFlowMixin:
         """Configure global excess solar settings (first step for new entries)."""
         if user_input is not None:
             user_input[CONF_BUFFER] = int(user_input.get(CONF_BUFFER, 0))
+            user_input.update(_process_control_loop_input(user_input))
             self._config_data.update(user_input)
             self._config_data[CONF_POWER_DEVICES] = []
             return await self.async_step_excess_solar_device()
@@ -379,6 +790,9 @@ class ExcessSolarConfigFlowMixin:
             new_data = dict(self._config_entry.data)
             new_data[CONF_GRID_POWER_SENSOR] = user_input[CONF_GRID_POWER_SENSOR]
             new_data[CONF_BUFFER] = int(user_input.get(CONF_BUFFER, 0))
+            for key in OPTIONAL_KEYS:
+                new_data.pop(key, None)
+            new_data.update(_process_control_loop_input(user_input))
             new_data.pop(CONF_MINIMUM_OFF_TIME, None)
 
             self.hass.config_entries.async_update_entry(
@@ -0,0 +1,86 @@
+"""Learned consumption of Excess Solar devices.
+
+The configured ``consumption`` of a device is often only a rating: a heater
+or pump may draw a lot more (or less) when it actually runs. Planning with
+the rating gives poor fits, e.g. a device turned on with too little surplus
+and shed again on the next evaluation.
+
+Every device keeps an exponentially weighted estimate of what it draws while
+on. The manager feeds it with:
+
+- the reading of the ``consumption_entity`` on every evaluation while the
+  device is on, or
+- without one, the step of the grid power after the device was turned on on
+  its own. Steps far from the configured consumption (solar changing at the
+  same time) are ignored.
+
+Once the estimate has ``DEFAULT_MIN_SAMPLES`` samples it replaces the
+configured consumption in planning. The estimates are stored in the
+coordinator store, so they survive restarts.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+DEFAULT_LEARNING_RATE = 0.3  # weight of a new sample
+DEFAULT_MIN_SAMPLES = 3  # samples before the estimate is used
+DEFAULT_SAVE_INTERVAL = 600  # seconds between saving changed estimates
+
+# Grid steps outside these shares of the configured consumption are ignored
+MIN_STEP_RATIO = 0.5
+MAX_STEP_RATIO = 2.0
+
+
+class ConsumptionModel:
+    """Exponentially weighted consumption estimate of a device."""
+
+    def __init__(
+        self,
+        learning_rate: float = DEFAULT_LEARNING_RATE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> None:
+        """Init model without samples."""
+        self.learning_rate = learning_rate
+        self.min_samples = min_samples
+        self.watts: float | None = None
+        self.samples = 0
+
+    @property
+    def learned(self) -> bool:
+        """Return True when the estimate is used for planning."""
+        return self.watts is not None and self.samples >= self.min_samples
+
+    def observe(self, watts: float) -> None:
+        """Add a measured consumption (W)."""
+        if self.watts is None:
+            self.watts = watts
+        else:
+            self.watts += self.learning_rate * (watts - self.watts)
+        self.samples += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stored form of the estimate."""
+        return {
+            "watts": round(self.watts, 1) if self.watts is not None else None,
+            "samples": self.samples,
+        }
+
+    def restore(self, data: Mapping[str, Any]) -> None:
+        """Continue from a stored estimate, ignored if not valid."""
+        try:
+            watts = float(data["watts"])
+            samples = int(data["samples"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if watts > 0 and samples > 0:
+            self.watts = watts
+            self.samples = samples
+
+
+def plausible_step(step: float, configured: float) -> bool:
+    """Return True if a grid power step can be the device turning on."""
+    return configured > 0 and (
+        MIN_STEP_RATIO * configured <= step <= MAX_STEP_RATIO * configured
+    )
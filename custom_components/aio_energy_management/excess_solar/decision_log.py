@@ -0,0 +1,111 @@
+"""Decision log of the Excess Solar manager.
+
+Every evaluation (and fast shed) records what the manager decided and why in
+a fixed size ring buffer. The slots are allocated once and overwritten in
+place, so recording stays cheap enough to be always on with chatty grid
+sensors. Entries are converted to dicts only when read by the diagnostics or
+the ``query_excess_solar_decisions`` service.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import homeassistant.util.dt as dt_util
+
+DEFAULT_DECISION_LOG_SIZE = 256
+
+ACTION_NONE = "none"
+ACTION_ACTIVATE = "activate"
+ACTION_DEACTIVATE = "deactivate"
+ACTION_SWAP = "swap"
+ACTION_ALLOCATE = "allocate"
+ACTION_FAST_SHED = "fast_shed"
+
+REASON_SURPLUS = "surplus"
+REASON_FORECAST_WINDOW = "forecast_window"
+REASON_SWAP = "swap"
+REASON_EXPORT_LIMIT = "export_limit"
+REASON_IMPORT = "import"
+REASON_PHASE_IMPORT = "phase_import"
+REASON_PLAN = "plan"
+REASON_FAST_SHED = "fast_shed_threshold"
+REASON_WITHIN_BUFFER = "within_buffer"
+REASON_GUARD_BLOCKED = "guard_blocked"
+REASON_HYSTERESIS = "hysteresis"
+REASON_NO_FIT = "no_fit"
+REASON_NO_CHANGE = "no_change"
+REASON_DISABLED = "disabled"
+
+# Slot fields
+_TIME = 0
+_GRID_POWER = 1
+_FILTERED = 2
+_ACTION = 3
+_DEVICES = 4
+_REASON = 5
+_DURATION = 6
+
+
+class DecisionLog:
+    """Ring buffer of the most recent decisions."""
+
+    def __init__(self, size: int = DEFAULT_DECISION_LOG_SIZE) -> None:
+        """Init log with `size` preallocated slots."""
+        self.size = size
+        self._slots: list[list[Any]] = [
+            [0.0, None, None, ACTION_NONE, (), "", 0.0] for _ in range(size)
+        ]
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of recorded decisions."""
+        return self._count
+
+    def record(
+        self,
+        timestamp: float,
+        grid_power: float | None,
+        filtered: float | None,
+        action: str,
+        devices: tuple[str, ...],
+        reason: str,
+        duration: float,
+    ) -> None:
+        """Overwrite the oldest slot. `timestamp` in epoch seconds."""
+        slot = self._slots[self._next]
+        slot[_TIME] = timestamp
+        slot[_GRID_POWER] = grid_power
+        slot[_FILTERED] = filtered
+        slot[_ACTION] = action
+        slot[_DEVICES] = devices
+        slot[_REASON] = reason
+        slot[_DURATION] = duration
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def entries(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return recorded decisions, oldest first, at most `limit` newest."""
+        count = self._count if limit is None else min(limit, self._count)
+        first = (self._next - count) % self.size
+        return [
+            _as_dict(self._slots[(first + index) % self.size]) for index in range(count)
+        ]
+
+    def clear(self) -> None:
+        """Forget all decisions."""
+        self._next = 0
+        self._count = 0
+
+
+def _as_dict(slot: list[Any]) -> dict[str, Any]:
+    return {
+        "time": dt_util.as_local(dt_util.utc_from_timestamp(slot[_TIME])).isoformat(),
+        "grid_power": slot[_GRID_POWER],
+        "filtered": slot[_FILTERED],
+        "action": slot[_ACTION],
+        "devices": list(slot[_DEVICES]),
+        "reason": slot[_REASON],
+        "duration_ms": round(slot[_DURATION] * 1000, 3),
+    }
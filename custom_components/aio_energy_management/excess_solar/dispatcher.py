@@ -0,0 +1,146 @@
+"""Shared grid reading dispatcher for Excess Solar managers.
+
+Several excess solar instances usually watch the same grid (and battery)
+sensors. The dispatcher subscribes once per entity, parses every reading once
+and hands the value to all managers watching the entity. Managers with the
+same evaluation interval share one timer, so their evaluations are aligned on
+a common tick instead of each manager scheduling its own.
+
+There is one dispatcher per Home Assistant instance and clock, see
+``get_dispatcher``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import (
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+
+from ..const import DOMAIN
+from .clock import Clock
+
+if TYPE_CHECKING:
+    from .manager import ExcessSolarManager
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DISPATCHERS = f"{DOMAIN}_excess_solar_dispatchers"
+
+
+def parse_power(entity_id: str, state: State | None) -> float | None:
+    """Return the power (W) of a state, None if not available."""
+    if state is None or state.state in ("unknown", "unavailable", None):
+        return None
+    try:
+        return float(state.state)
+    except ValueError:
+        _LOGGER.warning("Cannot parse power from %s: '%s'", entity_id, state.state)
+        return None
+
+
+class GridDispatcher:
+    """Fan grid readings and evaluation ticks out to the managers."""
+
+    def __init__(self, hass: HomeAssistant, clock: Clock) -> None:
+        """Init dispatcher."""
+        self._hass = hass
+        self._clock = clock
+        self._listeners: dict[str, list[ExcessSolarManager]] = {}
+        self._cancel_tracking: dict[str, Callable[[], None]] = {}
+        # Managers waiting for the tick of an interval, in request order
+        self._due: dict[float, dict[ExcessSolarManager, None]] = {}
+        self._tick_handles: dict[float, Callable[[], None]] = {}
+        self.readings = 0  # parsed readings
+
+    @property
+    def entities(self) -> set[str]:
+        """Return the tracked entities."""
+        return set(self._cancel_tracking)
+
+    def subscribe(
+        self, manager: ExcessSolarManager, entity_ids: Iterable[str]
+    ) -> Callable[[], None]:
+        """Send readings of the entities to the manager.
+
+        Returns a callable removing the subscription.
+        """
+        entity_ids = list(entity_ids)
+        for entity_id in entity_ids:
+            self._listeners.setdefault(entity_id, []).append(manager)
+            if entity_id not in self._cancel_tracking:
+                self._cancel_tracking[entity_id] = async_track_state_change_event(
+                    self._hass, [entity_id], self._async_state_changed
+                )
+
+        def unsubscribe() -> None:
+            self._unsubscribe(manager, entity_ids)
+
+        return unsubscribe
+
+    def _unsubscribe(self, manager: ExcessSolarManager, entity_ids: list[str]) -> None:
+        for entity_id in entity_ids:
+            listeners = self._listeners.get(entity_id, [])
+            if manager in listeners:
+                listeners.remove(manager)
+            if not listeners and entity_id in self._cancel_tracking:
+                self._cancel_tracking.pop(entity_id)()
+                self._listeners.pop(entity_id, None)
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        entity_id = event.data["entity_id"]
+        power = parse_power(entity_id, event.data["new_state"])
+        if power is None:
+            return
+        self.readings += 1
+        for manager in list(self._listeners.get(entity_id, ())):
+            manager.on_power_reading(entity_id, power)
+
+    def request_tick(self, manager: ExcessSolarManager, interval: float) -> None:
+        """Call ``manager.on_tick()`` on the next tick of the interval.
+
+        The first request starts the tick timer of the interval, later
+        requests join the same tick.
+        """
+        self._due.setdefault(interval, {})[manager] = None
+        if interval in self._tick_handles:
+            return
+
+        @callback
+        def _fire(_now: Any) -> None:
+            self._tick_handles.pop(interval, None)
+            for due in list(self._due.pop(interval, {})):
+                due.on_tick()
+
+        self._tick_handles[interval] = self._clock.call_later(
+            self._hass, interval, _fire
+        )
+
+    def cancel_tick(self, manager: ExcessSolarManager) -> None:
+        """Drop the pending tick requests of the manager."""
+        for interval in list(self._due):
+            due = self._due[interval]
+            due.pop(manager, None)
+            if not due:
+                del self._due[interval]
+                if (cancel := self._tick_handles.pop(interval, None)) is not None:
+                    cancel()
+
+
+def get_dispatcher(hass: HomeAssistant, clock: Clock) -> GridDispatcher:
+    """Return the dispatcher of the clock, created on first use."""
+    dispatchers: dict[Clock, GridDispatcher] = hass.data.setdefault(
+        DATA_DISPATCHERS, {}
+    )
+    if (dispatcher := dispatchers.get(clock)) is None:
+        dispatcher = dispatchers[clock] = GridDispatcher(hass, clock)
+    return dispatcher
@@ -0,0 +1,81 @@
+"""Export limit control of the Excess Solar manager.
+
+Some sites may only export up to a fixed power. With an ``export_limit`` the
+manager no longer turns devices on whenever the surplus covers them: it
+keeps the export at the limit and only uses devices for the export over it.
+
+A PI controller runs on the filtered grid power of every evaluation. Its
+error is the export over the limit (negative below the limit) and its
+output is the load (W) the devices should add, the error plus the integral
+of the error over ``DEFAULT_INTEGRAL_TIME`` seconds. The integral makes a
+small but lasting overshoot act in the end, it is clamped to
+``DEFAULT_INTEGRAL_LIMIT`` W and cleared whenever a device is switched.
+
+The output is offered to the running modulating devices first, as the
+surplus is in the surplus mode. Switching devices then follow the usual
+guards and priority order:
+
+- an output over the buffer turns on the next device that fits the export
+  (no import),
+- an output under minus the buffer turns off the lowest priority device the
+  headroom under the limit can take, so turning it off does not push the
+  export over the limit.
+
+Import over the buffer still sheds devices as in the surplus mode.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+DEFAULT_INTEGRAL_TIME = 300  # seconds
+DEFAULT_INTEGRAL_LIMIT = 1000  # W
+
+
+class ExportLimitController:
+    """PI controller of the export towards the export limit."""
+
+    def __init__(
+        self,
+        limit: float,
+        integral_time: float = DEFAULT_INTEGRAL_TIME,
+        integral_limit: float = DEFAULT_INTEGRAL_LIMIT,
+    ) -> None:
+        """Init controller. `limit` and `integral_limit` in W."""
+        self.limit = limit
+        self.integral_time = integral_time
+        self.integral_limit = integral_limit
+        self.error = 0.0  # W over the limit on the last update
+        self.integral = 0.0  # W
+        self.output = 0.0  # W
+        self._updated: float | None = None  # monotonic seconds
+
+    def update(self, export: float, now: float) -> float:
+        """Return the load (W) to add for `export` W at monotonic `now`."""
+        self.error = export - self.limit
+        if self._updated is not None and self.integral_time > 0:
+            self.integral += self.error * (now - self._updated) / self.integral_time
+            self.integral = max(
+                -self.integral_limit, min(self.integral_limit, self.integral)
+            )
+        self._updated = now
+        self.output = self.error + self.integral
+        return self.output
+
+    def reset(self) -> None:
+        """Clear the integral, e.g. after a device was switched."""
+        self.integral = 0.0
+
+    def stop(self) -> None:
+        """Forget the state, the next update starts over."""
+        self.reset()
+        self._updated = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state for diagnostics."""
+        return {
+            "limit": self.limit,
+            "error": round(self.error, 1),
+            "integral": round(self.integral, 1),
+            "output": round(self.output, 1),
+        }
@@ -0,0 +1,170 @@
+"""Grid power input filters for the Excess Solar manager.
+
+Readings are added on every grid sensor state change and the filtered value is
+read when the manager evaluates. Adding a reading is O(1) (amortized), the
+windowed filters aggregate their ring buffer only when the value is read.
+
+Readings are handled as a step signal: a reading is valid until the next one
+arrives. Home Assistant does not report unchanged states, so the newest reading
+is always kept even if it is older than the window.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import math
+import statistics
+
+FILTER_LAST = "last"
+FILTER_EMA = "ema"
+FILTER_MEDIAN = "median"
+FILTER_MIN = "min"
+FILTER_MAX = "max"
+FILTER_TYPES = [FILTER_LAST, FILTER_EMA, FILTER_MEDIAN, FILTER_MIN, FILTER_MAX]
+
+DEFAULT_EVALUATION_INTERVAL = 30  # seconds between evaluations
+DEFAULT_FILTER_WINDOW = 60  # seconds
+MAX_SAMPLES = 1024  # ring buffer size, bounds memory with very chatty sensors
+
+
+class GridPowerFilter:
+    """Filter returning the latest reading as is."""
+
+    filter_type = FILTER_LAST
+
+    def __init__(self, window: float = DEFAULT_FILTER_WINDOW) -> None:
+        """Init filter with window in seconds."""
+        self.window = window
+        self._last: float | None = None
+
+    def add(self, value: float, now: float) -> None:
+        """Add a reading taken at monotonic time `now`."""
+        self._last = value
+
+    def value(self, now: float) -> float | None:
+        """Return filtered value at monotonic time `now`."""
+        return self._last
+
+    def reset(self) -> None:
+        """Forget all readings."""
+        self._last = None
+
+
+class EmaFilter(GridPowerFilter):
+    """Time based exponential moving average with `window` as time constant."""
+
+    filter_type = FILTER_EMA
+
+    def __init__(self, window: float = DEFAULT_FILTER_WINDOW) -> None:
+        """Init filter."""
+        super().__init__(window)
+        self._ema: float | None = None
+        self._updated: float = 0.0
+
+    def add(self, value: float, now: float) -> None:
+        """Add a reading."""
+        if self._ema is None:
+            self._ema = value
+        else:
+            self._ema = self._decayed(now)
+        self._last = value
+        self._updated = now
+
+    def value(self, now: float) -> float | None:
+        """Return the average including the time the latest reading has been held."""
+        if self._ema is None:
+            return None
+        return self._decayed(now)
+
+    def reset(self) -> None:
+        """Forget all readings."""
+        super().reset()
+        self._ema = None
+
+    def _decayed(self, now: float) -> float:
+        elapsed = max(now - self._updated, 0.0)
+        if self.window <= 0:
+            return self._last
+        alpha = 1.0 - math.exp(-elapsed / self.window)
+        return self._ema + alpha * (self._last - self._ema)
+
+
+class WindowFilter(GridPowerFilter):
+    """Aggregate readings valid during the last `window` seconds."""
+
+    def __init__(self, window: float = DEFAULT_FILTER_WINDOW) -> None:
+        """Init filter."""
+        super().__init__(window)
+        self._samples: deque[tuple[float, float]] = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, value: float, now: float) -> None:
+        """Add a reading."""
+        super().add(value, now)
+        self._samples.append((now, value))
+        self._evict(now)
+
+    def value(self, now: float) -> float | None:
+        """Return aggregate of readings in the window."""
+        self._evict(now)
+        if not self._samples:
+            return None
+        return self._aggregate([value for _, value in self._samples])
+
+    def reset(self) -> None:
+        """Forget all readings."""
+        super().reset()
+        self._samples.clear()
+
+    def _evict(self, now: float) -> None:
+        # The first sample stays while it is still valid at the window start
+        boundary = now - self.window
+        while len(self._samples) > 1 and self._samples[1][0] <= boundary:
+            self._samples.popleft()
+
+    def _aggregate(self, values: list[float]) -> float:
+        raise NotImplementedError
+
+
+class MedianFilter(WindowFilter):
+    """Median of the readings in the window."""
+
+    filter_type = FILTER_MEDIAN
+
+    def _aggregate(self, values: list[float]) -> float:
+        return statistics.median(values)
+
+
+class MinFilter(WindowFilter):
+    """Minimum reading in the window (largest export, optimistic)."""
+
+    filter_type = FILTER_MIN
+
+    def _aggregate(self, values: list[float]) -> float:
+        return min(values)
+
+
+class MaxFilter(WindowFilter):
+    """Maximum reading in the window (largest import, conservative)."""
+
+    filter_type = FILTER_MAX
+
+    def _aggregate(self, values: list[float]) -> float:
+        return max(values)
+
+
+_FILTERS: dict[str, type[GridPowerFilter]] = {
+    FILTER_LAST: GridPowerFilter,
+    FILTER_EMA: EmaFilter,
+    FILTER_MEDIAN: MedianFilter,
+    FILTER_MIN: MinFilter,
+    FILTER_MAX: MaxFilter,
+}
+
+
+def create_filter(
+    filter_type: str = FILTER_LAST, window: float = DEFAULT_FILTER_WINDOW
+) -> GridPowerFilter:
+    """Create a grid power filter of the given type."""
+    if filter_type not in _FILTERS:
+        raise ValueError(f"Unknown grid power filter: {filter_type}")
+    return _FILTERS[filter_type](window)
@@ -0,0 +1,207 @@
+"""Solar forecast planning for the Excess Solar manager.
+
+A forecast entity exposes hourly (or any period) power estimates as an
+attribute, either as a mapping of period start to watts::
+
+    watts:
+      "2024-06-01T08:00:00+00:00": 1200
+      "2024-06-01T09:00:00+00:00": 2300
+
+or as a list of periods::
+
+    forecast:
+      - period_start: "2024-06-01T08:00:00+00:00"
+        watts: 1200
+
+The forecast power minus the expected base load is the surplus capacity of a
+period. Devices with a minimum on-time get a start window: the times a run of
+``minimum_on_time`` fits the remaining capacity, planned greedily in priority
+order so a higher priority device reserves its run first. Inside the window
+the device may start as soon as the grid exports, and a start is refused when
+the forecast shows the surplus ending before the minimum on-time. Without
+forecast data for the current time the manager stays purely reactive.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+import homeassistant.util.dt as dt_util
+
+DEFAULT_FORECAST_ATTRIBUTE = "watts"
+DEFAULT_SLOT_LENGTH = timedelta(hours=1)  # last period, or a single period
+REPLAN_INTERVAL = timedelta(hours=1)
+
+_START_KEYS = ("period_start", "start", "datetime")
+_POWER_KEYS = ("watts", "power", "value")
+
+
+class ForecastSlot:
+    """Forecast power (W) for a period."""
+
+    def __init__(self, start: datetime, end: datetime, power: float) -> None:
+        """Init slot."""
+        self.start = start
+        self.end = end
+        self.power = power
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"ForecastSlot({self.start.isoformat()}, {self.power}W)"
+
+
+class PlanRequest:
+    """A device to plan a start window for."""
+
+    def __init__(self, key: str, power: float, duration: timedelta) -> None:
+        """Init request with power (W) and run duration."""
+        self.key = key
+        self.power = power
+        self.duration = duration
+
+
+def parse_forecast(value: Any) -> list[ForecastSlot]:
+    """Parse a forecast attribute to slots sorted by start time.
+
+    Items that cannot be parsed are skipped.
+    """
+    points: list[tuple[datetime, float]] = []
+    if isinstance(value, Mapping):
+        items: Iterable[tuple[Any, Any]] = value.items()
+    elif isinstance(value, list):
+        items = (
+            (_first(item, _START_KEYS), _first(item, _POWER_KEYS))
+            for item in value
+            if isinstance(item, Mapping)
+        )
+    else:
+        return []
+
+    for start, power in items:
+        start = dt_util.parse_datetime(start) if isinstance(start, str) else start
+        if not isinstance(start, datetime):
+            continue
+        try:
+            points.append((dt_util.as_utc(start), float(power)))
+        except (TypeError, ValueError):
+            continue
+
+    points.sort(key=lambda point: point[0])
+    slots = []
+    for index, (start, power) in enumerate(points):
+        end = (
+            points[index + 1][0]
+            if index + 1 < len(points)
+            else start + DEFAULT_SLOT_LENGTH
+        )
+        slots.append(ForecastSlot(start, end, power))
+    return slots
+
+
+def _first(item: Mapping, keys: tuple[str, ...]) -> Any:
+    return next((item[key] for key in keys if key in item), None)
+
+
+class SolarForecast:
+    """Forecast surplus capacity and the planned start windows."""
+
+    def __init__(self, base_load: float = 0, buffer: float = 0) -> None:
+        """Init forecast. `base_load` (W) is subtracted from the forecast power."""
+        self.base_load = base_load
+        self.buffer = buffer
+        self.slots: list[ForecastSlot] = []
+        self.windows: dict[str, tuple[datetime, datetime]] = {}
+        self.planned_at: datetime | None = None
+
+    def update(self, slots: list[ForecastSlot]) -> None:
+        """Replace the forecast. The windows are kept until the next plan."""
+        self.slots = slots
+        self.planned_at = None
+
+    def needs_plan(self, now: datetime) -> bool:
+        """Return True if the windows are older than the replan interval."""
+        return self.planned_at is None or now - self.planned_at >= REPLAN_INTERVAL
+
+    def plan(self, requests: list[PlanRequest], now: datetime) -> None:
+        """Plan start windows for the requests, highest priority first."""
+        capacity = [self._capacity(slot) for slot in self.slots]
+        self.windows = {}
+        for request in requests:
+            window = self._find_window(request, capacity, now)
+            if window is None:
+                continue
+            self.windows[request.key] = window
+            # Reserve the run from the start of the window
+            self._reserve(
+                capacity, window[0], window[0] + request.duration, request.power
+            )
+        self.planned_at = now
+
+    def covers(self, power: float, start: datetime, duration: timedelta) -> bool | None:
+        """Return True if the forecast surplus covers `power` for the duration.
+
+        Returns None when the forecast does not cover the start time.
+        """
+        end = start + duration
+        slots = [slot for slot in self.slots if slot.end > start and slot.start < end]
+        if not slots or slots[0].start > start:
+            return None
+        reached = start
+        for slot in slots:
+            if slot.start > reached or self._capacity(slot) < power:
+                return False
+            reached = slot.end
+        return reached >= end
+
+    def in_start_window(self, key: str, now: datetime) -> bool:
+        """Return True if `now` is inside the planned start window of a device."""
+        window = self.windows.get(key)
+        return window is not None and window[0] <= now <= window[1]
+
+    def _capacity(self, slot: ForecastSlot) -> float:
+        return slot.power - self.base_load - self.buffer
+
+    def _find_window(
+        self, request: PlanRequest, capacity: list[float], now: datetime
+    ) -> tuple[datetime, datetime] | None:
+        """Return the first (earliest start, latest start) fitting the run."""
+        run_start: datetime | None = None
+        for index, slot in enumerate(self.slots):
+            fits = capacity[index] >= request.power
+            if run_start is not None and (
+                not fits or slot.start > self.slots[index - 1].end
+            ):
+                window = self._window(
+                    run_start, self.slots[index - 1].end, request, now
+                )
+                if window is not None:
+                    return window
+                run_start = None
+            if fits and run_start is None:
+                run_start = slot.start
+        if run_start is not None:
+            return self._window(run_start, self.slots[-1].end, request, now)
+        return None
+
+    @staticmethod
+    def _window(
+        run_start: datetime, run_end: datetime, request: PlanRequest, now: datetime
+    ) -> tuple[datetime, datetime] | None:
+        earliest = max(run_start, now)
+        latest = run_end - request.duration
+        if earliest > latest:
+            return None
+        return earliest, latest
+
+    def _reserve(
+        self,
+        capacity: list[float],
+        start: datetime,
+        end: datetime,
+        power: float,
+    ) -> None:
+        for index, slot in enumerate(self.slots):
+            if slot.end > start and slot.start < end:
+                capacity[index] -= power
@@ -0,0 +1,93 @@
+"""On/off hysteresis of Excess Solar devices.
+
+Every device has a small state machine between the manager's decision and
+the binary sensor state::
+
+    off --> pending_on --> on --> pending_off --> off
+             |                      |
+             +--> off (cancelled)   +--> on (cancelled)
+
+When the manager wants to turn a device on, the device first enters
+``pending_on``. It only turns on once the surplus exceeds what the device
+needs by ``on_threshold`` W and the request has been repeated for
+``on_delay`` seconds. Turning off works the same way with the import over
+the buffer, ``off_threshold`` and ``off_delay``. An evaluation that no longer
+asks for the pending change cancels it: the device keeps its state and the
+two state writes of the flip and flip back are counted as avoided.
+
+With the defaults (all 0) every request is granted at once. Fast shed and
+the devices turned off by a swap bypass the hysteresis.
+"""
+
+from __future__ import annotations
+
+STATE_OFF = "off"
+STATE_PENDING_ON = "pending_on"
+STATE_ON = "on"
+STATE_PENDING_OFF = "pending_off"
+
+# A cancelled flip saves the write of the flip and of the flip back
+WRITES_PER_CANCELLED_FLIP = 2
+
+
+class DeviceHysteresis:
+    """On/off state machine of a single device."""
+
+    def __init__(
+        self,
+        on_threshold: float = 0,
+        off_threshold: float = 0,
+        on_delay: float = 0,
+        off_delay: float = 0,
+    ) -> None:
+        """Init state machine. Thresholds in W, delays in seconds."""
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.on_delay = on_delay
+        self.off_delay = off_delay
+        self.state = STATE_OFF
+        self.writes_avoided = 0
+        self._since = 0.0  # monotonic time the pending state was entered
+
+    @property
+    def pending(self) -> bool:
+        """Return True while a change waits for its threshold or delay."""
+        return self.state in (STATE_PENDING_ON, STATE_PENDING_OFF)
+
+    def request(self, turn_on: bool, margin: float, now: float) -> bool:
+        """Ask for a change. Returns True when it may happen now.
+
+        `margin` is the power (W) by which the change is warranted: surplus
+        over the device's need when turning on, import over the buffer when
+        turning off. `now` is monotonic seconds.
+        """
+        if turn_on:
+            pending, threshold, delay = (
+                STATE_PENDING_ON,
+                self.on_threshold,
+                self.on_delay,
+            )
+        else:
+            pending, threshold, delay = (
+                STATE_PENDING_OFF,
+                self.off_threshold,
+                self.off_delay,
+            )
+        if self.state != pending:
+            self.state = pending
+            self._since = now
+        return margin >= threshold and now - self._since >= delay
+
+    def cancel(self) -> None:
+        """Drop the pending change, the device keeps its state."""
+        if self.state == STATE_PENDING_ON:
+            self.state = STATE_OFF
+        elif self.state == STATE_PENDING_OFF:
+            self.state = STATE_ON
+        else:
+            return
+        self.writes_avoided += WRITES_PER_CANCELLED_FLIP
+
+    def sync(self, is_on: bool) -> None:
+        """Follow the device state after it was turned on or off."""
+        self.state = STATE_ON if is_on else STATE_OFF
@@ -0,0 +1,111 @@
+"""Device input table for the Excess Solar manager.
+
+Consumption and schedule entities of all power devices, and the optional
+per-phase grid sensors, are subscribed once when the manager starts. Their
+states are parsed on change and kept in plain dicts, so an evaluation reads
+them without state machine lookups or string parsing, no matter how many
+times a value is needed. Flag changes are reported, so the manager can keep
+the eligibility of the devices indexed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+from typing import Any
+
+from homeassistant.core import (
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEDULE_ON_STATES = ("on", "true", "True", "1")
+
+
+class DeviceInputTable:
+    """Parsed states of the entities the power devices depend on."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        numeric_entities: Iterable[str],
+        flag_entities: Iterable[str],
+        on_flag_changed: Callable[[str], None] | None = None,
+    ) -> None:
+        """Init table. Values are read when started.
+
+        `on_flag_changed` is called with the entity id when a flag changes.
+        """
+        self._hass = hass
+        self._numbers: dict[str, float | None] = dict.fromkeys(numeric_entities)
+        self._flags: dict[str, bool] = dict.fromkeys(flag_entities, False)
+        self._on_flag_changed = on_flag_changed
+        self._cancel_listener: Any = None
+
+    @property
+    def entities(self) -> set[str]:
+        """Return all tracked entities."""
+        return set(self._numbers) | set(self._flags)
+
+    def async_start(self) -> None:
+        """Read the current states and subscribe to changes."""
+        for entity_id in self.entities:
+            self._update(entity_id, self._hass.states.get(entity_id))
+        if self.entities:
+            self._cancel_listener = async_track_state_change_event(
+                self._hass, list(self.entities), self._async_state_changed
+            )
+
+    def async_stop(self) -> None:
+        """Unsubscribe from state changes."""
+        if self._cancel_listener is not None:
+            self._cancel_listener()
+            self._cancel_listener = None
+
+    def has_number(self, entity_id: str) -> bool:
+        """Return True if the numeric entity is tracked."""
+        return entity_id in self._numbers
+
+    def has_flag(self, entity_id: str) -> bool:
+        """Return True if the flag entity is tracked."""
+        return entity_id in self._flags
+
+    def number(self, entity_id: str) -> float | None:
+        """Return the value of a numeric entity, None if not available."""
+        return self._numbers.get(entity_id)
+
+    def flag(self, entity_id: str) -> bool:
+        """Return True if the flag entity is on."""
+        return self._flags.get(entity_id, False)
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        self._update(event.data["entity_id"], event.data["new_state"])
+
+    def _update(self, entity_id: str, state: State | None) -> None:
+        if entity_id in self._numbers:
+            self._numbers[entity_id] = _parse_number(entity_id, state)
+        if entity_id in self._flags:
+            flag = state is not None and state.state in SCHEDULE_ON_STATES
+            changed = flag != self._flags[entity_id]
+            self._flags[entity_id] = flag
+            if changed and self._on_flag_changed is not None:
+                self._on_flag_changed(entity_id)
+
+
+def _parse_number(entity_id: str, state: State | None) -> float | None:
+    """Parse a numeric state, logged once per change when not available."""
+    if state is None:
+        _LOGGER.warning("Entity %s not found", entity_id)
+        return None
+    try:
+        return float(state.state)
+    except ValueError:
+        _LOGGER.warning("Cannot parse power from %s: '%s'", entity_id, state.state)
+        return None
@@ -10,41 +10,147 @@ The manager does NOT directly control any device.  Instead, users create HA
 automations that listen to these binary sensors and turn actual devices on/off
 accordingly.
 
-Short-cycling protection, schedule awareness, enabled checks, and priority
-queue logic all live in this module.
+Short-cycling protection, schedule awareness, enabled checks, and the control
+loop live in this module. The parts it is built from are described in their
+own modules, e.g. ``dispatcher.py`` and ``filters.py`` for the grid readings,
+``priority_index.py`` for the device order and ``allocation.py`` for the
+knapsack allocation mode.
 """
 
 from __future__ import annotations
 
+from functools import partial
 import logging
+import time
 from typing import Any
 
 from homeassistant.core import HomeAssistant, State, callback
-from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.helpers.event import async_track_state_change_event
+import homeassistant.util.dt as dt_util
 
 from ..const import (
+    CONF_ALLOCATION_MODE,
+    CONF_BATTERY_POLICY,
+    CONF_BATTERY_POWER_SENSOR,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_BATTERY_SOC_TARGET,
+    CONF_BATTERY_SPLIT,
     CONF_BUFFER,
     CONF_CONSUMPTION,
+    CONF_EVALUATION_INTERVAL,
+    CONF_EXPORT_LIMIT,
+    CONF_FAST_SHED_THRESHOLD,
+    CONF_FILTER_WINDOW,
+    CONF_FORECAST_ATTRIBUTE,
+    CONF_FORECAST_BASE_LOAD,
+    CONF_FORECAST_ENTITY,
+    CONF_GRID_FILTER,
     CONF_GRID_POWER_SENSOR,
+    CONF_GRID_POWER_SENSOR_L1,
+    CONF_GRID_POWER_SENSOR_L2,
+    CONF_GRID_POWER_SENSOR_L3,
     CONF_IS_ON_SCHEDULE,
+    CONF_MIN_POWER,
     CONF_MINIMUM_OFF_TIME,
     CONF_MINIMUM_ON_TIME,
+    CONF_MODULATING,
     CONF_NAME,
+    CONF_OFF_DELAY,
+    CONF_OFF_THRESHOLD,
+    CONF_ON_DELAY,
+    CONF_ON_THRESHOLD,
+    CONF_PHASE,
+    CONF_POWER_STEP,
+    CONF_PRICE_ADJUSTMENT,
+    CONF_PRICE_HIGH,
+    CONF_PRICE_LOW,
+    CONF_PRICE_SOURCE,
     CONF_PRIORITY,
+    CONF_RAMP_RATE,
+    CONF_SHADOW_STRATEGIES,
+    COORDINATOR,
+    DOMAIN,
 )
-from .binary_sensor import DEFAULT_MINIMUM_OFF_TIME, ExcessSolarBinarySensor
+from .allocation import (
+    ALLOCATION_INCREMENTAL,
+    ALLOCATION_KNAPSACK,
+    AllocationCandidate,
+    plan_allocation,
+)
+from .battery import (
+    BATTERY_FIRST,
+    DEFAULT_BATTERY_SOC_TARGET,
+    DEFAULT_BATTERY_SPLIT,
+    BatteryPolicy,
+)
+from .binary_sensor import (
+    DEFAULT_MINIMUM_OFF_TIME,
+    ExcessSolarBinarySensor,
+    ExcessSolarModulatingBinarySensor,
+)
+from .clock import DEFAULT_CLOCK, Clock
 from .config_flow import CONF_CONSUMPTION_ENTITY
+from .consumption import DEFAULT_SAVE_INTERVAL, plausible_step
+from .decision_log import (
+    ACTION_ACTIVATE,
+    ACTION_ALLOCATE,
+    ACTION_DEACTIVATE,
+    ACTION_FAST_SHED,
+    ACTION_NONE,
+    ACTION_SWAP,
+    DEFAULT_DECISION_LOG_SIZE,
+    REASON_DISABLED,
+    REASON_EXPORT_LIMIT,
+    REASON_FAST_SHED,
+    REASON_FORECAST_WINDOW,
+    REASON_GUARD_BLOCKED,
+    REASON_HYSTERESIS,
+    REASON_IMPORT,
+    REASON_NO_CHANGE,
+    REASON_NO_FIT,
+    REASON_PHASE_IMPORT,
+    REASON_PLAN,
+    REASON_SURPLUS,
+    REASON_SWAP,
+    REASON_WITHIN_BUFFER,
+    DecisionLog,
+)
+from .dispatcher import get_dispatcher, parse_power
+from .export_limit import ExportLimitController
+from .filters import (
+    DEFAULT_EVALUATION_INTERVAL,
+    DEFAULT_FILTER_WINDOW,
+    FILTER_LAST,
+    create_filter,
+)
+from .forecast import (
+    DEFAULT_FORECAST_ATTRIBUTE,
+    PlanRequest,
+    SolarForecast,
+    parse_forecast,
+)
+from .hysteresis import DeviceHysteresis
+from .inputs import DeviceInputTable
+from .modulation import DEFAULT_POWER_STEP, DEFAULT_RAMP_RATE
+from .phases import PHASE_ALL, PHASE_L1, PHASE_L2, PHASE_L3, fits_phases, phase_loads
+from .prices import (
+    DEFAULT_PRICE_ADJUSTMENT,
+    DEFAULT_PRICE_LOW,
+    PricePolicy,
+    PriceTable,
+)
+from .priority_index import PriorityIndex
+from .shadow import ShadowDevice, StrategyStats, create_shadow
+from .statistics import STATISTIC_NAMES, STATISTICS
 
 _LOGGER = logging.getLogger(__name__)
 
-# Default delays
-DEFAULT_ON_OFF_DEBOUNCE = 30  # seconds: debounce solar power transients
-
 
 class ExcessSolarManager:
     """Manages excess solar distribution across registered binary sensors.
 
-    Subscribes to grid power sensor state changes.  On each update (debounced):
+    Subscribes to grid power sensor state changes.  On each evaluation of the
+    filtered grid power:
     - If excess solar available (grid_power < -buffer) → activates the next
       eligible sensor in priority order.
     - If importing (grid_power > +buffer) → deactivates the lowest-priority
@@ -57,17 +163,93 @@ class ExcessSolarManager:
         grid_sensor: str,
         sensors: list[ExcessSolarBinarySensor],
         buffer: int = 0,
+        evaluation_interval: int = DEFAULT_EVALUATION_INTERVAL,
+        grid_filter: str = FILTER_LAST,
+        filter_window: int = DEFAULT_FILTER_WINDOW,
+        allocation_mode: str = ALLOCATION_INCREMENTAL,
+        fast_shed_threshold: int = 0,
+        phase_sensors: dict[str, str] | None = None,
+        battery_power_sensor: str | None = None,
+        battery_soc_sensor: str | None = None,
+        battery_policy: str = BATTERY_FIRST,
+        battery_soc_target: float = DEFAULT_BATTERY_SOC_TARGET,
+        battery_split: float = DEFAULT_BATTERY_SPLIT,
+        forecast_entity: str | None = None,
+        forecast_attribute: str = DEFAULT_FORECAST_ATTRIBUTE,
+        forecast_base_load: int = 0,
+        price_source: str | None = None,
+        price_low: float = DEFAULT_PRICE_LOW,
+        price_high: float | None = None,
+        price_adjustment: float = DEFAULT_PRICE_ADJUSTMENT,
+        shadow_strategies: list[str] | None = None,
+        export_limit: float | None = None,
+        clock: Clock = DEFAULT_CLOCK,
+        decision_log_size: int = DEFAULT_DECISION_LOG_SIZE,
     ) -> None:
         """Initialise the manager."""
         self._hass = hass
+        self._clock = clock
         self._grid_sensor = grid_sensor
+        self._phase_sensors: dict[str, str] = phase_sensors or {}
+        self._phase_available: dict[str, float] | None = None  # last evaluation
+        self._battery_power_sensor = battery_power_sensor
+        self._battery_soc_sensor = battery_soc_sensor
+        self._battery = BatteryPolicy(battery_policy, battery_soc_target, battery_split)
+        self._battery_power: float | None = None  # W, positive charging
+        self._forecast_entity = forecast_entity
+        self._forecast_attribute = forecast_attribute
+        self._forecast = (
+            SolarForecast(forecast_base_load, buffer) if forecast_entity else None
+        )
+        self._cancel_forecast_listener: Any = None
+        self._price_source = price_source
+        self._price_policy = PricePolicy(price_low, price_high, price_adjustment)
+        self._prices: PriceTable | None = None
+        self._price: float | None = None  # price on last evaluation
+        self._cancel_price_listener: Any = None
         self._buffer = buffer
-        self._sensors: list[ExcessSolarBinarySensor] = sensors
-        self.sort_sensors()
+        self._export_limit = (
+            ExportLimitController(export_limit) if export_limit is not None else None
+        )
+        self._allocation_mode = allocation_mode
+        self._fast_shed_threshold = fast_shed_threshold  # W, 0 disables
+        self._shed_pending: float = 0.0  # W shed since the last evaluation
+        self._fast_shed_count: int = 0
+        self._evaluation_interval = evaluation_interval
+        self._filter = create_filter(grid_filter, filter_window)
+        self._shadows = [
+            create_shadow(name, allocation_mode, grid_filter, filter_window, buffer)
+            for name in shadow_strategies or ()
+        ]
+        self._live = StrategyStats()  # kept only with shadow strategies
+        self._base_surplus = 0.0  # latest export without the managed devices
+        self._index = PriorityIndex()
+        self.sensors = sensors
         self._cancel_listener = None
-        self._pending_handle: Any = None
+        # Sensors not yet added to Home Assistant, waited for at start
+        self._unadded: set[ExcessSolarBinarySensor] = set()
+        self._inputs: DeviceInputTable | None = None
+        # Sensors by schedule entity, while the inputs are tracked
+        self._schedule_sensors: dict[str, list[ExcessSolarBinarySensor]] = {}
+        self._dispatcher = get_dispatcher(hass, clock)
         self._last_grid_power: float | None = None  # most recent reading
+        self._filter_output: float | None = None  # value used on last evaluation
+        self._pending_since: float | None = None  # first unevaluated reading
+        self._reaction_latency: float | None = None  # seconds, last evaluation
+        self._max_reaction_latency: float = 0.0
         self._enabled: bool = True  # master switch state
+        self._decisions = DecisionLog(decision_log_size)
+        # Decision of the running evaluation, see _note()
+        self._action = ACTION_NONE
+        self._action_devices: tuple[str, ...] = ()
+        self._action_reason = REASON_WITHIN_BUFFER
+        # Sensors with a pending hysteresis change, and those asked this time
+        self._hysteresis_pending: set[ExcessSolarBinarySensor] = set()
+        self._hysteresis_requested: set[ExcessSolarBinarySensor] = set()
+        # Sensor turned on alone and the grid power before, see _learn_consumption()
+        self._probe: tuple[ExcessSolarBinarySensor, float] | None = None
+        self._consumption_changed = False
+        self._consumption_saved = 0.0  # monotonic seconds
 
     @property
     def sensors(self) -> list[ExcessSolarBinarySensor]:
@@ -77,44 +259,341 @@ class ExcessSolarManager:
     @sensors.setter
     def sensors(self, value: list[ExcessSolarBinarySensor]) -> None:
         """Set the list of sensors."""
-        self._sensors = value
+        for sensor in value:
+            sensor.state_listener = self.on_sensor_state_changed
+            sensor.added_listener = self.on_sensor_added
+            sensor.clock = self._clock
+        self._index.rebuild(value)
+
+    @property
+    def decision_log(self) -> DecisionLog:
+        """Return the log of recent decisions."""
+        return self._decisions
+
+    @property
+    def writes_avoided(self) -> int:
+        """Return the device state writes avoided by hysteresis."""
+        return sum(s.hysteresis.writes_avoided for s in self._sensors)
+
+    @property
+    def _sensors(self) -> list[ExcessSolarBinarySensor]:
+        """Return sensors sorted by priority (lower number = higher priority)."""
+        return self._index.sensors
 
     def sort_sensors(self) -> None:
         """Sort sensors by priority (lower number = higher priority)."""
-        self._sensors.sort(key=lambda s: s.priority)
+        self._index.rebuild(list(self._index.sensors))
         _LOGGER.debug(
             "Sensors sorted by priority: %s",
             [(s.name, s.priority) for s in self._sensors],
         )
 
     @callback
-    def on_priority_changed(self) -> None:
-        """Handle priority change - re-sort sensors."""
-        _LOGGER.info("Priority changed, re-sorting sensors")
-        self.sort_sensors()
+    def on_priority_changed(
+        self, sensor: ExcessSolarBinarySensor | None = None
+    ) -> None:
+        """Handle priority change - move the sensor in the priority index.
+
+        Without a sensor, every sensor whose priority changed is moved.
+        """
+        _LOGGER.info("Priority changed, updating sensor order")
+        if sensor is None:
+            self._index.refresh()
+        else:
+            self._index.update(sensor)
+
+    @callback
+    def on_sensor_state_changed(self, sensor: ExcessSolarBinarySensor) -> None:
+        """Handle sensor turned on, off, enabled or disabled.
+
+        Moves the sensor in the priority index.
+        """
+        self._index.update(sensor)
+
+    @callback
+    def on_sensor_added(self, sensor: ExcessSolarBinarySensor) -> None:
+        """Handle sensor added to Home Assistant and restored.
+
+        Resumes once the last sensor the manager waits for was added.
+        """
+        if sensor not in self._unadded:
+            return
+        self._unadded.discard(sensor)
+        if not self._unadded:
+            self._resume()
+
+    @callback
+    def _on_schedule_changed(self, entity_id: str) -> None:
+        """Handle a schedule entity turned on or off."""
+        for sensor in self._schedule_sensors.get(entity_id, ()):
+            self._index.update(sensor)
 
     async def async_start(self) -> None:
         """Subscribe to grid sensor state changes."""
         _LOGGER.debug(
-            "ExcessSolarManager starting – monitoring %s, %d device(s), buffer=%dW",
+            "ExcessSolarManager starting – monitoring %s, %d device(s), buffer=%dW,"
+            " interval=%ds, filter=%s",
             self._grid_sensor,
             len(self._sensors),
             self._buffer,
+            self._evaluation_interval,
+            self._filter.filter_type,
+        )
+        self._start_inputs()
+        self._start_forecast()
+        self._start_prices()
+        self._start_consumption()
+        # Platforms loaded from YAML add the sensors after the start
+        self._unadded = {s for s in self._sensors if s.entity_id is None}
+        if self._unadded:
+            _LOGGER.debug("Waiting for %d sensor(s) to be added", len(self._unadded))
+            return
+        self._resume()
+
+    def _resume(self) -> None:
+        """Continue from the restored sensor states.
+
+        Runs once every sensor is added and restored. The active set is
+        rebuilt from the restored sensor states, the grid sensor is
+        subscribed to and the current grid reading is evaluated right away,
+        so the manager does not wait for the next reading and evaluation
+        interval.
+        """
+        self._index.rebuild(list(self._index.sensors))
+        self._cancel_listener = self._dispatcher.subscribe(
+            self, [self._grid_sensor, *filter(None, [self._battery_power_sensor])]
+        )
+        if self._battery_power_sensor is not None:
+            self._battery_power = parse_power(
+                self._battery_power_sensor,
+                self._hass.states.get(self._battery_power_sensor),
+            )
+        grid_power = parse_power(
+            self._grid_sensor, self._hass.states.get(self._grid_sensor)
+        )
+        if grid_power is None:
+            return
+        _LOGGER.debug(
+            "Resuming with %d active device(s) at %.1fW",
+            len(self._index.active),
+            grid_power,
         )
-        self._cancel_listener = async_track_state_change_event(
+        self._last_grid_power = grid_power
+        now = self._clock.monotonic()
+        self._add_reading(grid_power, now)
+        self._pending_since = now
+        self._async_evaluate_filtered()
+
+    def _start_inputs(self) -> None:
+        """Subscribe to the consumption and schedule entities of the sensors."""
+        self._schedule_sensors = {}
+        for sensor in self._sensors:
+            if sensor.is_on_schedule_entity:
+                self._schedule_sensors.setdefault(
+                    sensor.is_on_schedule_entity, []
+                ).append(sensor)
+        self._inputs = DeviceInputTable(
+            self._hass,
+            numeric_entities=[
+                *(s.consumption_entity for s in self._sensors if s.consumption_entity),
+                *self._phase_sensors.values(),
+                *filter(None, [self._battery_soc_sensor]),
+            ],
+            flag_entities=list(self._schedule_sensors),
+            on_flag_changed=self._on_schedule_changed,
+        )
+        self._inputs.async_start()
+        for sensor in self._sensors:
+            sensor.inputs = self._inputs
+
+    def _start_forecast(self) -> None:
+        """Read the forecast entity and subscribe to its changes."""
+        if self._forecast_entity is None:
+            return
+        self._update_forecast(self._hass.states.get(self._forecast_entity))
+        self._cancel_forecast_listener = async_track_state_change_event(
             self._hass,
-            [self._grid_sensor],
-            self._async_grid_sensor_changed,
+            [self._forecast_entity],
+            self._async_forecast_changed,
+        )
+
+    @callback
+    def _async_forecast_changed(self, event) -> None:
+        """Handle forecast entity state change."""
+        self._update_forecast(event.data.get("new_state"))
+
+    def _update_forecast(self, state: State | None) -> None:
+        """Replace the forecast, replanned on the next evaluation."""
+        if self._forecast is None:
+            return
+        value = state.attributes.get(self._forecast_attribute) if state else None
+        slots = parse_forecast(value)
+        if state is not None and not slots:
+            _LOGGER.warning(
+                "No forecast found in attribute '%s' of %s",
+                self._forecast_attribute,
+                self._forecast_entity,
+            )
+        self._forecast.update(slots)
+
+    def _start_prices(self) -> None:
+        """Read the prices of the price source and follow their changes."""
+        if self._price_source is None:
+            return
+        if (coordinator := self._coordinator()) is None:
+            _LOGGER.warning("No price data available for %s", self._price_source)
+            return
+        self._update_prices(coordinator.data)
+        self._cancel_price_listener = coordinator.async_add_change_listener(
+            lambda _changed, _version: self._update_prices(coordinator.data),
+            [self._price_source],
+        )
+
+    def _update_prices(self, data: dict[str, Any]) -> None:
+        """Rebuild the price table from the coordinator data."""
+        entity_data = data.get(self._price_source) or {}
+        self._prices = PriceTable.from_prices(entity_data.get("prices"))
+        _LOGGER.debug(
+            "Prices of %s: %s",
+            self._price_source,
+            f"{len(self._prices.values)} slot(s)" if self._prices else "none",
+        )
+
+    def _price_adjustment(self) -> float:
+        """Return the surplus adjustment (W) at the current price."""
+        if self._prices is None:
+            self._price = None
+            return 0.0
+        self._price = self._prices.price_at(self._clock.now())
+        return self._price_policy.surplus_adjustment(self._price)
+
+    def _coordinator(self) -> Any:
+        """Return the coordinator, None if not set up."""
+        return self._hass.data.get(DOMAIN, {}).get(COORDINATOR)
+
+    def _start_consumption(self) -> None:
+        """Continue from the stored consumption estimates."""
+        self._consumption_saved = self._clock.monotonic()
+        if (coordinator := self._coordinator()) is None:
+            return
+        models = coordinator.get_consumption_models()
+        for sensor in self._sensors:
+            if (stored := models.get(sensor.unique_id)) is not None:
+                sensor.consumption_model.restore(stored)
+
+    async def _async_save_consumption(self) -> None:
+        """Store the consumption estimates if they changed."""
+        if not self._consumption_changed:
+            return
+        if (coordinator := self._coordinator()) is None:
+            return
+        self._consumption_changed = False
+        self._consumption_saved = self._clock.monotonic()
+        await coordinator.async_set_consumption_models(
+            {
+                sensor.unique_id: sensor.consumption_model.as_dict()
+                for sensor in self._sensors
+                if sensor.consumption_model.samples
+            }
+        )
+
+    def _metered_power(self, exclude: ExcessSolarBinarySensor | None = None) -> float:
+        """Return the power of the running devices reporting their own draw."""
+        return sum(
+            sensor.get_consumption()
+            for sensor in self._index.active
+            if sensor is not exclude
+            and (
+                sensor.consumption_entity
+                or isinstance(sensor, ExcessSolarModulatingBinarySensor)
+            )
         )
 
+    def _probe_activation(
+        self, sensor: ExcessSolarBinarySensor, released: float = 0.0
+    ) -> None:
+        """Measure the grid power step of a sensor turned on alone.
+
+        `released` is the power (W) of the sensors turned off at the same time.
+        """
+        if (
+            sensor.consumption_entity
+            or isinstance(sensor, ExcessSolarModulatingBinarySensor)
+            or self._last_grid_power is None
+        ):
+            return
+        self._probe = (
+            sensor,
+            self._effective_grid_power(self._last_grid_power)
+            - self._metered_power(sensor)
+            - released,
+        )
+
+    def _learn_consumption(self) -> None:
+        """Update the consumption estimates of the running devices."""
+        if self._probe is not None and self._last_grid_power is not None:
+            sensor, before = self._probe
+            step = (
+                self._effective_grid_power(self._last_grid_power)
+                - self._metered_power(sensor)
+                - before
+            )
+            if sensor.is_on and plausible_step(
+                step, sensor.get_configured_consumption()
+            ):
+                sensor.consumption_model.observe(step)
+                self._consumption_changed = True
+                _LOGGER.debug(
+                    "%s: grid step %.1fW after turning on, expecting %.1fW",
+                    sensor.name,
+                    step,
+                    sensor.get_expected_consumption(),
+                )
+        self._probe = None
+
+        for sensor in self._index.active:
+            if sensor.consumption_entity and not isinstance(
+                sensor, ExcessSolarModulatingBinarySensor
+            ):
+                samples = sensor.consumption_model.samples
+                sensor.observe_consumption()
+                if sensor.consumption_model.samples != samples:
+                    self._consumption_changed = True
+
+        if (
+            self._consumption_changed
+            and self._clock.monotonic() - self._consumption_saved
+            >= DEFAULT_SAVE_INTERVAL
+        ):
+            self._hass.async_create_task(self._async_save_consumption())
+
     async def async_stop(self) -> None:
         """Stop listening and cancel pending debounce."""
+        self._unadded = set()
         if self._cancel_listener is not None:
             self._cancel_listener()
             self._cancel_listener = None
-        if self._pending_handle is not None:
-            self._pending_handle()  # async_call_later returns a cancel callable
-            self._pending_handle = None
+        if self._cancel_forecast_listener is not None:
+            self._cancel_forecast_listener()
+            self._cancel_forecast_listener = None
+        if self._cancel_price_listener is not None:
+            self._cancel_price_listener()
+            self._cancel_price_listener = None
+        self._dispatcher.cancel_tick(self)
+        if self._inputs is not None:
+            self._inputs.async_stop()
+            self._inputs = None
+            for sensor in self._sensors:
+                sensor.inputs = None
+        self._filter.reset()
+        for shadow in self._shadows:
+            shadow.filter.reset()
+        if self._export_limit is not None:
+            self._export_limit.stop()
+        self._pending_since = None
+        self._battery_power = None
+        self._probe = None
+        await self._async_save_consumption()
         _LOGGER.debug("ExcessSolarManager stopped")
 
     def async_enable(self) -> None:
@@ -126,77 +605,585 @@ class ExcessSolarManager:
         """Disable the manager (master switch off) and deactivate all sensors."""
         self._enabled = False
         _LOGGER.info("ExcessSolarManager disabled – deactivating all sensors")
-        for sensor in self._sensors:
-            if sensor.is_on:
-                sensor.deactivate()
+        for sensor in list(self._index.active):
+            sensor.deactivate()
 
     @callback
-    def _async_grid_sensor_changed(self, event) -> None:
-        """Handle grid power sensor state change (debounced)."""
-        new_state: State | None = event.data.get("new_state")
-        if new_state is None or new_state.state in ("unknown", "unavailable", None):
+    def on_power_reading(self, entity_id: str, power: float) -> None:
+        """Handle a parsed grid (or battery) power reading.
+
+        Only feeds the filter and makes sure an evaluation is scheduled.
+        """
+        if entity_id == self._battery_power_sensor:
+            self._battery_power = power
+            if self._last_grid_power is None:
+                return
+            grid_power = self._last_grid_power
+        else:
+            grid_power = power
+            self._last_grid_power = grid_power
+
+        now = self._clock.monotonic()
+        self._add_reading(grid_power, now)
+        if self._pending_since is None:
+            self._pending_since = now
+
+        if self._fast_shed_threshold > 0 and grid_power >= self._fast_shed_threshold:
+            self._async_fast_shed(grid_power, now)
+
+        if self._evaluation_interval <= 0:
+            self._async_evaluate_filtered()
             return
-        try:
-            grid_power = float(new_state.state)
-        except ValueError:
-            _LOGGER.warning(
-                "Cannot parse grid power from %s: '%s'",
-                self._grid_sensor,
-                new_state.state,
+
+        # Leading throttle: if a tick is already due, let it run.
+        # The tick reads the filter when it fires, so we don't need to
+        # cancel/reschedule on every sensor update.  This ensures evaluation
+        # fires reliably even when the sensor updates every few seconds
+        # (which would cause a trailing-edge debounce to never fire).
+        # Managers with the same interval share the tick.
+        self._dispatcher.request_tick(self, self._evaluation_interval)
+
+    @callback
+    def on_tick(self) -> None:
+        """Handle the evaluation tick requested from the dispatcher."""
+        self._async_evaluate_filtered()
+
+    def _add_reading(self, grid_power: float, now: float) -> None:
+        """Add a grid power reading to the filter and the shadow strategies."""
+        effective = self._effective_grid_power(grid_power)
+        self._filter.add(effective, now)
+        if not self._shadows:
+            return
+        base_power = effective - self._device_load()
+        self._base_surplus = -base_power
+        for shadow in self._shadows:
+            shadow.add(base_power, now)
+
+    def _device_load(self) -> float:
+        """Return the consumption (W) of the active devices."""
+        return sum(sensor.get_consumption() for sensor in self._index.active)
+
+    def _evaluate_shadows(
+        self,
+        active: list[ExcessSolarBinarySensor],
+        load: float,
+        duration: float,
+    ) -> None:
+        """Count the live decision and evaluate the shadow strategies.
+
+        `active` and `load` are the active sensors and their consumption
+        before the live decision, `duration` its cost in seconds.
+        """
+        now = self._clock.monotonic()
+        self._live.account(self._base_surplus, load, now)
+        self._live.switches += len(set(active).symmetric_difference(self._index.active))
+        self._live.evaluations += 1
+        self._live.evaluation_time += duration
+
+        devices = [
+            ShadowDevice(
+                key=sensor.unique_id,
+                priority=sensor.priority,
+                consumption=sensor.get_expected_consumption(),
+                eligible=sensor.is_enabled() and not sensor.is_on_schedule(),
+                minimum_on=sensor.minimum_on_time.total_seconds(),
+                minimum_off=sensor.minimum_off_time.total_seconds(),
             )
+            for sensor in self._index.sensors
+        ]
+        for shadow in self._shadows:
+            shadow.evaluate(devices, self._base_surplus, now)
+
+    def _battery_soc(self) -> float | None:
+        """Return the battery state of charge (%), None if not known."""
+        if self._inputs is None or not self._battery_soc_sensor:
+            return None
+        return self._inputs.number(self._battery_soc_sensor)
+
+    def _effective_grid_power(self, grid_power: float) -> float:
+        """Return the grid power with the battery policy applied."""
+        if self._battery_power_sensor is None:
+            return grid_power
+        soc = self._battery_soc()
+        return self._battery.grid_power(grid_power, self._battery_power, soc)
+
+    @callback
+    def _async_fast_shed(self, grid_power: float, received: float) -> None:
+        """Deactivate enough sensors at once to cover a large import."""
+        if not self._enabled:
+            return
+        # Devices shed moments ago may not have reached the reading yet
+        deficit = grid_power - self._buffer - self._shed_pending
+        if deficit <= 0:
             return
 
-        _LOGGER.debug("Grid power: %.1fW (buffer ±%dW)", grid_power, self._buffer)
+        started = time.perf_counter()
+        freed = 0.0
+        to_deactivate: list[ExcessSolarBinarySensor] = []
+        for sensor in self._index.eligible_active(lowest_first=True):
+            if freed >= deficit:
+                break
+            if not sensor.can_turn_off():
+                continue
+            freed += sensor.get_consumption()
+            to_deactivate.append(sensor)
+
+        if not to_deactivate:
+            _LOGGER.debug(
+                "Grid import %.1fW over fast shed threshold, nothing to shed",
+                grid_power,
+            )
+            return
 
-        # Always store the latest reading so the evaluation uses fresh data
-        self._last_grid_power = grid_power
+        _LOGGER.info(
+            "Grid import %.1fW over fast shed threshold %dW: deactivating %s (%.1fW)",
+            grid_power,
+            self._fast_shed_threshold,
+            [s.device_entity_id for s in to_deactivate],
+            freed,
+        )
+        for sensor in to_deactivate:
+            sensor.deactivate()
+        self._probe = None
+        self._live.switches += len(to_deactivate)
+        self._shed_pending += freed
+        self._fast_shed_count += 1
+        self._reaction_latency = self._clock.monotonic() - received
+        self._decisions.record(
+            self._clock.timestamp(),
+            grid_power,
+            None,
+            ACTION_FAST_SHED,
+            tuple(s.name for s in to_deactivate),
+            REASON_FAST_SHED,
+            time.perf_counter() - started,
+        )
 
-        # Leading throttle: if a timer is already scheduled, let it run.
-        # The timer will pick up _last_grid_power when it fires, so we don't
-        # need to cancel/reschedule on every sensor update.  This ensures
-        # _async_evaluate fires reliably even when the sensor updates every
-        # few seconds (which would cause a trailing-edge debounce to never fire).
-        if self._pending_handle is not None:
+    @callback
+    def _async_evaluate_filtered(self) -> None:
+        """Evaluate the filter output and record the reaction latency."""
+        now = self._clock.monotonic()
+        grid_power = self._filter.value(now)
+        if grid_power is None:
             return
 
-        @callback
-        def _fire(_now):
-            self._pending_handle = None
-            if self._last_grid_power is not None:
-                self._hass.async_create_task(
-                    self._async_evaluate(self._last_grid_power)
-                )
+        if self._pending_since is not None:
+            self._reaction_latency = now - self._pending_since
+            self._max_reaction_latency = max(
+                self._max_reaction_latency, self._reaction_latency
+            )
+            self._pending_since = None
+        self._filter_output = grid_power
+        self._shed_pending = 0.0
 
-        self._pending_handle = async_call_later(
-            self._hass, DEFAULT_ON_OFF_DEBOUNCE, _fire
+        _LOGGER.debug(
+            "Grid power: %.1fW, filtered (%s): %.1fW",
+            self._last_grid_power,
+            self._filter.filter_type,
+            grid_power,
         )
+        self._hass.async_create_task(self._async_evaluate(grid_power))
 
     async def _async_evaluate(self, grid_power: float) -> None:
+        """Evaluate grid power and record the decision in the decision log."""
+        started = time.perf_counter()
+        self._note(ACTION_NONE, (), REASON_WITHIN_BUFFER)
+        if self._shadows:
+            active = list(self._index.active)
+            load = self._device_load()
+        try:
+            self._learn_consumption()
+            await self._async_decide(grid_power)
+        finally:
+            self._settle_hysteresis()
+            duration = time.perf_counter() - started
+            self._decisions.record(
+                self._clock.timestamp(),
+                self._last_grid_power,
+                grid_power,
+                self._action,
+                self._action_devices,
+                self._action_reason,
+                duration,
+            )
+        if self._shadows:
+            self._evaluate_shadows(active, load, duration)
+
+    def _gate(
+        self, sensor: ExcessSolarBinarySensor, turn_on: bool, margin: float
+    ) -> bool:
+        """Return True if the hysteresis of the sensor lets it turn on/off now."""
+        self._hysteresis_requested.add(sensor)
+        self._hysteresis_pending.add(sensor)
+        allowed = sensor.hysteresis.request(turn_on, margin, self._clock.monotonic())
+        if not allowed:
+            _LOGGER.debug(
+                "%s: %s pending (margin %.1fW)",
+                sensor.name,
+                "turning on" if turn_on else "turning off",
+                margin,
+            )
+        return allowed
+
+    def _settle_hysteresis(self) -> None:
+        """Cancel the pending changes not asked for by this evaluation."""
+        for sensor in self._hysteresis_pending - self._hysteresis_requested:
+            sensor.hysteresis.cancel()
+        self._hysteresis_pending = {
+            sensor for sensor in self._hysteresis_pending if sensor.hysteresis.pending
+        }
+        self._hysteresis_requested.clear()
+
+    def _note(self, action: str, devices: tuple[str, ...], reason: str) -> None:
+        """Set the decision of the running evaluation."""
+        self._action = action
+        self._action_devices = devices
+        self._action_reason = reason
+
+    async def _async_decide(self, grid_power: float) -> None:
         """Evaluate grid power and update binary sensor states."""
         if not self._enabled:
             _LOGGER.debug("ExcessSolarManager is disabled – skipping evaluation")
+            self._note(ACTION_NONE, (), REASON_DISABLED)
             return
-        available_solar = -grid_power  # positive → exporting (solar excess)
+        # positive → exporting (solar excess), adjusted by the price
+        available_solar = -grid_power + self._price_adjustment()
 
         _LOGGER.debug(
-            "Evaluate: grid=%.1fW, available=%.1fW, buffer=%dW",
+            "Evaluate: grid=%.1fW, available=%.1fW, buffer=%dW, price=%s",
             grid_power,
             available_solar,
             self._buffer,
+            self._price,
+        )
+
+        self._plan_forecast()
+        phase_available = self._read_phase_available()
+        self._phase_available = (
+            dict(phase_available) if phase_available is not None else None
         )
+        if self._export_limit is not None:
+            await self._decide_export_limit(available_solar, phase_available)
+            return
+        available_solar -= self._modulate(available_solar, phase_available)
 
-        if available_solar > self._buffer:
-            await self._activate_next(available_solar)
+        phase = self._overloaded_phase(phase_available)
+        if phase is not None and await self._deactivate_last(
+            phase, -phase_available[phase] - self._buffer
+        ):
+            return
+        if abs(available_solar) > self._buffer and (
+            self._allocation_mode == ALLOCATION_KNAPSACK
+        ):
+            await self._allocate(available_solar, phase_available)
+        elif available_solar > self._buffer:
+            await self._activate_next(available_solar, phase_available)
         elif available_solar < -self._buffer:
-            await self._deactivate_last()
+            await self._deactivate_last(deficit=-available_solar - self._buffer)
         else:
             _LOGGER.debug(
                 "Grid power %.1fW within buffer ±%dW – no action",
                 grid_power,
                 self._buffer,
             )
+            self._note(ACTION_NONE, (), REASON_WITHIN_BUFFER)
+
+    async def _decide_export_limit(
+        self, available_solar: float, phase_available: dict[str, float] | None
+    ) -> None:
+        """Keep the export at the export limit, see ``export_limit.py``."""
+        controller = self._export_limit
+        demand = controller.update(available_solar, self._clock.monotonic())
+        claimed = self._modulate(demand, phase_available)
+        demand -= claimed
+        available_solar -= claimed
+        _LOGGER.debug(
+            "Export limit %.1fW: error=%.1fW, demand=%.1fW",
+            controller.limit,
+            controller.error,
+            demand,
+        )
+
+        phase = self._overloaded_phase(phase_available)
+        if phase is not None and await self._deactivate_last(
+            phase, -phase_available[phase] - self._buffer
+        ):
+            controller.reset()
+            return
+        if available_solar < -self._buffer:
+            await self._deactivate_last(deficit=-available_solar - self._buffer)
+        elif demand > self._buffer:
+            await self._activate_next(available_solar, phase_available)
+            if self._action_reason == REASON_SURPLUS:
+                self._action_reason = REASON_EXPORT_LIMIT
+        elif demand < -self._buffer:
+            # Headroom under the limit, with the buffer kept as margin
+            headroom = -controller.error - self._buffer
+            if await self._deactivate_last(deficit=headroom, headroom=headroom):
+                self._action_reason = REASON_EXPORT_LIMIT
+        else:
+            self._note(ACTION_NONE, (), REASON_WITHIN_BUFFER)
+        if self._action != ACTION_NONE:
+            controller.reset()
+
+    def _plan_forecast(self) -> None:
+        """Plan start windows of devices with a minimum on-time when due."""
+        now = dt_util.as_utc(self._clock.now())
+        if self._forecast is None or not self._forecast.needs_plan(now):
+            return
+        self._forecast.plan(
+            [
+                PlanRequest(
+                    sensor.unique_id,
+                    sensor.get_expected_consumption(),
+                    sensor.minimum_on_time,
+                )
+                for sensor in self._index.inactive
+                if sensor.minimum_on_time and sensor.is_enabled()
+            ],
+            now,
+        )
+        _LOGGER.debug("Forecast start windows: %s", self._forecast.windows)
+
+    def _forecast_start(
+        self, sensor: ExcessSolarBinarySensor, consumption: float
+    ) -> bool | None:
+        """Return the forecast opinion on starting a sensor now.
+
+        False refuses the start, True allows an early start inside the planned
+        window and None leaves the decision to the reactive control.
+        """
+        if self._forecast is None or not sensor.minimum_on_time:
+            return None
+        now = dt_util.as_utc(self._clock.now())
+        if self._forecast.covers(consumption, now, sensor.minimum_on_time) is False:
+            return False
+        return True if self._forecast.in_start_window(sensor.unique_id, now) else None
+
+    def _read_phase_available(self) -> dict[str, float] | None:
+        """Return surplus (W) per phase, None without (readable) phase sensors."""
+        if not self._phase_sensors or self._inputs is None:
+            return None
+        phase_available: dict[str, float] = {}
+        for phase, entity_id in self._phase_sensors.items():
+            value = self._inputs.number(entity_id)
+            if value is None:
+                return None
+            phase_available[phase] = -value
+        return phase_available
+
+    def _overloaded_phase(self, phase_available: dict[str, float] | None) -> str | None:
+        """Return the phase importing most over the buffer, if any."""
+        if not phase_available:
+            return None
+        phase = min(phase_available, key=phase_available.__getitem__)
+        if phase_available[phase] < -self._buffer:
+            _LOGGER.debug(
+                "Phase %s importing %.1fW over buffer", phase, -phase_available[phase]
+            )
+            return phase
+        return None
+
+    def _modulate(
+        self, available_solar: float, phase_available: dict[str, float] | None = None
+    ) -> float:
+        """Offer the surplus to running modulating sensors.
+
+        Returns the power claimed by them. Claimed power is also subtracted
+        from ``phase_available``.
+        """
+        if available_solar == 0:
+            return 0.0
+        # Surplus goes to the highest priority first, deficit is taken back
+        # from the lowest priority first
+        ordered = self._sensors if available_solar > 0 else reversed(self._sensors)
+
+        claimed = 0.0
+        for sensor in ordered:
+            remaining = available_solar - claimed
+            if remaining == 0:
+                break
+            if isinstance(sensor, ExcessSolarModulatingBinarySensor):
+                if sensor.is_on and not sensor.is_on_schedule():
+                    offered = self._phase_limit(sensor, remaining, phase_available)
+                    device_claimed = sensor.modulate(offered)
+                    claimed += device_claimed
+                    if phase_available is not None:
+                        for phase, load in phase_loads(
+                            sensor.phase, device_claimed
+                        ).items():
+                            if phase in phase_available:
+                                phase_available[phase] -= load
+            elif remaining > 0 and self._can_activate(
+                sensor, remaining, phase_available
+            ):
+                # Let the switching device have the rest
+                break
+        return claimed
+
+    @staticmethod
+    def _phase_limit(
+        sensor: ExcessSolarBinarySensor,
+        surplus: float,
+        phase_available: dict[str, float] | None,
+    ) -> float:
+        """Limit the surplus offered to a sensor to the surplus of its phases."""
+        if phase_available is None:
+            return surplus
+        for phase, share in phase_loads(sensor.phase, 1.0).items():
+            if phase in phase_available:
+                surplus = min(surplus, phase_available[phase] / share)
+        return surplus
+
+    def _can_activate(
+        self,
+        sensor: ExcessSolarBinarySensor,
+        available_solar: float,
+        phase_available: dict[str, float] | None = None,
+    ) -> bool:
+        """Return True if the sensor could be activated, directly or by a swap."""
+        if (
+            sensor.is_on
+            or sensor.is_on_schedule()
+            or not sensor.is_enabled()
+            or not sensor.can_turn_on()
+        ):
+            return False
+        consumption = sensor.get_expected_consumption()
+        if consumption == 0:
+            return False
+        fits_directly = available_solar >= (consumption - self._buffer) and fits_phases(
+            phase_loads(sensor.phase, consumption), phase_available, self._buffer
+        )
+        return fits_directly or bool(
+            self._find_swap_candidates(
+                sensor, available_solar, consumption, phase_available
+            )
+        )
+
+    async def _allocate(
+        self, available_solar: float, phase_available: dict[str, float] | None = None
+    ) -> None:
+        """Plan the full set of active sensors and apply the difference at once.
+
+        The plan is made on the total surplus. With phase sensors, planned
+        activations that do not fit their phases are left out and the plan is
+        made again, so no device is turned off to make room for them.
+        """
+        excluded: set[str] = set()
+        while True:
+            candidates = [
+                self._allocation_candidate(sensor) for sensor in self._sensors
+            ]
+            for candidate in candidates:
+                if candidate.key in excluded:
+                    candidate.eligible = False
+            target = plan_allocation(candidates, available_solar, self._buffer)
+
+            to_deactivate = [
+                s for s in self._sensors if s.is_on and s.unique_id not in target
+            ]
+            to_activate = [
+                s for s in self._sensors if not s.is_on and s.unique_id in target
+            ]
+            if phase_available is None:
+                break
+            fitting = self._fit_to_phases(
+                to_deactivate, to_activate, dict(phase_available)
+            )
+            if len(fitting) == len(to_activate):
+                break
+            excluded.update(s.unique_id for s in to_activate if s not in fitting)
+        # The whole surplus (or import) over the buffer is the margin
+        margin = abs(available_solar) - self._buffer
+        held = [
+            s
+            for s in (*to_deactivate, *to_activate)
+            if not self._gate(s, not s.is_on, margin)
+        ]
+        if held:
+            to_deactivate = [s for s in to_deactivate if s not in held]
+            to_activate = [s for s in to_activate if s not in held]
+            if not to_deactivate and not to_activate:
+                self._note(ACTION_NONE, tuple(s.name for s in held), REASON_HYSTERESIS)
+                return
+        if not to_deactivate and not to_activate:
+            _LOGGER.debug("Allocation unchanged at %.1fW available", available_solar)
+            self._note(ACTION_NONE, (), REASON_NO_CHANGE)
+            return
 
-    async def _activate_next(self, available_solar: float) -> None:
+        _LOGGER.info(
+            "Excess solar %.1fW: deactivating %s, activating %s",
+            available_solar,
+            [s.device_entity_id for s in to_deactivate],
+            [s.device_entity_id for s in to_activate],
+        )
+        released = sum(s.get_consumption() for s in to_deactivate)
+        # Free the power first
+        for sensor in to_deactivate:
+            sensor.deactivate()
+        for sensor in to_activate:
+            sensor.activate()
+        if len(to_activate) == 1:
+            self._probe_activation(to_activate[0], released)
+        self._note(
+            ACTION_ALLOCATE,
+            tuple(s.name for s in (*to_deactivate, *to_activate)),
+            REASON_PLAN,
+        )
+
+    def _fit_to_phases(
+        self,
+        to_deactivate: list[ExcessSolarBinarySensor],
+        to_activate: list[ExcessSolarBinarySensor],
+        phase_available: dict[str, float],
+    ) -> list[ExcessSolarBinarySensor]:
+        """Return the activations that fit the phases, in priority order."""
+        for sensor in to_deactivate:
+            for phase, load in phase_loads(
+                sensor.phase, sensor.get_consumption()
+            ).items():
+                if phase in phase_available:
+                    phase_available[phase] += load
+
+        fitting = []
+        for sensor in to_activate:
+            loads = phase_loads(sensor.phase, sensor.get_expected_consumption())
+            if not fits_phases(loads, phase_available, self._buffer):
+                _LOGGER.debug("%s does not fit its phase(s), skipping", sensor.name)
+                continue
+            for phase, load in loads.items():
+                if phase in phase_available:
+                    phase_available[phase] -= load
+            fitting.append(sensor)
+        return fitting
+
+    def _allocation_candidate(
+        self, sensor: ExcessSolarBinarySensor
+    ) -> AllocationCandidate:
+        """Return planner snapshot of a sensor."""
+        if sensor.is_on:
+            can_change = not sensor.is_on_schedule() and sensor.can_turn_off()
+            consumption = sensor.get_consumption()
+        else:
+            consumption = sensor.get_expected_consumption()
+            can_change = (
+                not sensor.is_on_schedule()
+                and sensor.can_turn_on()
+                and self._forecast_start(sensor, consumption) is not False
+            )
+        return AllocationCandidate(
+            key=sensor.unique_id,
+            priority=sensor.priority,
+            consumption=consumption,
+            is_on=bool(sensor.is_on),
+            can_change=can_change,
+            eligible=sensor.is_enabled(),
+        )
+
+    async def _activate_next(
+        self, available_solar: float, phase_available: dict[str, float] | None = None
+    ) -> None:
         """Activate the highest-priority eligible sensor.
 
         If the best candidate does not fit within the current solar surplus,
@@ -204,20 +1191,14 @@ class ExcessSolarManager:
         enough power for a swap.  Only the minimum number of lower-priority
         devices needed are deactivated.
         """
-        for sensor in self._sensors:
-            # Already active → skip
-            if sensor.is_on:
-                continue
-            # Schedule or not enabled guard
-            if sensor.is_on_schedule():
-                _LOGGER.debug("%s is on schedule, skipping", sensor.name)
-                continue
-            if not sensor.is_enabled():
-                _LOGGER.debug("%s is disabled, skipping", sensor.name)
-                continue
+        guard_blocked = False
+        # Enabled sensors not on their own schedule. The loop ends on the
+        # first switch, the index is not changed while it is walked.
+        for sensor in self._index.eligible_inactive():
             # Short-cycle guard
             if not sensor.can_turn_on():
                 _LOGGER.debug("%s is not allowed to turn on, skipping", sensor.name)      
+                guard_blocked = True
                 continue
 
             consumption = sensor.get_expected_consumption()
@@ -225,8 +1206,37 @@ class ExcessSolarManager:
                 # Consumption failed, continue to next sensor
                 continue
 
+            forecast_start = self._forecast_start(sensor, consumption)
+            if forecast_start is False:
+                _LOGGER.debug(
+                    "%s: forecast surplus ends before minimum on time, skipping",
+                    sensor.name,
+                )
+                continue
+            if forecast_start:
+                if not self._gate(sensor, True, available_solar - self._buffer):
+                    self._note(ACTION_NONE, (sensor.name,), REASON_HYSTERESIS)
+                    break
+                _LOGGER.info(
+                    "Excess solar %.1fW: starting %s in its forecast window",
+                    available_solar,
+                    sensor.device_entity_id,
+                )
+                sensor.activate()
+                self._probe_activation(sensor)
+                self._note(ACTION_ACTIVATE, (sensor.name,), REASON_FORECAST_WINDOW)
+                break
+
             # Direct fit: enough solar without touching anything else
-            if available_solar >= (consumption - self._buffer):
+            loads = phase_loads(sensor.phase, consumption)
+            if available_solar >= (consumption - self._buffer) and fits_phases(
+                loads, phase_available, self._buffer
+            ):
+                if not self._gate(
+                    sensor, True, available_solar - (consumption - self._buffer)
+                ):
+                    self._note(ACTION_NONE, (sensor.name,), REASON_HYSTERESIS)
+                    break
                 _LOGGER.info(
                     "Excess solar %.1fW: activating sensor for %s"
                     " (priority %d, %.1fW)",
@@ -236,14 +1246,23 @@ class ExcessSolarManager:
                     consumption,
                 )
                 sensor.activate()
+                self._probe_activation(sensor)
+                self._note(ACTION_ACTIVATE, (sensor.name,), REASON_SURPLUS)
                 break
 
             # Swap check: deactivate lower-priority devices to free power
             swap_candidates = self._find_swap_candidates(
-                sensor, available_solar, consumption
+                sensor, available_solar, consumption, phase_available
             )
             if swap_candidates:
                 freed = sum(s.get_consumption() for s in swap_candidates)
+                if not self._gate(
+                    sensor,
+                    True,
+                    available_solar + freed - (consumption - self._buffer),
+                ):
+                    self._note(ACTION_NONE, (sensor.name,), REASON_HYSTERESIS)
+                    break
                 _LOGGER.info(
                     "Swap: freeing %.1fW from %d lower-priority device(s) to"
                     " activate %s (priority %d, %.1fW)",
@@ -256,6 +1275,12 @@ class ExcessSolarManager:
                 for s in swap_candidates:
                     s.deactivate()
                 sensor.activate()
+                self._probe_activation(sensor, freed)
+                self._note(
+                    ACTION_SWAP,
+                    (sensor.name, *(s.name for s in swap_candidates)),
+                    REASON_SWAP,
+                )
                 break
 
             _LOGGER.debug(
@@ -264,12 +1289,24 @@ class ExcessSolarManager:
                 sensor.name,
                 consumption,
             )
+            # A lower priority device kept on by its minimum on-time
+            guard_blocked = guard_blocked or any(
+                s.priority > sensor.priority and not s.can_turn_off()
+                for s in self._index.active
+            )
+        else:
+            self._note(
+                ACTION_NONE,
+                (),
+                REASON_GUARD_BLOCKED if guard_blocked else REASON_NO_FIT,
+            )
 
     def _find_swap_candidates(
         self,
         candidate: ExcessSolarBinarySensor,
         available_solar: float,
         consumption: float,
+        phase_available: dict[str, float] | None = None,
     ) -> list[ExcessSolarBinarySensor]:
         """Return the minimum set of lower-priority sensors to deactivate for a swap.
 
@@ -278,64 +1315,209 @@ class ExcessSolarManager:
         empty list when a valid swap is not possible (e.g. guarded by
         ``minimum_on_time`` or ``is_on_schedule``).
         """
-        # Collect eligible lower-priority active sensors, lowest priority first
-        lower_active = [
-            s
-            for s in reversed(self._sensors)
-            if s.is_on
-            and s.priority > candidate.priority
-            and not s.is_on_schedule()
-            and s.can_turn_off()
-        ]
-
+        # Walk eligible lower-priority active sensors, lowest priority first
         net_available = available_solar
+        net_phases = dict(phase_available) if phase_available is not None else None
+        loads = phase_loads(candidate.phase, consumption)
         to_deactivate: list[ExcessSolarBinarySensor] = []
-        for s in lower_active:
-            net_available += s.get_consumption()
+        for s in self._index.eligible_active(lowest_first=True):
+            if s.priority <= candidate.priority:
+                break
+            if not s.can_turn_off():
+                continue
+            freed = s.get_consumption()
+            net_available += freed
+            if net_phases is not None:
+                for phase, load in phase_loads(s.phase, freed).items():
+                    if phase in net_phases:
+                        net_phases[phase] += load
             to_deactivate.append(s)
-            if net_available >= (consumption - self._buffer):
+            if net_available >= (consumption - self._buffer) and fits_phases(
+                loads, net_phases, self._buffer
+            ):
                 return to_deactivate
 
         return []  # not enough even with all lower-priority sensors off
 
-    async def _deactivate_last(self) -> None:
-        """Deactivate the lowest-priority currently active sensor."""
-        for sensor in reversed(self._sensors):
-            if not sensor.is_on:
+    async def _deactivate_last(
+        self,
+        phase: str | None = None,
+        deficit: float = float("inf"),
+        headroom: float = float("inf"),
+    ) -> bool:
+        """Deactivate the lowest-priority currently active sensor.
+
+        With `phase`, only sensors drawing from that phase are considered.
+        `deficit` is the import (W) over the buffer, checked against the off
+        threshold of the sensor. Sensors consuming more than `headroom` (W)
+        are skipped. Returns True if a sensor was deactivated.
+        """
+        guard_blocked = False
+        # Schedule-controlled devices are not eligible, left alone
+        for sensor in self._index.eligible_active(lowest_first=True):
+            if phase is not None and phase not in phase_loads(sensor.phase, 0):
                 continue
-            # Don't interfere with schedule-controlled devices
-            if sensor.is_on_schedule():
-                _LOGGER.debug("%s is on schedule, not deactivating", sensor.name)
+            if sensor.get_consumption() > headroom:
                 continue
             # Minimum period guard
             if not sensor.can_turn_off():
+                guard_blocked = True
                 continue
+            if not self._gate(sensor, False, deficit):
+                self._note(ACTION_NONE, (sensor.name,), REASON_HYSTERESIS)
+                return False
 
             _LOGGER.info(
-                "Grid importing: deactivating sensor for %s (priority %d)",
+                "%s%s: deactivating sensor for %s (priority %d)",
+                "Grid importing" if headroom == float("inf") else "Under export limit",
+                f" on phase {phase}" if phase else "",
                 sensor.device_entity_id,
                 sensor.priority,
             )
             sensor.deactivate()
-            break
+            self._note(
+                ACTION_DEACTIVATE,
+                (sensor.name,),
+                REASON_PHASE_IMPORT if phase else REASON_IMPORT,
+            )
+            return True
+        self._note(
+            ACTION_NONE, (), REASON_GUARD_BLOCKED if guard_blocked else REASON_NO_CHANGE
+        )
+        return False
 
     @property
     def diagnostic_info(self) -> dict:
         """Return diagnostic snapshot."""
+        now = self._clock.now()
         return {
             "grid_sensor": self._grid_sensor,
             "buffer": self._buffer,
+            "allocation_mode": self._allocation_mode,
+            "fast_shed_threshold": self._fast_shed_threshold,
+            "fast_shed_count": self._fast_shed_count,
+            "writes_avoided": self.writes_avoided,
+            "evaluation_interval": self._evaluation_interval,
+            "grid_filter": self._filter.filter_type,
+            "filter_window": self._filter.window,
+            "last_grid_power": self._last_grid_power,
+            "filter_output": self._filter_output,
+            "reaction_latency": self._reaction_latency,
+            "max_reaction_latency": self._max_reaction_latency,
+            "phases": self._phase_diagnostics(),
+            "battery": self._battery_diagnostics(),
+            "forecast": self._forecast_diagnostics(),
+            "price": self._price_diagnostics(),
+            "export_limit": (
+                self._export_limit.as_dict() if self._export_limit is not None else None
+            ),
+            "strategies": self._strategy_diagnostics(),
             "sensors": [
                 {
                     "name": s.name,
                     "device_entity": s.device_entity_id,
                     "priority": s.priority,
                     "is_on": s.is_on,
+                    "phase": s.phase,
+                    "setpoint": (
+                        s.setpoint
+                        if isinstance(s, ExcessSolarModulatingBinarySensor)
+                        else None
+                    ),
+                    "expected_consumption": s.get_expected_consumption(),
+                    "consumption_samples": s.consumption_model.samples,
+                    "hysteresis": s.hysteresis.state,
+                    "writes_avoided": s.hysteresis.writes_avoided,
+                    "statistics": s.statistics.as_dict(now),
                 }
                 for s in self._sensors
             ],
         }
 
+    def _strategy_diagnostics(self) -> dict[str, Any] | None:
+        """Return the counters of the live and shadow strategies."""
+        if not self._shadows:
+            return None
+        return {
+            "live": {
+                "allocation_mode": self._allocation_mode,
+                "grid_filter": self._filter.filter_type,
+                "active": len(self._index.active),
+                **self._live.as_dict(),
+            },
+            **{shadow.name: shadow.as_dict() for shadow in self._shadows},
+        }
+
+    def _price_diagnostics(self) -> dict[str, Any] | None:
+        """Return the price source, the last price and its adjustment."""
+        if self._price_source is None:
+            return None
+        return {
+            "source": self._price_source,
+            "slots": len(self._prices.values) if self._prices else 0,
+            "until": self._prices.end.isoformat() if self._prices else None,
+            "price": self._price,
+            "adjustment": self._price_policy.surplus_adjustment(self._price),
+            "low": self._price_policy.low,
+            "high": self._price_policy.high,
+        }
+
+    def _forecast_diagnostics(self) -> dict[str, Any] | None:
+        """Return the forecast and the planned start windows."""
+        if self._forecast is None:
+            return None
+        return {
+            "entity": self._forecast_entity,
+            "slots": len(self._forecast.slots),
+            "planned_at": (
+                self._forecast.planned_at.isoformat()
+                if self._forecast.planned_at
+                else None
+            ),
+            "windows": {
+                key: [start.isoformat(), end.isoformat()]
+                for key, (start, end) in self._forecast.windows.items()
+            },
+        }
+
+    def _battery_diagnostics(self) -> dict[str, Any] | None:
+        """Return battery inputs and the policy, None without a battery."""
+        if self._battery_power_sensor is None:
+            return None
+        soc = self._battery_soc()
+        return {
+            "power_sensor": self._battery_power_sensor,
+            "soc_sensor": self._battery_soc_sensor,
+            "policy": self._battery.policy,
+            "soc_target": self._battery.soc_target,
+            "split": self._battery.split,
+            "power": self._battery_power,
+            "soc": soc,
+            "device_share": self._battery.device_share(soc),
+        }
+
+    def _phase_diagnostics(self) -> dict[str, dict[str, Any]]:
+        """Return per-phase sensor, surplus and load of the active devices."""
+        loads = dict.fromkeys(self._phase_sensors, 0.0)
+        for sensor in self._index.active:
+            for phase, load in phase_loads(
+                sensor.phase, sensor.get_consumption()
+            ).items():
+                if phase in loads:
+                    loads[phase] += load
+        return {
+            phase: {
+                "sensor": entity_id,
+                "available": (
+                    self._phase_available.get(phase)
+                    if self._phase_available is not None
+                    else None
+                ),
+                "active_load": loads[phase],
+            }
+            for phase, entity_id in self._phase_sensors.items()
+        }
+
 
 def build_sensors_from_config(
     hass: HomeAssistant, config: dict, manager: ExcessSolarManager | None = None
@@ -345,8 +1527,9 @@ def build_sensors_from_config(
     Returns:
         Tuple of (binary_sensors, number_entities, enabled_switches)
     """
-    from .number import ExcessSolarPriorityNumber  # noqa: PLC0415
-    from .switch import ExcessSolarDeviceEnabledSwitch  # noqa: PLC0415
+    from .number import ExcessSolarPriorityNumber
+    from .sensor import ExcessSolarSetpointSensor, ExcessSolarStatisticSensor
+    from .switch import ExcessSolarDeviceEnabledSwitch
 
     sensors: list[ExcessSolarBinarySensor] = []
     number_entities: list[ExcessSolarPriorityNumber] = []
@@ -365,9 +1548,6 @@ def build_sensors_from_config(
             device_name=display_name,
             unique_id=unique_id,
             initial_priority=initial_priority,
-            on_priority_change_callback=(
-                manager.on_priority_changed if manager else None
-            ),
         )
         number_entities.append(priority_number)
 
@@ -385,20 +1565,54 @@ def build_sensors_from_config(
             int(min_off) if min_off is not None else DEFAULT_MINIMUM_OFF_TIME
         )
 
-        sensor = ExcessSolarBinarySensor(
-            hass=hass,
-            device_entity_id=display_name,
-            consumption=consumption,
-            consumption_entity=consumption_entity,
-            unique_id=unique_id,
-            name=display_name,
-            priority=initial_priority,
-            is_on_schedule_entity=dev_conf.get(CONF_IS_ON_SCHEDULE),
-            enabled_switch=enabled_switch,
-            minimum_on_time=dev_conf.get(CONF_MINIMUM_ON_TIME, 0),
-            minimum_off_time=minimum_off_time,
-            priority_number_entity=priority_number,
-        )
+        sensor_kwargs: dict[str, Any] = {
+            "hass": hass,
+            "device_entity_id": display_name,
+            "consumption": consumption,
+            "consumption_entity": consumption_entity,
+            "unique_id": unique_id,
+            "name": display_name,
+            "priority": initial_priority,
+            "is_on_schedule_entity": dev_conf.get(CONF_IS_ON_SCHEDULE),
+            "enabled_switch": enabled_switch,
+            "minimum_on_time": dev_conf.get(CONF_MINIMUM_ON_TIME, 0),
+            "minimum_off_time": minimum_off_time,
+            "priority_number_entity": priority_number,
+            "phase": dev_conf.get(CONF_PHASE, PHASE_ALL),
+            "hysteresis": DeviceHysteresis(
+                on_threshold=dev_conf.get(CONF_ON_THRESHOLD, 0),
+                off_threshold=dev_conf.get(CONF_OFF_THRESHOLD, 0),
+                on_delay=dev_conf.get(CONF_ON_DELAY, 0),
+                off_delay=dev_conf.get(CONF_OFF_DELAY, 0),
+            ),
+        }
+
+        if dev_conf.get(CONF_MODULATING):
+            sensor = ExcessSolarModulatingBinarySensor(
+                **sensor_kwargs,
+                min_power=dev_conf.get(CONF_MIN_POWER, 0),
+                power_step=dev_conf.get(CONF_POWER_STEP, DEFAULT_POWER_STEP),
+                ramp_rate=dev_conf.get(CONF_RAMP_RATE, DEFAULT_RAMP_RATE),
+            )
+            sensor.setpoint_sensor = ExcessSolarSetpointSensor(
+                unique_id=f"{unique_id}_setpoint",
+                name=f"{display_name} Setpoint",
+            )
+        else:
+            sensor = ExcessSolarBinarySensor(**sensor_kwargs)
+        sensor.statistic_sensors = [
+            ExcessSolarStatisticSensor(
+                unique_id=f"{unique_id}_{statistic}",
+                name=f"{display_name} {STATISTIC_NAMES[statistic]}",
+                statistic=statistic,
+                device=sensor,
+            )
+            for statistic in STATISTICS
+        ]
+        if manager is not None:
+            priority_number.set_priority_change_callback(
+                partial(manager.on_priority_changed, sensor)
+            )
         sensors.append(sensor)
 
     return sensors, number_entities, enabled_switches
@@ -408,6 +1622,7 @@ def create_manager_from_config(
     hass: HomeAssistant,
     config: dict,
     sensors: list[ExcessSolarBinarySensor],
+    clock: Clock = DEFAULT_CLOCK,
 ) -> ExcessSolarManager:
     """Create an ``ExcessSolarManager`` from validated YAML config."""
 
@@ -416,4 +1631,39 @@ def create_manager_from_config(
         grid_sensor=config[CONF_GRID_POWER_SENSOR],
         sensors=sensors,
         buffer=config.get(CONF_BUFFER, 0),
+        evaluation_interval=config.get(
+            CONF_EVALUATION_INTERVAL, DEFAULT_EVALUATION_INTERVAL
+        ),
+        grid_filter=config.get(CONF_GRID_FILTER, FILTER_LAST),
+        filter_window=config.get(CONF_FILTER_WINDOW, DEFAULT_FILTER_WINDOW),
+        allocation_mode=config.get(CONF_ALLOCATION_MODE, ALLOCATION_INCREMENTAL),
+        fast_shed_threshold=config.get(CONF_FAST_SHED_THRESHOLD, 0),
+        phase_sensors={
+            phase: entity_id
+            for phase, entity_id in (
+                (PHASE_L1, config.get(CONF_GRID_POWER_SENSOR_L1)),
+                (PHASE_L2, config.get(CONF_GRID_POWER_SENSOR_L2)),
+                (PHASE_L3, config.get(CONF_GRID_POWER_SENSOR_L3)),
+            )
+            if entity_id
+        },
+        battery_power_sensor=config.get(CONF_BATTERY_POWER_SENSOR),
+        battery_soc_sensor=config.get(CONF_BATTERY_SOC_SENSOR),
+        battery_policy=config.get(CONF_BATTERY_POLICY, BATTERY_FIRST),
+        battery_soc_target=config.get(
+            CONF_BATTERY_SOC_TARGET, DEFAULT_BATTERY_SOC_TARGET
+        ),
+        battery_split=config.get(CONF_BATTERY_SPLIT, DEFAULT_BATTERY_SPLIT),
+        forecast_entity=config.get(CONF_FORECAST_ENTITY),
+        forecast_attribute=config.get(
+            CONF_FORECAST_ATTRIBUTE, DEFAULT_FORECAST_ATTRIBUTE
+        ),
+        forecast_base_load=config.get(CONF_FORECAST_BASE_LOAD, 0),
+        price_source=config.get(CONF_PRICE_SOURCE),
+        price_low=config.get(CONF_PRICE_LOW, DEFAULT_PRICE_LOW),
+        price_high=config.get(CONF_PRICE_HIGH),
+        price_adjustment=config.get(CONF_PRICE_ADJUSTMENT, DEFAULT_PRICE_ADJUSTMENT),
+        shadow_strategies=config.get(CONF_SHADOW_STRATEGIES, []),
+        export_limit=config.get(CONF_EXPORT_LIMIT),
+        clock=clock,
     )
@@ -0,0 +1,79 @@
+"""Setpoint controller for modulating power devices.
+
+A modulating device (EV charger, immersion heater with power control) gets a
+power setpoint instead of a plain on/off state. On every evaluation the
+setpoint is moved towards the grid export with a proportional controller:
+
+    setpoint += gain * surplus
+
+The change is limited by the ramp rate, the result is quantized to the power
+step (rounded towards the previous setpoint) and clamped to the device limits.
+The controller is independent of Home Assistant and easy to test.
+"""
+
+from __future__ import annotations
+
+import math
+
+DEFAULT_POWER_STEP = 100  # W
+DEFAULT_RAMP_RATE = 0  # W per second, 0 disables the limit
+# Share of the surplus absorbed per evaluation. Below 1 the grid reading has
+# time to settle before the next step, which keeps the loop from oscillating.
+PROPORTIONAL_GAIN = 0.5
+
+
+class SetpointController:
+    """Proportional controller for a power setpoint."""
+
+    def __init__(
+        self,
+        min_power: float,
+        max_power: float,
+        step: float = DEFAULT_POWER_STEP,
+        ramp_rate: float = DEFAULT_RAMP_RATE,
+        gain: float = PROPORTIONAL_GAIN,
+    ) -> None:
+        """Init controller.
+
+        Args:
+            min_power: Lowest setpoint (W) while the device is running.
+            max_power: Highest setpoint (W).
+            step: Setpoint resolution (W), e.g. 230 W for 1 A steps.
+            ramp_rate: Maximum change in W per second, 0 for no limit.
+            gain: Proportional gain.
+        """
+        self.min_power = min_power
+        self.max_power = max(max_power, min_power)
+        self.step = step
+        self.ramp_rate = ramp_rate
+        self.gain = gain
+
+    def headroom(self, setpoint: float, surplus: float) -> float:
+        """Return the part of the surplus the device can absorb (or give back)."""
+        return max(min(surplus, self.max_power - setpoint), self.min_power - setpoint)
+
+    def next_setpoint(self, setpoint: float, surplus: float, elapsed: float) -> float:
+        """Return the new setpoint.
+
+        Args:
+            setpoint: Current setpoint in W.
+            surplus: Power in W to absorb, negative to give back.
+            elapsed: Seconds since the setpoint was last changed.
+        """
+        change = self.gain * surplus
+        if self.ramp_rate > 0:
+            limit = self.ramp_rate * max(elapsed, 0.0)
+            change = max(-limit, min(change, limit))
+
+        target = self._quantize(setpoint + change, towards=setpoint)
+        return max(self.min_power, min(target, self.max_power))
+
+    def _quantize(self, value: float, towards: float) -> float:
+        """Round value to the step, towards the previous setpoint."""
+        if self.step <= 0:
+            return value
+        steps = value / self.step
+        # Never cross the previous setpoint if it is not on the step grid
+        if value > towards:
+            return max(math.floor(steps) * self.step, towards)
+        return min(math.ceil(steps) * self.step, towards)
@@ -92,6 +92,10 @@ class ExcessSolarPriorityNumber(NumberEntity, RestoreEntity):
         if self._on_priority_change:
             self._on_priority_change()
 
+    def set_priority_change_callback(self, callback: Callable[[], None]) -> None:
+        """Set the callback called after the priority changed."""
+        self._on_priority_change = callback
+
     def get_priority(self) -> int:
         """Return current priority as integer."""
         return int(self._attr_native_value)
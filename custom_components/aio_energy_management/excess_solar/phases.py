@@ -0,0 +1,39 @@
+"""Phase helpers for per-phase excess solar budgeting.
+
+With per-phase grid sensors, a net-zero total can still hide one phase
+importing while another exports. Devices are assigned to a single phase or to
+all phases (three-phase loads, split evenly), and activation must fit the
+surplus of every phase the device draws from.
+"""
+
+from __future__ import annotations
+
+PHASE_L1 = "l1"
+PHASE_L2 = "l2"
+PHASE_L3 = "l3"
+PHASE_ALL = "all"
+PHASES = [PHASE_L1, PHASE_L2, PHASE_L3]
+PHASE_OPTIONS = [PHASE_ALL, *PHASES]
+
+
+def phase_loads(phase: str, power: float) -> dict[str, float]:
+    """Return power (W) per phase of a device connected to `phase`."""
+    if phase == PHASE_ALL:
+        return dict.fromkeys(PHASES, power / len(PHASES))
+    return {phase: power}
+
+
+def fits_phases(
+    loads: dict[str, float], phase_available: dict[str, float] | None, buffer: float
+) -> bool:
+    """Return True if the loads fit the per-phase surplus.
+
+    Phases without a sensor (missing from `phase_available`) are not limited.
+    """
+    if phase_available is None:
+        return True
+    return all(
+        phase_available[phase] >= load - buffer
+        for phase, load in loads.items()
+        if phase in phase_available
+    )
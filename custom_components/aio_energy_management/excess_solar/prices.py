@@ -0,0 +1,124 @@
+"""Price-aware surplus for the Excess Solar manager.
+
+A cheapest hours entity stores its normalized price series (today and
+tomorrow) in the coordinator. The manager reads the series of the configured
+``price_source`` (unique_id of the cheapest hours entity) into a
+``PriceTable`` whenever the coordinator data of the entity changes, so the
+current price is found by slot index on every evaluation without parsing
+provider attributes.
+
+The price adjusts the surplus budget of the evaluation:
+
+- At or below ``price_low`` (default 0, negative export price) importing is
+  cheap: ``price_adjustment`` W is added to the surplus, so devices may run
+  on a small import.
+- At or above the optional ``price_high`` exporting pays well:
+  ``price_adjustment`` W is taken from the surplus, so devices need a larger
+  export before they are turned on.
+
+Without prices for the current slot the surplus is not adjusted.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..helpers import from_str_to_datetime
+
+DEFAULT_PRICE_LOW = 0.0
+DEFAULT_PRICE_ADJUSTMENT = 500  # W
+
+
+class PriceTable:
+    """Prices of equal length slots, looked up by slot index."""
+
+    def __init__(
+        self, start: datetime, slot: timedelta, values: list[float | None]
+    ) -> None:
+        """Init table. `values[i]` is the price of the slot at `start + i * slot`."""
+        self.start = start
+        self.slot = slot
+        self.values = values
+
+    @classmethod
+    def from_prices(cls, prices: Mapping[str, Any] | None) -> PriceTable | None:
+        """Build a table from the stored prices of a cheapest hours entity.
+
+        Returns None when there are no usable prices.
+        """
+        if not prices:
+            return None
+        items = _parse_items(
+            [*(prices.get("today") or []), *(prices.get("tomorrow") or [])]
+        )
+        if not items:
+            return None
+        items.sort(key=lambda item: item[0])
+        start = items[0][0]
+        if mtu := prices.get("mtu"):
+            slot = timedelta(minutes=int(mtu))
+        else:
+            slot = items[0][1] - start
+        if slot <= timedelta(0):
+            return None
+
+        values: list[float | None] = [None] * (int((items[-1][0] - start) // slot) + 1)
+        for item_start, _, value in items:
+            values[int((item_start - start) // slot)] = value
+        return cls(start, slot, values)
+
+    @property
+    def end(self) -> datetime:
+        """Return the end of the last slot."""
+        return self.start + self.slot * len(self.values)
+
+    def price_at(self, now: datetime) -> float | None:
+        """Return the price of the slot containing `now`, None if not known."""
+        if now < self.start:
+            return None
+        index = int((now - self.start) // self.slot)
+        return self.values[index] if index < len(self.values) else None
+
+
+def _parse_items(
+    items: Iterable[Mapping[str, Any]],
+) -> list[tuple[datetime, datetime, float]]:
+    """Return (start, end, value) of the stored price items that can be parsed."""
+    parsed = []
+    for item in items:
+        start = from_str_to_datetime(item.get("start"))
+        end = from_str_to_datetime(item.get("end"))
+        if not isinstance(start, datetime) or not isinstance(end, datetime):
+            continue
+        try:
+            parsed.append((start, end, float(item["value"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return parsed
+
+
+class PricePolicy:
+    """Adjust the surplus budget by the current price."""
+
+    def __init__(
+        self,
+        low: float = DEFAULT_PRICE_LOW,
+        high: float | None = None,
+        adjustment: float = DEFAULT_PRICE_ADJUSTMENT,
+    ) -> None:
+        """Init policy. `adjustment` in W."""
+        self.low = low
+        self.high = high
+        self.adjustment = adjustment
+
+    def surplus_adjustment(self, price: float | None) -> float:
+        """Return the power (W) added to the surplus at the price."""
+        if price is None:
+            return 0.0
+        if price <= self.low:
+            return float(self.adjustment)
+        if self.high is not None and price >= self.high:
+            return -float(self.adjustment)
+        return 0.0
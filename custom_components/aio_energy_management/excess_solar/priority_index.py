@@ -0,0 +1,152 @@
+"""Priority index of the Excess Solar sensors.
+
+Sensors are kept ordered by (priority, configuration order) in sorted lists:
+all sensors, active and inactive sensors, and the eligible ones the manager
+may switch:
+
+- eligible inactive sensors are enabled and not on their own schedule, so
+  they may be turned on,
+- eligible active sensors are not on their own schedule, so they may be
+  turned off.
+
+A priority, on/off, enable or schedule change moves a single sensor between
+the lists with a binary search. The next sensor to activate (first eligible
+inactive) or to shed (last eligible active) is found without looking at the
+sensors that are in the other state or not eligible.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .binary_sensor import ExcessSolarBinarySensor
+
+_Key = tuple[int, int]  # (priority, configuration order)
+# Indexed state of a sensor: (is_on, is_enabled, is_on_schedule)
+_State = tuple[bool, bool, bool]
+
+
+class _SortedSensors:
+    """Sensors sorted by key."""
+
+    def __init__(self) -> None:
+        self._keys: list[_Key] = []
+        self.items: list[ExcessSolarBinarySensor] = []
+
+    def insert(self, key: _Key, sensor: ExcessSolarBinarySensor) -> None:
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self.items.insert(position, sensor)
+
+    def remove(self, key: _Key) -> None:
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+        del self.items[position]
+
+
+class PriorityIndex:
+    """Sensors ordered by priority, split by state and eligibility."""
+
+    def __init__(self, sensors: Iterable[ExcessSolarBinarySensor] = ()) -> None:
+        """Init index."""
+        self.rebuild(sensors)
+
+    def rebuild(self, sensors: Iterable[ExcessSolarBinarySensor]) -> None:
+        """Index the sensors from scratch. Ties keep the given order."""
+        self._all = _SortedSensors()
+        self._active = _SortedSensors()
+        self._inactive = _SortedSensors()
+        self._eligible_active = _SortedSensors()
+        self._eligible_inactive = _SortedSensors()
+        self._order: dict[int, int] = {}
+        self._keys: dict[int, _Key] = {}
+        self._states: dict[int, _State] = {}
+        for order, sensor in enumerate(sensors):
+            self._order[id(sensor)] = order
+            self._insert(sensor)
+
+    @property
+    def sensors(self) -> list[ExcessSolarBinarySensor]:
+        """Return all sensors, highest priority first."""
+        return self._all.items
+
+    @property
+    def active(self) -> list[ExcessSolarBinarySensor]:
+        """Return active sensors, highest priority first."""
+        return self._active.items
+
+    @property
+    def inactive(self) -> list[ExcessSolarBinarySensor]:
+        """Return inactive sensors, highest priority first."""
+        return self._inactive.items
+
+    def eligible_inactive(self) -> Iterator[ExcessSolarBinarySensor]:
+        """Iterate the sensors that may be turned on, highest priority first."""
+        return iter(self._eligible_inactive.items)
+
+    def eligible_active(
+        self, lowest_first: bool = False
+    ) -> Iterator[ExcessSolarBinarySensor]:
+        """Iterate the sensors that may be turned off, highest priority first."""
+        if lowest_first:
+            return reversed(self._eligible_active.items)
+        return iter(self._eligible_active.items)
+
+    def update(self, sensor: ExcessSolarBinarySensor) -> None:
+        """Move a sensor after its priority, state or eligibility changed.
+
+        Only the lists the sensor enters or leaves are changed, all of them
+        when its priority changed.
+        """
+        sensor_id = id(sensor)
+        if sensor_id not in self._order:
+            return
+        key = (sensor.priority, self._order[sensor_id])
+        state = _state(sensor)
+        old_key, old_state = self._keys[sensor_id], self._states[sensor_id]
+        if key == old_key and state == old_state:
+            return
+        old_sets = self._sets(old_state)
+        new_sets = self._sets(state)
+        for sensors in old_sets:
+            if key != old_key or sensors not in new_sets:
+                sensors.remove(old_key)
+        for sensors in new_sets:
+            if key != old_key or sensors not in old_sets:
+                sensors.insert(key, sensor)
+        self._keys[sensor_id] = key
+        self._states[sensor_id] = state
+
+    def refresh(self) -> None:
+        """Move all sensors whose priority, state or eligibility changed."""
+        for sensor in list(self._all.items):
+            self.update(sensor)
+
+    def _sets(self, state: _State) -> list[_SortedSensors]:
+        """Return the lists a sensor in `state` belongs to."""
+        is_on, is_enabled, is_on_schedule = state
+        if is_on:
+            sets = [self._all, self._active]
+            if not is_on_schedule:
+                sets.append(self._eligible_active)
+            return sets
+        sets = [self._all, self._inactive]
+        if is_enabled and not is_on_schedule:
+            sets.append(self._eligible_inactive)
+        return sets
+
+    def _insert(self, sensor: ExcessSolarBinarySensor) -> None:
+        sensor_id = id(sensor)
+        key = (sensor.priority, self._order[sensor_id])
+        state = _state(sensor)
+        self._keys[sensor_id] = key
+        self._states[sensor_id] = state
+        for sensors in self._sets(state):
+            sensors.insert(key, sensor)
+
+
+def _state(sensor: ExcessSolarBinarySensor) -> _State:
+    return (bool(sensor.is_on), sensor.is_enabled(), sensor.is_on_schedule())
@@ -0,0 +1,121 @@
+"""Excess Solar sensors: setpoints of modulating devices and device statistics."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import UnitOfEnergy, UnitOfPower, UnitOfTime
+
+from .statistics import STATISTIC_ENERGY, STATISTIC_ON_TIME, STATISTIC_SWITCHES
+
+if TYPE_CHECKING:
+    from .binary_sensor import ExcessSolarBinarySensor
+
+
+class ExcessSolarSetpointSensor(SensorEntity):
+    """Power setpoint (W) of a modulating device.
+
+    Updated by the device's ``ExcessSolarModulatingBinarySensor``. Users
+    forward the value to the actual device (charging current, heater power)
+    with an automation.
+    """
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _attr_icon = "mdi:tune-variant"
+
+    def __init__(self, unique_id: str, name: str) -> None:
+        """Initialise the setpoint sensor."""
+        self._attr_unique_id = unique_id
+        self._attr_name = name
+        self._attr_native_value: float = 0.0
+
+    def update_setpoint(self, setpoint: float) -> None:
+        """Set a new setpoint and write the state once added to hass."""
+        self._attr_native_value = setpoint
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+
+# statistic -> (device class, unit, icon)
+_STATISTIC_ATTRIBUTES = {
+    STATISTIC_ON_TIME: (SensorDeviceClass.DURATION, UnitOfTime.HOURS, "mdi:timer"),
+    STATISTIC_SWITCHES: (None, None, "mdi:counter"),
+    STATISTIC_ENERGY: (
+        SensorDeviceClass.ENERGY,
+        UnitOfEnergy.KILO_WATT_HOUR,
+        "mdi:solar-power",
+    ),
+}
+
+
+class ExcessSolarStatisticSensor(RestoreSensor):
+    """Runtime counter of a device: on-time (h), switches or routed energy (kWh).
+
+    The value is read from the device's ``DeviceStatistics`` (see
+    ``statistics.py``). The state is written when the device is switched and
+    polled in between, so the running period shows up. The restored value
+    continues the counter after a restart. The switch counter also shows
+    the switches since local midnight.
+    """
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(
+        self,
+        unique_id: str,
+        name: str,
+        statistic: str,
+        device: ExcessSolarBinarySensor,
+    ) -> None:
+        """Initialise the statistic sensor."""
+        self._attr_unique_id = unique_id
+        self._attr_name = name
+        self.statistic = statistic
+        self._device = device
+        (
+            self._attr_device_class,
+            self._attr_native_unit_of_measurement,
+            self._attr_icon,
+        ) = _STATISTIC_ATTRIBUTES[statistic]
+
+    @property
+    def native_value(self) -> float:
+        """Return the counter including the running period."""
+        value = self._device.statistics.value(self.statistic, self._device.clock.now())
+        return value if self.statistic == STATISTIC_SWITCHES else round(value, 3)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return the switches of the day for the switch counter."""
+        if self.statistic != STATISTIC_SWITCHES:
+            return None
+        statistics = self._device.statistics
+        return {
+            "today": statistics.daily_switches(self._device.clock.now()),
+            "day": statistics.day.isoformat() if statistics.day else None,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Continue the counter from the last known value."""
+        await super().async_added_to_hass()
+        if (last_data := await self.async_get_last_sensor_data()) is not None:
+            self._device.statistics.restore(self.statistic, last_data.native_value)
+        if self.statistic == STATISTIC_SWITCHES and (
+            last_state := await self.async_get_last_state()
+        ):
+            self._device.statistics.restore_day(
+                last_state.attributes.get("day"), last_state.attributes.get("today")
+            )
+
+    def async_update_statistic(self) -> None:
+        """Write the state once added to hass."""
+        if self.hass is not None:
+            self.async_write_ha_state()
@@ -0,0 +1,232 @@
+"""Shadow strategies of the Excess Solar manager.
+
+A shadow strategy runs next to the manager on the same readings and decides
+what it would have done, without touching any entity. It keeps its own input
+filter and its own set of devices it would have turned on, so its switch
+count, estimated self-consumption and evaluation cost can be compared with
+the live strategy before switching over.
+
+Every strategy changes one setting of the live strategy: an allocation mode
+(``incremental``, ``knapsack``) or a grid filter (``last``, ``ema``,
+``median``, ``min``, ``max``).
+
+The manager parses every reading once and hands the shadows the grid power
+without the managed devices (the effective grid power less the consumption
+of the live active devices). A shadow adds the expected consumption of the
+devices it would have on to get its own grid power. Shadows only model the
+surplus: phases, swaps, fast shed, hysteresis and forecasts are not
+simulated and modulating devices count with their start power, so the
+numbers are estimates for comparing strategies.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from .allocation import (
+    ALLOCATION_INCREMENTAL,
+    ALLOCATION_KNAPSACK,
+    ALLOCATION_MODES,
+    AllocationCandidate,
+    plan_allocation,
+)
+from .filters import DEFAULT_FILTER_WINDOW, FILTER_LAST, FILTER_TYPES, create_filter
+
+SHADOW_STRATEGIES = [*ALLOCATION_MODES, *FILTER_TYPES]
+
+
+class ShadowDevice:
+    """Snapshot of a device shared by the shadow strategies of an evaluation."""
+
+    def __init__(
+        self,
+        key: str,
+        priority: int,
+        consumption: float,
+        eligible: bool,
+        minimum_on: float,
+        minimum_off: float,
+    ) -> None:
+        """Init snapshot. Consumption in W, minimum times in seconds."""
+        self.key = key
+        self.priority = priority
+        self.consumption = consumption
+        self.eligible = eligible
+        self.minimum_on = minimum_on
+        self.minimum_off = minimum_off
+
+
+class StrategyStats:
+    """Counters of a strategy."""
+
+    def __init__(self) -> None:
+        """Init empty counters."""
+        self.switches = 0
+        self.evaluations = 0
+        self.evaluation_time = 0.0  # seconds
+        self.surplus_energy = 0.0  # Wh exported without the devices
+        self.self_consumed_energy = 0.0  # Wh of that surplus used by devices
+        self._accounted: float | None = None  # monotonic seconds
+
+    @property
+    def self_consumption(self) -> float | None:
+        """Return the share of the surplus used by the devices."""
+        if not self.surplus_energy:
+            return None
+        return self.self_consumed_energy / self.surplus_energy
+
+    def account(self, surplus: float, load: float, now: float) -> None:
+        """Add the energy since the last call with `load` W on `surplus` W."""
+        if self._accounted is not None:
+            hours = (now - self._accounted) / 3600
+            surplus = max(surplus, 0.0)
+            self.surplus_energy += surplus * hours
+            self.self_consumed_energy += min(load, surplus) * hours
+        self._accounted = now
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        self_consumption = self.self_consumption
+        return {
+            "switches": self.switches,
+            "evaluations": self.evaluations,
+            "self_consumption": (
+                round(self_consumption, 3) if self_consumption is not None else None
+            ),
+            "surplus_kwh": round(self.surplus_energy / 1000, 3),
+            "self_consumed_kwh": round(self.self_consumed_energy / 1000, 3),
+            "mean_evaluation_ms": (
+                round(self.evaluation_time / self.evaluations * 1000, 3)
+                if self.evaluations
+                else None
+            ),
+        }
+
+
+class ShadowStrategy:
+    """Alternative strategy evaluated without touching entities."""
+
+    def __init__(
+        self,
+        name: str,
+        allocation_mode: str,
+        grid_filter: str,
+        filter_window: float,
+        buffer: float,
+    ) -> None:
+        """Init strategy."""
+        self.name = name
+        self.allocation_mode = allocation_mode
+        self.grid_filter = grid_filter
+        self.buffer = buffer
+        self.filter = create_filter(grid_filter, filter_window)
+        self.active: set[str] = set()  # keys of the devices it would have on
+        self.stats = StrategyStats()
+        self._changed: dict[str, float] = {}  # key -> monotonic seconds
+
+    def add(self, base_power: float, now: float) -> None:
+        """Add a reading of the grid power without the managed devices."""
+        self.filter.add(base_power, now)
+
+    def evaluate(self, devices: list[ShadowDevice], surplus: float, now: float) -> None:
+        """Decide on the filtered reading.
+
+        `devices` are ordered by priority, `surplus` is the latest export
+        without the managed devices (W), used for the energy estimate.
+        """
+        started = time.perf_counter()
+        load = sum(d.consumption for d in devices if d.key in self.active)
+        self.stats.account(surplus, load, now)
+        base_power = self.filter.value(now)
+        if base_power is None:
+            return
+
+        available = -(base_power + load)
+        if abs(available) <= self.buffer:
+            target = self.active & {d.key for d in devices}
+        elif self.allocation_mode == ALLOCATION_KNAPSACK:
+            target = self._plan(devices, available, now)
+        else:
+            target = self._step(devices, available, now)
+
+        changed = target ^ self.active
+        for key in changed:
+            self._changed[key] = now
+        self.active = target
+        self.stats.switches += len(changed)
+        self.stats.evaluations += 1
+        self.stats.evaluation_time += time.perf_counter() - started
+
+    def _can_change(self, device: ShadowDevice, now: float) -> bool:
+        changed = self._changed.get(device.key)
+        if changed is None:
+            return True
+        hold = device.minimum_on if device.key in self.active else device.minimum_off
+        return now - changed >= hold
+
+    def _plan(
+        self, devices: list[ShadowDevice], available: float, now: float
+    ) -> set[str]:
+        return plan_allocation(
+            [
+                AllocationCandidate(
+                    key=d.key,
+                    priority=d.priority,
+                    consumption=d.consumption,
+                    is_on=d.key in self.active,
+                    can_change=self._can_change(d, now),
+                    eligible=d.eligible,
+                )
+                for d in devices
+            ],
+            available,
+            self.buffer,
+        )
+
+    def _step(
+        self, devices: list[ShadowDevice], available: float, now: float
+    ) -> set[str]:
+        """Turn on or off at most one device, as the incremental mode does."""
+        target = self.active & {d.key for d in devices}
+        if available > 0:
+            for d in devices:
+                if (
+                    d.key not in target
+                    and d.eligible
+                    and d.consumption > 0
+                    and available >= d.consumption - self.buffer
+                    and self._can_change(d, now)
+                ):
+                    return target | {d.key}
+            return target
+        for d in reversed(devices):
+            if d.key in target and self._can_change(d, now):
+                return target - {d.key}
+        return target
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the strategy and its counters for diagnostics."""
+        return {
+            "allocation_mode": self.allocation_mode,
+            "grid_filter": self.grid_filter,
+            "active": len(self.active),
+            **self.stats.as_dict(),
+        }
+
+
+def create_shadow(
+    name: str,
+    allocation_mode: str = ALLOCATION_INCREMENTAL,
+    grid_filter: str = FILTER_LAST,
+    filter_window: float = DEFAULT_FILTER_WINDOW,
+    buffer: float = 0,
+) -> ShadowStrategy:
+    """Create the shadow of a live strategy with the setting `name` changed."""
+    if name in ALLOCATION_MODES:
+        allocation_mode = name
+    elif name in FILTER_TYPES:
+        grid_filter = name
+    else:
+        raise ValueError(f"Unknown shadow strategy: {name}")
+    return ShadowStrategy(name, allocation_mode, grid_filter, filter_window, buffer)
@@ -0,0 +1,114 @@
+"""Runtime statistics of Excess Solar devices.
+
+Every device counts how long it ran on surplus, how often it was switched
+and the solar energy routed to it, estimated from its consumption: the
+expected consumption of a switching device, the setpoint of a modulating
+one. The counters are updated on every switch (and setpoint change) in
+constant time. The running period is added when the counters are read, so
+no timer is needed.
+
+The counters are published as ``total_increasing`` sensors (see
+``sensor.py``), which restore them after a restart.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+import homeassistant.util.dt as dt_util
+
+STATISTIC_ON_TIME = "on_time"
+STATISTIC_SWITCHES = "switches"
+STATISTIC_ENERGY = "energy"
+STATISTICS = [STATISTIC_ON_TIME, STATISTIC_SWITCHES, STATISTIC_ENERGY]
+# Name suffixes of the statistic sensors of a device
+STATISTIC_NAMES = {
+    STATISTIC_ON_TIME: "On Time",
+    STATISTIC_SWITCHES: "Switches",
+    STATISTIC_ENERGY: "Solar Energy",
+}
+
+
+class DeviceStatistics:
+    """Incremental on-time, switch and routed energy counters of a device."""
+
+    def __init__(self) -> None:
+        """Init empty counters."""
+        self.on_time = 0.0  # seconds of finished periods
+        self.energy = 0.0  # Wh of finished periods
+        self.switches = 0
+        self.switches_today = 0
+        self.day: date | None = None  # local day of switches_today
+        self._since: datetime | None = None  # start of the running period
+        self._watts = 0.0  # power of the running period
+
+    def update(self, is_on: bool, watts: float, now: datetime) -> None:
+        """Close the running period and start a new one at `watts` W if on."""
+        if self._since is not None:
+            seconds = max((now - self._since).total_seconds(), 0.0)
+            self.on_time += seconds
+            self.energy += self._watts * seconds / 3600
+        self._since = now if is_on else None
+        self._watts = watts if is_on else 0.0
+
+    def switched(self, is_on: bool, watts: float, now: datetime) -> None:
+        """Count a switch on or off."""
+        self.update(is_on, watts, now)
+        self.switches += 1
+        today = dt_util.as_local(now).date()
+        if today != self.day:
+            self.day = today
+            self.switches_today = 0
+        self.switches_today += 1
+
+    def daily_switches(self, now: datetime) -> int:
+        """Return the switches since local midnight."""
+        return self.switches_today if dt_util.as_local(now).date() == self.day else 0
+
+    def value(self, statistic: str, now: datetime) -> float:
+        """Return a counter including the running period.
+
+        On-time in hours, energy in kWh.
+        """
+        if statistic == STATISTIC_SWITCHES:
+            return self.switches
+        seconds = max((now - self._since).total_seconds(), 0.0) if self._since else 0.0
+        if statistic == STATISTIC_ON_TIME:
+            return (self.on_time + seconds) / 3600
+        return (self.energy + self._watts * seconds / 3600) / 1000
+
+    def restore(self, statistic: str, value: Any) -> None:
+        """Continue a counter from its restored sensor value."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        if value < 0:
+            return
+        if statistic == STATISTIC_SWITCHES:
+            self.switches = int(value)
+        elif statistic == STATISTIC_ON_TIME:
+            self.on_time = value * 3600
+        elif statistic == STATISTIC_ENERGY:
+            self.energy = value * 1000
+
+    def restore_day(self, day: Any, switches: Any) -> None:
+        """Continue the switches of a day, ignored if not valid."""
+        if not isinstance(day, str):
+            return
+        try:
+            self.day = date.fromisoformat(day)
+            self.switches_today = int(switches)
+        except (TypeError, ValueError):
+            self.day = None
+            self.switches_today = 0
+
+    def as_dict(self, now: datetime) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "on_time_h": round(self.value(STATISTIC_ON_TIME, now), 3),
+            "switches": self.switches,
+            "switches_today": self.daily_switches(now),
+            "energy_kwh": round(self.value(STATISTIC_ENERGY, now), 3),
+        }
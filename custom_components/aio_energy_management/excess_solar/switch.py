@@ -11,6 +11,7 @@ Both switches use ``RestoreEntity`` so their state survives HA restarts.
 
 from __future__ import annotations
 
+from collections.abc import Callable
 import logging
 from typing import Any
 
@@ -95,6 +96,11 @@ class ExcessSolarDeviceEnabledSwitch(RestoreEntity, SwitchEntity):
         self._attr_name = name
         self._attr_icon = "mdi:solar-power-variant"
         self._attr_is_on: bool = True  # enabled by default
+        self._on_enabled_change: Callable[[], None] | None = None
+
+    def set_enabled_change_callback(self, callback: Callable[[], None]) -> None:
+        """Set the callback called after the switch was turned on or off."""
+        self._on_enabled_change = callback
 
     async def async_added_to_hass(self) -> None:
         """Restore previous state on startup."""
@@ -107,6 +113,8 @@ class ExcessSolarDeviceEnabledSwitch(RestoreEntity, SwitchEntity):
                 self.name,
                 "ON" if self._attr_is_on else "OFF",
             )
+            if self._on_enabled_change:
+                self._on_enabled_change()
 
     @property
     def is_on(self) -> bool:
@@ -118,9 +126,13 @@ class ExcessSolarDeviceEnabledSwitch(RestoreEntity, SwitchEntity):
         self._attr_is_on = True
         self.async_write_ha_state()
         _LOGGER.debug("Device enabled switch '%s' turned ON", self.name)
+        if self._on_enabled_change:
+            self._on_enabled_change()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Disable this device from solar management."""
         self._attr_is_on = False
         self.async_write_ha_state()
         _LOGGER.debug("Device enabled switch '%s' turned OFF", self.name)
+        if self._on_enabled_change:
+            self._on_enabled_change()
@@ -74,3 +74,14 @@ def get_last(iterable, default=None):
     if not iterable:
         return None
     return iterable[-1]
+
+
+def create_event_uid(unique_id: str, start: datetime, end: datetime) -> str:
+    """Generate a deterministic unique id for a scheduled event.
+
+    The uid is generated from the event start and end times converted to
+    UTC and formatted as YYYYmmddTHHMMSSZ for compactness and stability.
+    """
+    start_str = dt_util.as_utc(start).strftime("%Y%m%dT%H%M%SZ")
+    end_str = dt_util.as_utc(end).strftime("%Y%m%dT%H%M%SZ")
+    return f"{unique_id}_{start_str}_{end_str}"
@@ -0,0 +1,216 @@
+"""Long-term schedule history stored in a local SQLite database.
+
+Finished intervals are appended from the coordinator archive path. Each row
+holds the interval and the mean, min and max price of the schedule it belonged
+to. Rows are keyed by (entity, start) so archiving the same interval twice is
+harmless. All database work is done in the executor.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+import sqlite3
+import threading
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .helpers import from_str_to_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_DB_FILE = "aio_energy_management_history.db"
+DEFAULT_QUERY_LIMIT = 100
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schedule_history (
+    entity TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    name TEXT,
+    mean_price REAL,
+    min_price REAL,
+    max_price REAL,
+    PRIMARY KEY (entity, start)
+) WITHOUT ROWID
+"""
+
+_INSERT = """
+INSERT OR IGNORE INTO schedule_history
+    (entity, start, end, name, mean_price, min_price, max_price)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Mean price is weighted by the interval duration
+_AGGREGATE = """
+SELECT entity,
+       COUNT(*),
+       SUM(end - start),
+       SUM(mean_price * (end - start)) / SUM(
+           CASE WHEN mean_price IS NULL THEN 0 ELSE end - start END
+       ),
+       MIN(min_price),
+       MAX(max_price),
+       MIN(start),
+       MAX(end)
+FROM schedule_history
+WHERE {where}
+GROUP BY entity
+ORDER BY entity
+"""
+
+_SELECT = """
+SELECT entity, name, start, end, mean_price, min_price, max_price
+FROM schedule_history
+WHERE {where}
+ORDER BY entity, start
+LIMIT ?
+"""
+
+
+class ScheduleHistory:
+    """Append-only schedule history backed by SQLite."""
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Init history. Call async_setup before use."""
+        self._hass = hass
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    async def async_setup(self) -> None:
+        """Open the database and create the schema."""
+        await self._hass.async_add_executor_job(self._setup)
+        _LOGGER.debug("Schedule history enabled in %s", self._path)
+
+    async def async_close(self) -> None:
+        """Close the database."""
+        await self._hass.async_add_executor_job(self._close)
+
+    async def async_append(
+        self,
+        entity_id: str,
+        name: str | None,
+        intervals: list[dict],
+        extra: dict | None,
+    ) -> None:
+        """Append finished intervals of an entity."""
+        extra = extra or {}
+        rows = [
+            (
+                entity_id,
+                _to_timestamp(item["start"]),
+                _to_timestamp(item["end"]),
+                name,
+                extra.get("mean_price"),
+                extra.get("min_price"),
+                extra.get("max_price"),
+            )
+            for item in intervals
+            if item.get("start") is not None and item.get("end") is not None
+        ]
+        if rows:
+            await self._hass.async_add_executor_job(self._write, rows)
+
+    async def async_query(
+        self,
+        entity_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = DEFAULT_QUERY_LIMIT,
+    ) -> dict[str, Any]:
+        """Return per-entity aggregates and at most `limit` intervals in range."""
+        return await self._hass.async_add_executor_job(
+            self._query, entity_id, start, end, limit
+        )
+
+    def _setup(self) -> None:
+        with self._lock:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute(_CREATE_TABLE)
+            self._conn.commit()
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _write(self, rows: list[tuple]) -> None:
+        with self._lock:
+            if self._conn is None:
+                _LOGGER.warning(
+                    "Schedule history is closed, dropping %d rows", len(rows)
+                )
+                return
+            self._conn.executemany(_INSERT, rows)
+            self._conn.commit()
+
+    def _query(
+        self,
+        entity_id: str | None,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int,
+    ) -> dict[str, Any]:
+        clauses = ["1 = 1"]
+        params: list[Any] = []
+        if entity_id is not None:
+            clauses.append("entity = ?")
+            params.append(entity_id)
+        if start is not None:
+            clauses.append("end > ?")
+            params.append(_to_timestamp(start))
+        if end is not None:
+            clauses.append("start < ?")
+            params.append(_to_timestamp(end))
+        where = " AND ".join(clauses)
+
+        with self._lock:
+            if self._conn is None:
+                return {"entities": {}, "intervals": []}
+
+            entities = {}
+            for row in self._conn.execute(_AGGREGATE.format(where=where), params):
+                entities[row[0]] = {
+                    "count": row[1],
+                    "total_hours": row[2] / 3600,
+                    "mean_price": row[3],
+                    "min_price": row[4],
+                    "max_price": row[5],
+                    "first_start": _from_timestamp(row[6]),
+                    "last_end": _from_timestamp(row[7]),
+                }
+
+            intervals = [
+                {
+                    "entity": row[0],
+                    "name": row[1],
+                    "start": _from_timestamp(row[2]),
+                    "end": _from_timestamp(row[3]),
+                    "mean_price": row[4],
+                    "min_price": row[5],
+                    "max_price": row[6],
+                }
+                for row in self._conn.execute(
+                    _SELECT.format(where=where), [*params, limit]
+                )
+            ]
+
+        return {"entities": entities, "intervals": intervals}
+
+
+def _to_timestamp(value: datetime | str) -> int:
+    value = from_str_to_datetime(value)
+    if value.tzinfo is None:
+        # Naive times, e.g. from a service call, are in the local time zone
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return int(value.timestamp())
+
+
+def _from_timestamp(value: int | None) -> str | None:
+    if value is None:
+        return None
+    return dt_util.as_local(dt_util.utc_from_timestamp(value)).isoformat()
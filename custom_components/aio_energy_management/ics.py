@@ -0,0 +1,207 @@
+"""iCalendar (.ics) export of the coordinator schedules."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from hashlib import sha1
+from http import HTTPStatus
+import logging
+from uuid import uuid4
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import EnergyManagementCoordinator
+from .helpers import create_event_uid
+
+_LOGGER = logging.getLogger(__name__)
+
+ICS_URL = f"/api/{DOMAIN}/schedules.ics"
+ICS_CONTENT_TYPE = "text/calendar"
+PRODID = "-//kotope//AIO Energy Management//EN"
+
+# Maximum line length in octets as defined by RFC 5545
+_MAX_LINE_OCTETS = 75
+
+
+class EnergyManagementIcsView(HomeAssistantView):
+    """Stream schedules, archive and next data as an iCalendar feed.
+
+    Entities can be filtered with one or more `entity_id` query parameters
+    (comma separated values are accepted as well). The ETag is derived from
+    the coordinator change version, or the latest change of the filtered
+    entities, so conditional requests of unchanged data are answered with 304
+    without serializing anything.
+    """
+
+    url = ICS_URL
+    name = f"api:{DOMAIN}:ics"
+
+    def __init__(self, coordinator: EnergyManagementCoordinator) -> None:
+        """Init view."""
+        self._coordinator = coordinator
+        # Version counter restarts with Home Assistant, keep ETags unique anyway
+        self._instance = uuid4().hex[:8]
+
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        """Return the iCalendar feed."""
+        entity_ids = _parse_entity_ids(request.query.getall("entity_id", []))
+        etag = self._etag(entity_ids)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        # Take a snapshot of the intervals as entities may modify their data
+        # while the response is being written
+        snapshot = self._snapshot(entity_ids)
+
+        response = web.StreamResponse(headers=headers)
+        response.content_type = ICS_CONTENT_TYPE
+        response.charset = "utf-8"
+        await response.prepare(request)
+
+        await response.write(
+            _lines(
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                f"PRODID:{PRODID}",
+                "CALSCALE:GREGORIAN",
+                "METHOD:PUBLISH",
+                f"X-WR-CALNAME:{_escape('AIO Energy Management')}",
+            )
+        )
+        for entity_id, name, stamp, intervals in snapshot:
+            chunk = b"".join(
+                _event(entity_id, name, stamp, start, end) for start, end in intervals
+            )
+            if chunk:
+                await response.write(chunk)
+        await response.write(_lines("END:VCALENDAR"))
+        await response.write_eof()
+        return response
+
+    def _etag(self, entity_ids: list[str] | None) -> str:
+        """Return strong ETag of the feed."""
+        if entity_ids is None:
+            key = "*"
+            version = self._coordinator.version
+        else:
+            key = ",".join(entity_ids)
+            # Changes of other entities don't invalidate a filtered feed
+            version = max(
+                self._coordinator.entity_version(entity_id) for entity_id in entity_ids
+            )
+        digest = sha1(key.encode()).hexdigest()[:8]
+        return f'"{self._instance}-{version}-{digest}"'
+
+    def _snapshot(
+        self, entity_ids: list[str] | None
+    ) -> list[tuple[str, str, datetime | None, list[tuple[datetime, datetime]]]]:
+        """Return (entity, name, stamp, intervals) of the exported entities."""
+        snapshot = []
+        for entity_id in sorted(self._coordinator.data):
+            data = self._coordinator.data[entity_id]
+            if entity_ids is None:
+                # Follow the calendar entity: skip entities that opted out
+                if data.get("calendar") is False:
+                    continue
+            elif entity_id not in entity_ids:
+                continue
+
+            items = (data.get("archived") or []) + (data.get("list") or [])
+            if next_data := data.get("next"):
+                items = items + (next_data.get("list") or [])
+
+            intervals = sorted(
+                {
+                    (item["start"], item["end"])
+                    for item in items
+                    if item.get("start") is not None and item.get("end") is not None
+                }
+            )
+            snapshot.append(
+                (
+                    entity_id,
+                    data.get("name") or entity_id,
+                    data.get("updated_at"),
+                    intervals,
+                )
+            )
+        return snapshot
+
+
+def _parse_entity_ids(values: list[str]) -> list[str] | None:
+    """Return sorted entity filter or None if not filtered."""
+    entity_ids = {
+        value.strip() for raw in values for value in raw.split(",") if value.strip()
+    }
+    return sorted(entity_ids) if entity_ids else None
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """Check If-None-Match header against the ETag."""
+    if header is None:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _event(
+    entity_id: str,
+    name: str,
+    stamp: datetime | None,
+    start: datetime,
+    end: datetime,
+) -> bytes:
+    """Return a single VEVENT."""
+    return _lines(
+        "BEGIN:VEVENT",
+        f"UID:{create_event_uid(entity_id, start, end)}",
+        f"DTSTAMP:{_format_datetime(stamp or start)}",
+        f"DTSTART:{_format_datetime(start)}",
+        f"DTEND:{_format_datetime(end)}",
+        f"SUMMARY:{_escape(name)}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    )
+
+
+def _format_datetime(value: datetime) -> str:
+    return dt_util.as_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _escape(value: str) -> str:
+    """Escape TEXT value as defined by RFC 5545."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _lines(*lines: str) -> bytes:
+    """Encode content lines folded to 75 octets and terminated by CRLF."""
+    return b"".join(_fold(line.encode()) + b"\r\n" for line in lines)
+
+
+def _fold(line: bytes) -> bytes:
+    if len(line) <= _MAX_LINE_OCTETS:
+        return line
+
+    parts = []
+    limit = _MAX_LINE_OCTETS
+    while len(line) > limit:
+        cut = limit
+        # Do not split a multi-byte UTF-8 character
+        while cut > 0 and (line[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(line[:cut])
+        line = line[cut:]
+        limit = _MAX_LINE_OCTETS - 1  # Continuation lines start with a space
+    parts.append(line)
+    return b"\r\n ".join(parts)
@@ -34,6 +34,25 @@ class HourPrice:
         self.value = value
         self.type = type
 
+    def as_dict(self) -> dict:
+        """Return the price as a dictionary that can be persisted."""
+        return {
+            "start": self.start,
+            "end": self.end,
+            "value": self.value,
+            "type": self.type.value,
+        }
+
+    @classmethod
+    def from_stored(cls, dict: dict) -> "HourPrice":
+        """Init Hour Price model from a dictionary created by as_dict."""
+        return cls(
+            dict["value"],
+            from_str_to_datetime(dict["start"]),
+            from_str_to_datetime(dict["end"]),
+            HourPriceType(dict["type"]),
+        )
+
     @classmethod
     def from_dict(cls, dict: dict, mtu: int, type=HourPriceType.NORDPOOL) -> None:
         """Init Hour Price model with selected type. Single item."""
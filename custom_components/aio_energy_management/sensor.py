@@ -0,0 +1,70 @@
+"""Sensor platform for AIO Energy Management."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import DiscoveryInfoType
+
+from .const import (
+    CONF_ENTITY_EXCESS_SOLAR,
+    CONF_UNIQUE_ID,
+    DOMAIN,
+    EXCESS_SOLAR_SETPOINT_SENSORS,
+    EXCESS_SOLAR_STATISTIC_SENSORS,
+    YAML_EXCESS_SOLAR_INSTANCE_KEY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up sensor entities from a config entry."""
+    if entry.data.get("entry_type") != CONF_ENTITY_EXCESS_SOLAR:
+        return
+
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    sensors = _excess_solar_sensors(entry_data)
+    if sensors:
+        async_add_entities(sensors)
+        _LOGGER.debug(
+            "Added %d excess solar sensors for entry '%s'",
+            len(sensors),
+            entry.title,
+        )
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: dict,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up sensor entities from discovery info."""
+    if discovery_info is None:
+        return
+
+    entry_type = discovery_info.get("entry_type")
+
+    if entry_type == CONF_ENTITY_EXCESS_SOLAR:
+        storage_key = discovery_info.get(CONF_UNIQUE_ID, YAML_EXCESS_SOLAR_INSTANCE_KEY)
+        entry_data = hass.data.get(DOMAIN, {}).get(storage_key, {})
+        sensors = _excess_solar_sensors(entry_data)
+        if sensors:
+            async_add_entities(sensors)
+            _LOGGER.info("Added %d excess solar sensors", len(sensors))
+
+
+def _excess_solar_sensors(entry_data: dict) -> list:
+    """Return the setpoint and statistic sensors of an excess solar instance."""
+    return [
+        *entry_data.get(EXCESS_SOLAR_SETPOINT_SENSORS, []),
+        *entry_data.get(EXCESS_SOLAR_STATISTIC_SENSORS, []),
+    ]
@@ -4,21 +4,52 @@ import logging
 
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 
-from .const import COORDINATOR, DOMAIN
+from .const import COORDINATOR, DOMAIN, EXCESS_SOLAR_MANAGER
+from .history import DEFAULT_QUERY_LIMIT
 
 LOGGER = logging.getLogger(__name__)
 
 ATTR_UNIQUE_ID = "unique_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_LIMIT = "limit"
+ATTR_ENTRY_ID = "entry_id"
 
 SERVICE_CLEAR_DATA_SCHEMA = {
     vol.Required(ATTR_UNIQUE_ID): cv.string,
 }
 
+SERVICE_QUERY_HISTORY_SCHEMA = {
+    vol.Optional(ATTR_UNIQUE_ID): cv.string,
+    vol.Optional(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_LIMIT, default=DEFAULT_QUERY_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=0, max=10000)
+    ),
+}
+
+SERVICE_QUERY_EXCESS_SOLAR_DECISIONS_SCHEMA = {
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=0)),
+}
+
 SERVICE_CLEAR_DATA = "clear_data"
-SERVICES = [SERVICE_CLEAR_DATA]
+SERVICE_QUERY_HISTORY = "query_history"
+SERVICE_QUERY_EXCESS_SOLAR_DECISIONS = "query_excess_solar_decisions"
+SERVICES = [
+    SERVICE_CLEAR_DATA,
+    SERVICE_QUERY_HISTORY,
+    SERVICE_QUERY_EXCESS_SOLAR_DECISIONS,
+]
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +65,37 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         else:
             _LOGGER.error("Failed to clear data: no unique_id provided")
 
+    async def query_history(service_call: ServiceCall) -> ServiceResponse:
+        if coordinator.history is None:
+            raise HomeAssistantError(
+                "Schedule history is not enabled. Set history: true in the configuration"
+            )
+        return await coordinator.history.async_query(
+            entity_id=service_call.data.get(ATTR_UNIQUE_ID),
+            start=service_call.data.get(ATTR_START),
+            end=service_call.data.get(ATTR_END),
+            limit=service_call.data[ATTR_LIMIT],
+        )
+
+    async def query_excess_solar_decisions(
+        service_call: ServiceCall,
+    ) -> ServiceResponse:
+        # Excess solar instances are stored per config entry id (or the YAML key)
+        managers = {
+            key: bucket[EXCESS_SOLAR_MANAGER]
+            for key, bucket in hass.data[DOMAIN].items()
+            if isinstance(bucket, dict) and EXCESS_SOLAR_MANAGER in bucket
+        }
+        if entry_id := service_call.data.get(ATTR_ENTRY_ID):
+            if entry_id not in managers:
+                raise HomeAssistantError(f"No excess solar instance '{entry_id}'")
+            managers = {entry_id: managers[entry_id]}
+        limit = service_call.data.get(ATTR_LIMIT)
+        return {
+            key: {"decisions": manager.decision_log.entries(limit)}
+            for key, manager in managers.items()
+        }
+
     hass.services.async_register(
         DOMAIN,
         SERVICE_CLEAR_DATA,
@@ -41,3 +103,17 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         schema=vol.Schema(SERVICE_CLEAR_DATA_SCHEMA),
         supports_response=SupportsResponse.NONE,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        query_history,
+        schema=vol.Schema(SERVICE_QUERY_HISTORY_SCHEMA),
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_EXCESS_SOLAR_DECISIONS,
+        query_excess_solar_decisions,
+        schema=vol.Schema(SERVICE_QUERY_EXCESS_SOLAR_DECISIONS_SCHEMA),
+        supports_response=SupportsResponse.ONLY,
+    )
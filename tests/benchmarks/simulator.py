@@ -0,0 +1,292 @@
+"""Replay simulator for the Excess Solar manager.
+
+Recorded traces are fed through ``ExcessSolarManager`` and its sensors with a
+virtual clock, so a day of readings runs in a fraction of a second while the
+evaluation interval, filters and minimum on/off times behave as in real time.
+
+A trace is a CSV file or a JSON list of objects with the columns:
+
+- ``time``: seconds since the start of the trace
+- ``grid_power``: grid power (W, positive import) without the managed devices
+- one optional column per device name: power (W) the device draws while on.
+  Without it a device draws its setpoint (modulating) or its configured
+  consumption.
+
+The grid sensor reading fed to the manager is the trace grid power plus the
+power of the devices the manager has turned on, so its decisions feed back
+into the next readings.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import csv
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+from custom_components.aio_energy_management.excess_solar import (
+    ExcessSolarBinarySensor,
+    ExcessSolarModulatingBinarySensor,
+    build_sensors_from_config,
+    create_manager_from_config,
+)
+from custom_components.aio_energy_management.excess_solar.clock import Clock
+
+from homeassistant.core import HomeAssistant
+
+TRACES_DIR = Path(__file__).parent / "traces"
+GRID_SENSOR = "sensor.simulated_grid_power"
+DEFAULT_START = datetime.fromisoformat("2024-06-01T06:00:00+03:00")
+SHORT_CYCLE = 300  # seconds, a device turned off sooner was turned on needlessly
+
+
+class VirtualClock(Clock):
+    """Clock advanced by the simulator, timers run when their time is reached."""
+
+    def __init__(self, start: datetime) -> None:
+        """Init clock at `start`."""
+        self._start = start
+        self._elapsed = 0.0
+        self._timers: list[list[Any]] = []  # [due, sequence, action, cancelled]
+        self._sequence = itertools.count()
+
+    def now(self) -> datetime:
+        """Return the virtual time."""
+        return self._start + timedelta(seconds=self._elapsed)
+
+    def monotonic(self) -> float:
+        """Return virtual seconds since the start."""
+        return self._elapsed
+
+    def timestamp(self) -> float:
+        """Return the virtual time as epoch seconds."""
+        return self._start.timestamp() + self._elapsed
+
+    def call_later(
+        self, hass: HomeAssistant, delay: float, action: Callable[[Any], None]
+    ) -> Callable[[], None]:
+        """Schedule `action` in virtual time."""
+        timer = [self._elapsed + delay, next(self._sequence), action, False]
+        heapq.heappush(self._timers, timer)
+
+        def cancel() -> None:
+            timer[3] = True
+
+        return cancel
+
+    def pop_due(self, until: float) -> Callable[[Any], None] | None:
+        """Move to the next timer due by `until` and return its action."""
+        while self._timers and self._timers[0][0] <= until:
+            due, _, action, cancelled = heapq.heappop(self._timers)
+            if cancelled:
+                continue
+            self._elapsed = max(self._elapsed, due)
+            return action
+        self._elapsed = max(self._elapsed, until)
+        return None
+
+
+class TraceSample:
+    """Single row of a trace."""
+
+    def __init__(
+        self, time: float, grid_power: float, consumption: dict[str, float]
+    ) -> None:
+        """Init sample."""
+        self.time = time
+        self.grid_power = grid_power
+        self.consumption = consumption
+
+
+def load_trace(path: str | Path) -> list[TraceSample]:
+    """Load a CSV or JSON trace, sorted by time."""
+    path = Path(path)
+    with path.open(encoding="utf-8") as file:
+        if path.suffix == ".json":
+            rows = json.load(file)
+        else:
+            rows = list(csv.DictReader(file))
+    samples = [
+        TraceSample(
+            float(row["time"]),
+            float(row["grid_power"]),
+            {
+                key: float(value)
+                for key, value in row.items()
+                if key not in ("time", "grid_power") and value not in ("", None)
+            },
+        )
+        for row in rows
+    ]
+    samples.sort(key=lambda sample: sample.time)
+    return samples
+
+
+class ReplayReport:
+    """Results of a replay."""
+
+    def __init__(self) -> None:
+        """Init empty report."""
+        self.duration = 0.0  # simulated seconds
+        self.wall_time = 0.0  # seconds
+        self.surplus_energy = 0.0  # kWh exported without the devices
+        self.self_consumed_energy = 0.0  # kWh of that surplus used by devices
+        self.import_energy = 0.0  # kWh
+        self.device_import_energy = 0.0  # kWh imported because of the devices
+        self.export_energy = 0.0  # kWh
+        self.switch_events: dict[str, int] = {}
+        self.short_cycles = 0  # on periods shorter than SHORT_CYCLE
+        self.evaluations = 0
+        self.reaction_latencies: list[float] = []  # simulated seconds
+        self.decision_times: list[float] = []  # wall clock seconds
+
+    @property
+    def speedup(self) -> float:
+        """Return simulated time per wall clock time."""
+        return self.duration / self.wall_time if self.wall_time else float("inf")
+
+    @property
+    def self_consumption(self) -> float:
+        """Return the share of the surplus used by the devices."""
+        if not self.surplus_energy:
+            return 0.0
+        return self.self_consumed_energy / self.surplus_energy
+
+    def __str__(self) -> str:
+        """Return a readable summary."""
+        latency = max(self.reaction_latencies, default=0.0)
+        decision = max(self.decision_times, default=0.0)
+        lines = [
+            (
+                f"simulated {self.duration / 3600:.1f} h in {self.wall_time:.2f} s"
+                f" ({self.speedup:,.0f}x real time)"
+            ),
+            (
+                f"self-consumption {self.self_consumption:.1%}"
+                f" of {self.surplus_energy:.2f} kWh surplus"
+            ),
+            (
+                f"import {self.import_energy:.2f} kWh"
+                f" ({self.device_import_energy:.2f} kWh caused by devices),"
+                f" export {self.export_energy:.2f} kWh"
+            ),
+            (f"switch events {self.switch_events}, {self.short_cycles} short cycle(s)"),
+            (
+                f"{self.evaluations} evaluations, max reaction latency {latency:.0f} s,"
+                f" max decision time {decision * 1000:.2f} ms"
+            ),
+        ]
+        return "\n".join(lines)
+
+
+class ReplaySimulator:
+    """Replay a trace through the manager built from an excess solar config."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        start: datetime = DEFAULT_START,
+    ) -> None:
+        """Init simulator. `config` is an excess solar (YAML style) config."""
+        self._hass = hass
+        self.clock = VirtualClock(start)
+        self.sensors, _, _ = build_sensors_from_config(hass, config)
+        for sensor in self.sensors:
+            # Headless: the entities are not added to Home Assistant, they
+            # only get the entity id the manager waits for
+            sensor.async_write_ha_state = lambda: None
+            sensor.entity_id = f"binary_sensor.{sensor.unique_id}"
+        self.manager = create_manager_from_config(
+            hass, {**config, "sensor": GRID_SENSOR}, self.sensors, clock=self.clock
+        )
+        # Configured device names are the trace columns
+        self._device_names = {
+            sensor.unique_id: device["name"]
+            for sensor, device in zip(
+                self.sensors, config["power_devices"], strict=True
+            )
+        }
+
+    def device_power(
+        self, sensor: ExcessSolarBinarySensor, sample: TraceSample
+    ) -> float:
+        """Return the power a device draws at a sample."""
+        if not sensor.is_on:
+            return 0.0
+        name = self._device_names[sensor.unique_id]
+        if name in sample.consumption:
+            return sample.consumption[name]
+        if isinstance(sensor, ExcessSolarModulatingBinarySensor):
+            return sensor.setpoint
+        return sensor.get_configured_consumption()
+
+    async def run(self, trace: list[TraceSample]) -> ReplayReport:
+        """Replay the trace and return the report."""
+        report = ReplayReport()
+        report.switch_events = dict.fromkeys(self._device_names.values(), 0)
+        was_on = {sensor.unique_id: False for sensor in self.sensors}
+        turned_on: dict[str, float] = {}
+        started = time.perf_counter()
+        await self.manager.async_start()
+
+        previous: TraceSample | None = None
+        for sample in trace:
+            if previous is not None:
+                self._account(report, previous, sample.time - previous.time)
+                await self._advance(report, sample.time - trace[0].time)
+            for sensor in self.sensors:
+                if bool(sensor.is_on) != was_on[sensor.unique_id]:
+                    was_on[sensor.unique_id] = bool(sensor.is_on)
+                    report.switch_events[self._device_names[sensor.unique_id]] += 1
+                    if sensor.is_on:
+                        turned_on[sensor.unique_id] = sample.time
+                    elif sample.time - turned_on[sensor.unique_id] < SHORT_CYCLE:
+                        report.short_cycles += 1
+            grid_power = sample.grid_power + sum(
+                self.device_power(sensor, sample) for sensor in self.sensors
+            )
+            # Equal readings are state changes too, as a polling sensor reports
+            self._hass.states.async_set(GRID_SENSOR, str(grid_power), force_update=True)
+            await self._hass.async_block_till_done()
+            previous = sample
+
+        await self.manager.async_stop()
+        # The next replay starts without a reading, as after a restart
+        self._hass.states.async_remove(GRID_SENSOR)
+        report.duration = trace[-1].time - trace[0].time if trace else 0.0
+        report.wall_time = time.perf_counter() - started
+        return report
+
+    async def _advance(self, report: ReplayReport, until: float) -> None:
+        """Run the timers due by `until` (seconds since the start)."""
+        while (action := self.clock.pop_due(until)) is not None:
+            decision_started = time.perf_counter()
+            action(self.clock.now())
+            await self._hass.async_block_till_done()
+            report.decision_times.append(time.perf_counter() - decision_started)
+            report.evaluations += 1
+            latency = self.manager.diagnostic_info["reaction_latency"]
+            if latency is not None:
+                report.reaction_latencies.append(latency)
+
+    def _account(
+        self, report: ReplayReport, sample: TraceSample, seconds: float
+    ) -> None:
+        """Add the energy flows of a sample held for `seconds`."""
+        hours = seconds / 3600
+        load = sum(self.device_power(sensor, sample) for sensor in self.sensors)
+        surplus = max(-sample.grid_power, 0.0)
+        grid_power = sample.grid_power + load
+        report.surplus_energy += surplus * hours / 1000
+        report.self_consumed_energy += min(load, surplus) * hours / 1000
+        report.import_energy += max(grid_power, 0.0) * hours / 1000
+        report.device_import_energy += (
+            (max(grid_power, 0.0) - max(sample.grid_power, 0.0)) * hours / 1000
+        )
+        report.export_energy += max(-grid_power, 0.0) * hours / 1000
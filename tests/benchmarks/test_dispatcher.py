@@ -0,0 +1,88 @@
+"""Benchmark of the shared dispatcher with many managers on one grid sensor.
+
+Run with ``pytest tests/benchmarks -s`` to see the timings.
+"""
+
+import time
+
+from custom_components.aio_energy_management.excess_solar import (
+    build_sensors_from_config,
+    create_manager_from_config,
+)
+from custom_components.aio_energy_management.excess_solar.dispatcher import (
+    get_dispatcher,
+)
+
+from homeassistant.core import HomeAssistant
+
+from .simulator import DEFAULT_START, GRID_SENSOR, VirtualClock
+
+MANAGERS = 20
+READINGS = 2000
+READING_INTERVAL = 5  # seconds
+EVALUATION_INTERVAL = 30  # seconds
+
+
+class CountingClock(VirtualClock):
+    """Virtual clock counting the scheduled timers."""
+
+    timers = 0
+
+    def call_later(self, hass, delay, action):
+        """Count and schedule `action`."""
+        self.timers += 1
+        return super().call_later(hass, delay, action)
+
+
+async def test_dispatcher_twenty_managers_one_sensor(hass: HomeAssistant) -> None:
+    """Readings are parsed once and all managers share the evaluation tick."""
+    clock = CountingClock(DEFAULT_START)
+    managers = []
+    for index in range(MANAGERS):
+        config = {
+            "name": f"Excess Solar {index}",
+            "sensor": GRID_SENSOR,
+            "buffer": 100,
+            "evaluation_interval": EVALUATION_INTERVAL,
+            "power_devices": [
+                {"name": f"Heater {index}", "consumption": 1000, "priority": 1},
+                {"name": f"Pump {index}", "consumption": 500, "priority": 2},
+            ],
+        }
+        sensors, _, _ = build_sensors_from_config(hass, config)
+        for sensor in sensors:
+            sensor.async_write_ha_state = lambda: None
+            sensor.entity_id = f"binary_sensor.{sensor.unique_id}"
+        manager = create_manager_from_config(hass, config, sensors, clock=clock)
+        await manager.async_start()
+        managers.append(manager)
+    dispatcher = get_dispatcher(hass, clock)
+
+    started = time.perf_counter()
+    for reading in range(READINGS):
+        hass.states.async_set(GRID_SENSOR, str(-800 - reading % 7 * 100))
+        elapsed = (reading + 1) * READING_INTERVAL
+        while (action := clock.pop_due(elapsed)) is not None:
+            action(clock.now())
+        await hass.async_block_till_done()
+    wall_time = time.perf_counter() - started
+
+    ticks = READINGS * READING_INTERVAL // EVALUATION_INTERVAL
+    print(
+        f"\n{MANAGERS} managers, {READINGS} readings in {wall_time:.2f} s"
+        f" ({wall_time / READINGS * 1e6:.0f} us per reading),"
+        f" {clock.timers} timers"
+    )
+
+    assert dispatcher.entities == {GRID_SENSOR}
+    assert dispatcher.readings == READINGS
+    # One timer per tick for all managers, not one per manager
+    assert clock.timers <= ticks + 1
+    # Every manager evaluated on the same, last tick
+    last = {m.decision_log.entries(limit=1)[0]["time"] for m in managers}
+    assert len(last) == 1
+    assert all(sensor.is_on for m in managers for sensor in m.sensors[:1])
+
+    for manager in managers:
+        await manager.async_stop()
+    assert dispatcher.entities == set()
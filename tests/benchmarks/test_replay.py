@@ -0,0 +1,117 @@
+"""Replay benchmarks of the Excess Solar manager on the reference traces.
+
+Run with ``pytest tests/benchmarks -s`` to see the reports.
+"""
+
+from homeassistant.core import HomeAssistant
+
+from .simulator import TRACES_DIR, ReplaySimulator, TraceSample, load_trace
+
+CONFIG = {
+    "buffer": 100,
+    "evaluation_interval": 30,
+    "power_devices": [
+        {
+            "name": "Water Heater",
+            "consumption": 2000,
+            "priority": 1,
+            "minimum_on_time": 30,
+        },
+        {
+            "name": "EV Charger",
+            "consumption": 3680,
+            "priority": 2,
+            "modulating": True,
+            "min_power": 1380,
+            "power_step": 230,
+        },
+        {"name": "Pool Pump", "consumption": 800, "priority": 3, "minimum_on_time": 10},
+    ],
+}
+
+
+async def test_replay_clear_day(hass: HomeAssistant) -> None:
+    """A clear day is mostly used by the devices, far faster than real time."""
+    simulator = ReplaySimulator(hass, CONFIG)
+    report = await simulator.run(load_trace(TRACES_DIR / "clear_day.csv"))
+    print(f"\nclear day\n{report}")
+
+    assert report.duration == 14 * 3600
+    assert report.speedup > 1000
+    assert report.self_consumption > 0.7
+    assert report.evaluations >= report.duration / CONFIG["evaluation_interval"] - 1
+    assert max(report.reaction_latencies) <= CONFIG["evaluation_interval"]
+    assert all(events <= 20 for events in report.switch_events.values())
+
+
+async def test_replay_cloudy_day_minimum_off_time(hass: HomeAssistant) -> None:
+    """A minimum off time trades switch events against self-consumption."""
+    trace = load_trace(TRACES_DIR / "cloudy_day.json")
+    default = await ReplaySimulator(hass, CONFIG).run(trace)
+    calm = await ReplaySimulator(
+        hass,
+        {
+            **CONFIG,
+            "power_devices": [
+                {**device, "minimum_off_time": 10} for device in CONFIG["power_devices"]
+            ],
+        },
+    ).run(trace)
+    print(f"\ncloudy day\n{default}\ncloudy day, 10 min off time\n{calm}")
+
+    assert sum(calm.switch_events.values()) < sum(default.switch_events.values())
+    assert calm.self_consumption > 0.5
+
+
+async def test_replay_learned_consumption(hass: HomeAssistant) -> None:
+    """A heater drawing more than configured is no longer turned on and shed."""
+    # 2 kW rated heater drawing 2.8 kW: 2.3 kW surplus for an hour, then 3.3 kW
+    trace = [
+        TraceSample(
+            float(seconds), -2300.0 if seconds < 3600 else -3300.0, {"Heater": 2800}
+        )
+        for seconds in range(0, 2 * 3600, 10)
+    ]
+    config = {
+        "buffer": 100,
+        "evaluation_interval": 30,
+        "power_devices": [
+            {"name": "Heater", "consumption": 2000, "priority": 1},
+            {"name": "Pool Pump", "consumption": 800, "priority": 2},
+        ],
+    }
+    static = ReplaySimulator(hass, config)
+    for sensor in static.sensors:
+        sensor.consumption_model.min_samples = len(trace)  # never learned
+    static_report = await static.run(trace)
+    learned = ReplaySimulator(hass, config)
+    learned_report = await learned.run(trace)
+    print(f"\nstatic consumption\n{static_report}\nlearned\n{learned_report}")
+
+    heater = learned.sensors[0]
+    assert heater.get_expected_consumption() == 2800
+    assert learned_report.short_cycles < static_report.short_cycles / 4
+    assert learned_report.device_import_energy < static_report.device_import_energy
+    # The heater still runs once the surplus covers its real draw
+    assert heater.is_on
+
+
+async def test_replay_shadow_strategies(hass: HomeAssistant) -> None:
+    """Shadow strategies don't change the live decisions."""
+    trace = load_trace(TRACES_DIR / "cloudy_day.json")
+    live = await ReplaySimulator(hass, CONFIG).run(trace)
+    simulator = ReplaySimulator(
+        hass, {**CONFIG, "shadow_strategies": ["knapsack", "median", "ema"]}
+    )
+    shadowed = await simulator.run(trace)
+    strategies = simulator.manager.diagnostic_info["strategies"]
+    print(f"\ncloudy day with shadows\n{shadowed}")
+    for name, counters in strategies.items():
+        print(f"{name}: {counters}")
+
+    assert shadowed.switch_events == live.switch_events
+    assert shadowed.self_consumption == live.self_consumption
+    assert strategies["live"]["switches"] == sum(live.switch_events.values())
+    for name in ("knapsack", "median", "ema"):
+        assert strategies[name]["evaluations"] == shadowed.evaluations
+        assert strategies[name]["self_consumption"] is not None
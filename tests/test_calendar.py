@@ -0,0 +1,83 @@
+"""Tests for calendar."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import zoneinfo
+
+from custom_components.aio_energy_management.calendar import (
+    EnergyManagementCalendar,
+)
+from custom_components.aio_energy_management.coordinator import (
+    EnergyManagementCoordinator,
+)
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.core import HomeAssistant
+
+TZINFO = zoneinfo.ZoneInfo(key="Europe/Helsinki")
+
+
+def _slot(day: int, hour: int, hours: int = 1) -> dict:
+    start = datetime(2025, 3, day, hour, 0, tzinfo=TZINFO)
+    return {"start": start, "end": start + timedelta(hours=hours)}
+
+
+async def test_calendar_event_index(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test calendar events are updated per entity and queried from the index."""
+    freezer.move_to("2025-03-14 14:30+02:00")
+    coordinator = EnergyManagementCoordinator(hass)
+    await coordinator.async_set_data(
+        "sensor_a",
+        "A",
+        True,
+        "Test",
+        {"list": [_slot(14, 3, 3), _slot(15, 1)], "next": {"list": [_slot(16, 2)]}},
+        None,
+    )
+    await coordinator.async_set_data(
+        "sensor_b", "B", True, "Test", {"list": [_slot(14, 12, 4)]}, None
+    )
+    await coordinator.async_set_data(
+        "sensor_c", "C", False, "Test", {"list": [_slot(14, 13)]}, None
+    )
+
+    calendar = EnergyManagementCalendar(hass, "my calendar", "Calendar", coordinator)
+    calendar.async_write_ha_state = MagicMock()
+    await calendar.async_added_to_hass()
+
+    # Ongoing event of B
+    assert calendar.event.summary == "B"
+    events = await calendar.async_get_events(
+        hass,
+        datetime(2025, 3, 14, 5, 0, tzinfo=TZINFO),
+        datetime(2025, 3, 15, 1, 0, tzinfo=TZINFO),
+    )
+    assert [(event.summary, event.start.hour) for event in events] == [
+        ("A", 3),
+        ("B", 12),
+        ("A", 1),
+    ]
+
+    # Only the changed entity is updated
+    await coordinator.async_set_data(
+        "sensor_b", "B", True, "Test", {"list": [_slot(14, 20)]}, None
+    )
+    assert calendar.async_write_ha_state.called
+    assert calendar.event.summary == "B"
+    assert calendar.event.start.hour == 20
+
+    freezer.move_to("2025-03-14 21:30+02:00")
+    assert calendar.event.summary == "A"
+    assert calendar.event.start == datetime(2025, 3, 15, 1, 0, tzinfo=TZINFO)
+
+    await coordinator.async_clear_data("sensor_a")
+    assert calendar.event is None
+    assert (
+        await calendar.async_get_events(
+            hass,
+            datetime(2025, 3, 14, 0, 0, tzinfo=TZINFO),
+            datetime(2025, 3, 17, 0, 0, tzinfo=TZINFO),
+        )
+    )[0].summary == "B"
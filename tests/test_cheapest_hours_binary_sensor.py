@@ -2091,3 +2091,137 @@ async def test_cheapest_hours_stromligning_daytime(
     assert sensor.is_on is True
 
 
+async def test_warm_restart_reuses_stored_prices(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test restarted sensor reuses stored schedule and prices without service calls."""
+    tzinfo = zoneinfo.ZoneInfo(key="Europe/Helsinki")
+    coordinator_mock = _setup_coordinator_mock()
+    freezer.move_to("2025-03-14 14:30+03:00")
+
+    _setup_nordpool_official_mock(
+        hass,
+        "nordpool_official_service_20250313.json",
+        "nordpool_official_service_20250314.json",
+        "nordpool_official_service_20250315.json",
+    )
+
+    def create_sensor(number_of_hours: int) -> CheapestHoursBinarySensor:
+        return CheapestHoursBinarySensor(
+            hass=hass,
+            nordpool_official_config_entry="DUMMY",
+            unique_id="my_sensor",
+            name="My Sensor",
+            first_hour=0,
+            last_hour=23,
+            starting_today=False,
+            number_of_hours=number_of_hours,
+            sequential=False,
+            coordinator=coordinator_mock,
+        )
+
+    sensor = create_sensor(3)
+    await sensor.async_update()
+    data = coordinator_mock.get_data()
+    assert data["fingerprint"] is not None
+    assert len(data["prices"]["tomorrow"]) == 24
+
+    # Stored internals are not exposed as attributes
+    assert "prices" not in sensor.extra_state_attributes
+    assert "fingerprint" not in sensor.extra_state_attributes
+
+    # Any further service call would be a refetch
+    service_mock = AsyncMock(return_value={})
+    hass.services.async_register(
+        "nordpool",
+        "get_price_indices_for_date",
+        service_mock,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    # Restart with unchanged configuration: stored schedule is adopted as is
+    freezer.move_to("2025-03-14 15:30+03:00")
+    sensor = create_sensor(3)
+    await sensor.async_added_to_hass()
+    await sensor.async_update()
+    service_mock.assert_not_called()
+    assert sensor.extra_state_attributes["list"][0]["start"] == datetime(
+        2025, 3, 15, 3, 0, tzinfo=tzinfo
+    )
+    assert sensor.extra_state_attributes["list"][0]["end"] == datetime(
+        2025, 3, 15, 6, 0, tzinfo=tzinfo
+    )
+
+    # Restart with changed configuration: recalculated from the stored prices
+    sensor = create_sensor(4)
+    await sensor.async_update()
+    service_mock.assert_not_called()
+    assert data["fingerprint"] == sensor._fingerprint
+    hours = sum(
+        (item["end"] - item["start"]).total_seconds() / 3600
+        for item in sensor.extra_state_attributes["list"]
+    )
+    assert hours == 4
+
+
+async def test_preview_from_stored_prices(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test preview calculates from prices stored by another sensor."""
+    tzinfo = zoneinfo.ZoneInfo(key="Europe/Helsinki")
+    coordinator_mock = _setup_coordinator_mock()
+    freezer.move_to("2025-03-14 14:30+03:00")
+
+    _setup_nordpool_official_mock(
+        hass,
+        "nordpool_official_service_20250313.json",
+        "nordpool_official_service_20250314.json",
+        "nordpool_official_service_20250315.json",
+    )
+
+    def create_sensor(unique_id: str, sequential: bool) -> CheapestHoursBinarySensor:
+        return CheapestHoursBinarySensor(
+            hass=hass,
+            nordpool_official_config_entry="DUMMY",
+            unique_id=unique_id,
+            name="My Sensor",
+            first_hour=0,
+            last_hour=23,
+            starting_today=False,
+            number_of_hours=3,
+            sequential=sequential,
+            coordinator=coordinator_mock,
+        )
+
+    # No stored prices, nothing to preview
+    coordinator_mock.data = {}
+    assert create_sensor("preview", True).preview() is None
+
+    await create_sensor("my_sensor", False).async_update()
+    data = coordinator_mock.get_data()
+    coordinator_mock.data = {"my_sensor": data}
+    stored_list = list(data["list"])
+    coordinator_mock.async_set_data.reset_mock()
+
+    service_mock = AsyncMock(return_value={})
+    hass.services.async_register(
+        "nordpool",
+        "get_price_indices_for_date",
+        service_mock,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    preview = create_sensor("preview", True).preview()
+    service_mock.assert_not_called()
+    assert preview["list"] == [
+        {
+            "start": datetime(2025, 3, 15, 3, 0, tzinfo=tzinfo),
+            "end": datetime(2025, 3, 15, 6, 0, tzinfo=tzinfo),
+        }
+    ]
+    assert preview["mean_price"] is not None
+    assert preview["min_price"] <= preview["mean_price"] <= preview["max_price"]
+
+    # Stored data of the other sensor is untouched
+    assert data["list"] == stored_list
+    coordinator_mock.async_set_data.assert_not_called()
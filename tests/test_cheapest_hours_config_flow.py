@@ -0,0 +1,327 @@
+"""Tests for the cheapest hours config and options flow preview."""
+
+from unittest.mock import patch
+
+from custom_components.aio_energy_management.cheapest_hours.binary_sensor import (
+    CheapestHoursBinarySensor,
+)
+from custom_components.aio_energy_management.cheapest_hours.config_flow import (
+    CONF_ENTRY_TYPE,
+    ENTRY_TYPE_CHEAPEST_HOURS,
+)
+from custom_components.aio_energy_management.const import (
+    CONF_ALLOW_DYNAMIC_ENTITIES,
+    CONF_CALENDAR,
+    CONF_DATA_PROVIDER_TYPE,
+    CONF_FIRST_HOUR,
+    CONF_INVERSED,
+    CONF_LAST_HOUR,
+    CONF_MTU,
+    CONF_NORDPOOL_ENTITY,
+    CONF_NUMBER_OF_SLOTS,
+    CONF_RETENTION_DAYS,
+    CONF_SEQUENTIAL,
+    CONF_UNIQUE_ID,
+    CONF_USE_OFFSET,
+    COORDINATOR,
+    DATA_PROVIDER_NORDPOOL,
+    DOMAIN,
+)
+from custom_components.aio_energy_management.coordinator import (
+    EnergyManagementCoordinator,
+)
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
+
+from .test_cheapest_hours_binary_sensor import _setup_nordpool_mock
+
+ENTRY_DATA = {
+    CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS,
+    CONF_UNIQUE_ID: "my_hours",
+    CONF_NAME: "My Hours",
+    CONF_DATA_PROVIDER_TYPE: DATA_PROVIDER_NORDPOOL,
+    CONF_NORDPOOL_ENTITY: "sensor.nordpool",
+    CONF_MTU: 60,
+    CONF_ALLOW_DYNAMIC_ENTITIES: False,
+    CONF_NUMBER_OF_SLOTS: 2,
+    CONF_FIRST_HOUR: 0,
+    CONF_LAST_HOUR: 23,
+    CONF_SEQUENTIAL: False,
+    CONF_INVERSED: False,
+    CONF_CALENDAR: True,
+    CONF_RETENTION_DAYS: 1,
+    CONF_USE_OFFSET: False,
+}
+
+
+@pytest.fixture(autouse=True)
+def _no_setup():
+    """Don't set up the created entries."""
+    with (
+        patch("custom_components.aio_energy_management.async_setup", return_value=True),
+        patch(
+            "custom_components.aio_energy_management.async_setup_entry",
+            return_value=True,
+        ),
+    ):
+        yield
+
+
+async def _setup_coordinator(hass: HomeAssistant, cached: bool) -> None:
+    """Set up the coordinator, with prices cached by another sensor."""
+    _setup_nordpool_mock(hass, "nordpool_happy_20240713.json")
+    coordinator = EnergyManagementCoordinator(hass)
+    hass.data[DOMAIN] = {COORDINATOR: coordinator}
+    if cached:
+        sensor = CheapestHoursBinarySensor(
+            hass=hass,
+            nordpool_entity="sensor.nordpool",
+            unique_id="other_sensor",
+            name="Other Sensor",
+            first_hour=0,
+            last_hour=23,
+            starting_today=False,
+            number_of_hours=3,
+            sequential=False,
+            coordinator=coordinator,
+        )
+        # Frozen dates can't be serialized to the store
+        with patch("homeassistant.helpers.storage.Store.async_save"):
+            await sensor.async_update()
+        assert coordinator.data["other_sensor"]["prices"]
+
+
+def _defaults(result: FlowResult) -> dict:
+    """Return the default and suggested values of a form."""
+    values = {}
+    for key in result["data_schema"].schema:
+        if (suggested := (key.description or {}).get("suggested_value")) is not None:
+            values[str(key)] = suggested
+        elif callable(key.default):
+            values[str(key)] = key.default()
+    return values
+
+
+async def _configure_settings(
+    hass: HomeAssistant, result: FlowResult, number_of_slots: int
+) -> FlowResult:
+    """Fill in the provider, basic and advanced steps."""
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_DATA_PROVIDER_TYPE: DATA_PROVIDER_NORDPOOL}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_NORDPOOL_ENTITY: "sensor.nordpool",
+            CONF_MTU: 60,
+            CONF_ALLOW_DYNAMIC_ENTITIES: False,
+        },
+    )
+    return await _configure_slots(hass, result, number_of_slots)
+
+
+async def _configure_slots(
+    hass: HomeAssistant, result: FlowResult, number_of_slots: int
+) -> FlowResult:
+    """Fill in the basic and advanced steps."""
+    assert result["step_id"] == "cheapest_hours_basic"
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "My Hours",
+            CONF_NUMBER_OF_SLOTS: number_of_slots,
+            CONF_FIRST_HOUR: 0,
+            CONF_LAST_HOUR: 23,
+            CONF_SEQUENTIAL: True,
+        },
+    )
+    assert result["step_id"] == "cheapest_hours_advanced"
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_USE_OFFSET: False}
+    )
+
+
+async def test_config_flow_preview(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Settings are previewed on cached prices, adjusted and saved."""
+    freezer.move_to("2024-07-13 14:25+03:00")
+    await _setup_coordinator(hass, cached=True)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS}
+    )
+    result = await _configure_settings(hass, result, number_of_slots=3)
+    assert result["type"] is FlowResultType.MENU
+    assert result["step_id"] == "cheapest_hours_preview"
+    assert result["menu_options"] == ["cheapest_hours_save", "cheapest_hours_adjust"]
+    placeholders = result["description_placeholders"]
+    assert placeholders["slots"].count("\n") == 0  # one sequential block
+    assert placeholders["mean_price"] != "-"
+
+    # Adjust: the forms are filled in with the previewed settings
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "cheapest_hours_adjust"}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "cheapest_hours_basic"
+    defaults = _defaults(result)
+    assert defaults[CONF_NAME] == "My Hours"
+    assert defaults[CONF_NUMBER_OF_SLOTS] == 3
+    assert defaults[CONF_SEQUENTIAL] is True
+
+    result = await _configure_slots(hass, result, number_of_slots=4)
+    assert result["step_id"] == "cheapest_hours_preview"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "cheapest_hours_save"}
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["title"] == "My Hours"
+    assert result["data"][CONF_NUMBER_OF_SLOTS] == 4
+    assert result["data"][CONF_UNIQUE_ID] == "my_hours"
+    assert result["data"][CONF_ENTRY_TYPE] == ENTRY_TYPE_CHEAPEST_HOURS
+    assert result["result"].unique_id == "my_hours"
+
+
+async def test_config_flow_without_cached_prices(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Without cached prices the settings are saved directly."""
+    freezer.move_to("2024-07-13 14:25+03:00")
+    await _setup_coordinator(hass, cached=False)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_ENTRY_TYPE: ENTRY_TYPE_CHEAPEST_HOURS}
+    )
+    result = await _configure_settings(hass, result, number_of_slots=3)
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_NUMBER_OF_SLOTS] == 3
+
+
+async def test_options_flow_preview(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Options are previewed on cached prices, adjusted and saved to the entry."""
+    freezer.move_to("2024-07-13 14:25+03:00")
+    await _setup_coordinator(hass, cached=True)
+    entry = MockConfigEntry(
+        domain=DOMAIN, data=ENTRY_DATA, unique_id="my_hours", title="My Hours"
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["step_id"] == "cheapest_hours_data_provider"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_DATA_PROVIDER_TYPE: DATA_PROVIDER_NORDPOOL}
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_NORDPOOL_ENTITY: "sensor.nordpool",
+            CONF_MTU: 60,
+            CONF_ALLOW_DYNAMIC_ENTITIES: False,
+        },
+    )
+    assert _defaults(result)[CONF_NUMBER_OF_SLOTS] == 2
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "My Hours",
+            CONF_NUMBER_OF_SLOTS: 3,
+            CONF_FIRST_HOUR: 0,
+            CONF_LAST_HOUR: 23,
+            CONF_SEQUENTIAL: True,
+        },
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_USE_OFFSET: False}
+    )
+    assert result["type"] is FlowResultType.MENU
+    assert result["step_id"] == "cheapest_hours_preview"
+
+    # Adjust: the previewed values win over the saved entry
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "cheapest_hours_adjust"}
+    )
+    assert result["step_id"] == "cheapest_hours_basic"
+    defaults = _defaults(result)
+    assert defaults[CONF_NUMBER_OF_SLOTS] == 3
+    assert defaults[CONF_SEQUENTIAL] is True
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "My Hours",
+            CONF_NUMBER_OF_SLOTS: 4,
+            CONF_FIRST_HOUR: 0,
+            CONF_LAST_HOUR: 23,
+            CONF_SEQUENTIAL: True,
+        },
+    )
+    assert result["step_id"] == "cheapest_hours_advanced"
+    assert _defaults(result)[CONF_CALENDAR] is True
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_USE_OFFSET: False}
+    )
+    assert result["step_id"] == "cheapest_hours_preview"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "cheapest_hours_save"}
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.data[CONF_NUMBER_OF_SLOTS] == 4
+    assert entry.data[CONF_SEQUENTIAL] is True
+    assert entry.data[CONF_UNIQUE_ID] == "my_hours"
+    assert entry.data[CONF_DATA_PROVIDER_TYPE] == DATA_PROVIDER_NORDPOOL
+
+
+async def test_options_flow_without_cached_prices(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Without cached prices the options are saved directly."""
+    freezer.move_to("2024-07-13 14:25+03:00")
+    await _setup_coordinator(hass, cached=False)
+    entry = MockConfigEntry(
+        domain=DOMAIN, data=ENTRY_DATA, unique_id="my_hours", title="My Hours"
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_DATA_PROVIDER_TYPE: DATA_PROVIDER_NORDPOOL}
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_NORDPOOL_ENTITY: "sensor.nordpool",
+            CONF_MTU: 60,
+            CONF_ALLOW_DYNAMIC_ENTITIES: False,
+        },
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_NAME: "My Hours",
+            CONF_NUMBER_OF_SLOTS: 5,
+            CONF_FIRST_HOUR: 0,
+            CONF_LAST_HOUR: 23,
+            CONF_SEQUENTIAL: False,
+        },
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_USE_OFFSET: False}
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.data[CONF_NUMBER_OF_SLOTS] == 5
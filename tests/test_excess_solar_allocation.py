@@ -0,0 +1,61 @@
+"""Tests for the Excess Solar allocation planner."""
+
+from custom_components.aio_energy_management.excess_solar.allocation import (
+    AllocationCandidate,
+    plan_allocation,
+)
+
+
+def _candidate(
+    key: str,
+    priority: int,
+    consumption: float,
+    is_on: bool = False,
+    can_change: bool = True,
+    eligible: bool = True,
+) -> AllocationCandidate:
+    return AllocationCandidate(key, priority, consumption, is_on, can_change, eligible)
+
+
+def test_plan_fills_surplus_in_priority_order() -> None:
+    """All fitting devices are planned at once, higher priority first."""
+    candidates = [
+        _candidate("a", 1, 2000),
+        _candidate("b", 2, 3000),
+        _candidate("c", 3, 1000),
+        _candidate("d", 4, 500),
+    ]
+    assert plan_allocation(candidates, surplus=3600, buffer=0) == {"a", "c", "d"}
+
+
+def test_plan_same_priority_uses_most_power() -> None:
+    """Devices sharing a priority are combined to use most of the surplus."""
+    candidates = [
+        _candidate("a", 1, 1500),
+        _candidate("b", 1, 1000),
+        _candidate("c", 1, 1200),
+    ]
+    # Greedy by list order would take only a (1500W), b + c use 2200W
+    assert plan_allocation(candidates, surplus=2300, buffer=0) == {"b", "c"}
+
+
+def test_plan_frees_lower_priority_when_importing() -> None:
+    """Importing drops lowest priority devices, locked devices are kept."""
+    candidates = [
+        _candidate("a", 1, 2000, is_on=True),
+        _candidate("b", 2, 1000, is_on=True, can_change=False),
+        _candidate("c", 3, 1000, is_on=True),
+        _candidate("d", 4, 500, is_on=True),
+    ]
+    assert plan_allocation(candidates, surplus=-1200, buffer=100) == {"a", "b"}
+
+
+def test_plan_swaps_lower_priority_for_higher() -> None:
+    """Power of a lower priority device is given to a higher priority device."""
+    candidates = [
+        _candidate("heater", 1, 3000),
+        _candidate("floor", 2, 700, is_on=True),
+        _candidate("blocked", 3, 500, can_change=False),
+        _candidate("disabled", 4, 200, is_on=True, eligible=False),
+    ]
+    assert plan_allocation(candidates, surplus=2500, buffer=0) == {"heater"}
@@ -0,0 +1,31 @@
+"""Tests for the Excess Solar battery policy."""
+
+from custom_components.aio_energy_management.excess_solar.battery import (
+    BATTERY_DEVICES_FIRST,
+    BATTERY_FIRST,
+    BATTERY_SPLIT,
+    BatteryPolicy,
+)
+
+
+def test_battery_first_until_target() -> None:
+    """Charging power goes to devices only once the target is reached."""
+    policy = BatteryPolicy(BATTERY_FIRST, soc_target=80)
+    assert policy.grid_power(0, 2000, soc=50) == 0
+    assert policy.grid_power(0, 2000, soc=None) == 0
+    assert policy.grid_power(0, 2000, soc=80) == -2000
+
+
+def test_devices_first_and_split() -> None:
+    """Devices first takes all charging power, split a share of it."""
+    assert BatteryPolicy(BATTERY_DEVICES_FIRST).grid_power(-100, 2000, soc=10) == -2100
+    split = BatteryPolicy(BATTERY_SPLIT, soc_target=90, split=25)
+    assert split.grid_power(0, 2000, soc=50) == -500
+    assert split.grid_power(0, 2000, soc=95) == -2000
+
+
+def test_discharge_counts_as_import() -> None:
+    """Devices are never run from the battery."""
+    policy = BatteryPolicy(BATTERY_DEVICES_FIRST)
+    assert policy.grid_power(0, -1500, soc=100) == 1500
+    assert policy.grid_power(300, None, soc=None) == 300
@@ -0,0 +1,45 @@
+"""Tests for the Excess Solar learned consumption."""
+
+from custom_components.aio_energy_management.excess_solar.consumption import (
+    ConsumptionModel,
+    plausible_step,
+)
+
+
+def test_model_learns_after_min_samples() -> None:
+    """The estimate starts at the first sample and follows new ones."""
+    model = ConsumptionModel(learning_rate=0.5, min_samples=2)
+    assert not model.learned
+    model.observe(2800)
+    assert model.watts == 2800
+    assert not model.learned
+    model.observe(2600)
+    assert model.watts == 2700
+    assert model.learned
+
+
+def test_model_restore() -> None:
+    """Stored estimates are restored, invalid ones ignored."""
+    model = ConsumptionModel()
+    model.observe(1234.56)
+    assert model.as_dict() == {"watts": 1234.6, "samples": 1}
+
+    restored = ConsumptionModel()
+    restored.restore({"watts": 1500, "samples": 5})
+    assert restored.learned
+    assert restored.watts == 1500
+
+    for data in ({}, {"watts": "x", "samples": 1}, {"watts": 0, "samples": 3}):
+        model = ConsumptionModel()
+        model.restore(data)
+        assert model.watts is None
+        assert model.samples == 0
+
+
+def test_plausible_step() -> None:
+    """Grid steps far from the configured consumption are not learned."""
+    assert plausible_step(2800, 2000)
+    assert plausible_step(1000, 2000)
+    assert not plausible_step(900, 2000)
+    assert not plausible_step(4100, 2000)
+    assert not plausible_step(500, 0)
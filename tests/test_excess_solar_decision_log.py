@@ -0,0 +1,51 @@
+"""Tests for the Excess Solar decision log."""
+
+from custom_components.aio_energy_management.excess_solar.decision_log import (
+    ACTION_ACTIVATE,
+    ACTION_NONE,
+    REASON_SURPLUS,
+    REASON_WITHIN_BUFFER,
+    DecisionLog,
+)
+
+
+def test_decision_log_keeps_newest_entries() -> None:
+    """The ring buffer overwrites the oldest decisions, entries are oldest first."""
+    log = DecisionLog(size=3)
+    assert log.entries() == []
+    for index in range(5):
+        log.record(
+            1717221600.0 + index,
+            float(index),
+            float(-index),
+            ACTION_NONE,
+            (),
+            REASON_WITHIN_BUFFER,
+            0.0005,
+        )
+
+    assert len(log) == 3
+    assert [entry["grid_power"] for entry in log.entries()] == [2.0, 3.0, 4.0]
+    assert [entry["grid_power"] for entry in log.entries(limit=2)] == [3.0, 4.0]
+    assert log.entries(limit=0) == []
+
+    log.record(
+        1717221700.0,
+        -900.0,
+        -850.0,
+        ACTION_ACTIVATE,
+        ("Heater",),
+        REASON_SURPLUS,
+        0.001,
+    )
+    newest = log.entries(limit=1)[0]
+    assert newest["filtered"] == -850.0
+    assert newest["action"] == ACTION_ACTIVATE
+    assert newest["devices"] == ["Heater"]
+    assert newest["reason"] == REASON_SURPLUS
+    assert newest["duration_ms"] == 1.0
+    assert newest["time"].startswith("2024-06-01T09:")
+
+    log.clear()
+    assert len(log) == 0
+    assert log.entries() == []
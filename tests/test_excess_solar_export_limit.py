@@ -0,0 +1,49 @@
+"""Tests for the Excess Solar export limit controller."""
+
+from custom_components.aio_energy_management.excess_solar.export_limit import (
+    ExportLimitController,
+)
+
+
+def test_proportional_output() -> None:
+    """The first update only has the error over the limit."""
+    controller = ExportLimitController(1000)
+    assert controller.update(1500, 0.0) == 500
+    assert controller.update(800, 0.0) == -200
+    assert controller.integral == 0
+
+
+def test_integral_acts_on_lasting_error() -> None:
+    """A small lasting overshoot grows the output until it is acted on."""
+    controller = ExportLimitController(0, integral_time=100, integral_limit=1000)
+    assert controller.update(40, 0.0) == 40
+    assert controller.update(40, 50.0) == 60
+    assert controller.update(40, 100.0) == 80
+
+
+def test_integral_is_clamped() -> None:
+    """The integral stays within the integral limit."""
+    controller = ExportLimitController(0, integral_time=10, integral_limit=300)
+    controller.update(1000, 0.0)
+    assert controller.update(1000, 100.0) == 1300
+    assert controller.update(-1000, 200.0) == -1300
+    assert controller.integral == -300
+
+
+def test_reset_and_stop() -> None:
+    """Reset clears the integral, stop also the time of the last update."""
+    controller = ExportLimitController(0, integral_time=10)
+    controller.update(100, 0.0)
+    controller.update(100, 1.0)
+    controller.reset()
+    assert controller.integral == 0
+    assert controller.update(100, 2.0) == 110
+
+    controller.stop()
+    assert controller.update(100, 100.0) == 100
+    assert controller.as_dict() == {
+        "limit": 0,
+        "error": 100,
+        "integral": 0,
+        "output": 100,
+    }
@@ -0,0 +1,60 @@
+"""Tests for the Excess Solar grid power filters."""
+
+from custom_components.aio_energy_management.excess_solar.filters import (
+    FILTER_EMA,
+    FILTER_LAST,
+    FILTER_MAX,
+    FILTER_MEDIAN,
+    FILTER_MIN,
+    create_filter,
+)
+import pytest
+
+
+def test_last_filter_returns_latest_reading() -> None:
+    """Latest reading is returned as is."""
+    grid_filter = create_filter(FILTER_LAST)
+    assert grid_filter.value(0) is None
+    grid_filter.add(-500, 0)
+    grid_filter.add(200, 1)
+    assert grid_filter.value(100) == 200
+
+
+def test_median_filter_ignores_transient() -> None:
+    """A single cloud transient does not move the median."""
+    grid_filter = create_filter(FILTER_MEDIAN, window=60)
+    for second, value in enumerate([-2000, -2100, 800, -1900, -2050]):
+        grid_filter.add(value, second * 5)
+    assert grid_filter.value(25) == -2000
+
+
+def test_min_max_filter_window_eviction() -> None:
+    """Readings superseded before the window start are dropped."""
+    min_filter = create_filter(FILTER_MIN, window=60)
+    max_filter = create_filter(FILTER_MAX, window=60)
+    for grid_filter in (min_filter, max_filter):
+        grid_filter.add(-3000, 0)
+        grid_filter.add(500, 10)
+        grid_filter.add(-1000, 50)
+
+    assert min_filter.value(60) == -3000  # -3000 was valid until 10s
+    assert min_filter.value(75) == -1000
+    assert max_filter.value(75) == 500
+    # Sensor has been silent, the latest reading is still valid
+    assert max_filter.value(1000) == -1000
+
+
+def test_ema_filter_time_constant() -> None:
+    """Moving average approaches the held reading with the time constant."""
+    grid_filter = create_filter(FILTER_EMA, window=60)
+    grid_filter.add(0, 0)
+    grid_filter.add(-1000, 0)
+    assert grid_filter.value(0) == 0
+    assert grid_filter.value(60) == pytest.approx(-632.1, abs=0.1)
+    assert grid_filter.value(6000) == pytest.approx(-1000)
+
+
+def test_unknown_filter() -> None:
+    """Unknown filter type is rejected."""
+    with pytest.raises(ValueError):
+        create_filter("unknown")
@@ -0,0 +1,66 @@
+"""Tests for the Excess Solar forecast planning."""
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.aio_energy_management.excess_solar.forecast import (
+    PlanRequest,
+    SolarForecast,
+    parse_forecast,
+)
+
+
+def _hour(hour: int) -> datetime:
+    return datetime(2024, 6, 1, hour, tzinfo=UTC)
+
+
+def _forecast(powers: dict[int, float], base_load: float = 0) -> SolarForecast:
+    forecast = SolarForecast(base_load=base_load)
+    forecast.update(
+        parse_forecast(
+            {_hour(hour).isoformat(): power for hour, power in powers.items()}
+        )
+    )
+    return forecast
+
+
+def test_parse_forecast_formats() -> None:
+    """Mappings and lists of periods are parsed, invalid items skipped."""
+    slots = parse_forecast(
+        [
+            {"period_start": "2024-06-01T09:00:00+00:00", "watts": 2000},
+            {"period_start": "2024-06-01T08:00:00+00:00", "watts": "1000"},
+            {"period_start": "invalid", "watts": 5},
+            {"watts": 5},
+        ]
+    )
+    assert [(slot.start, slot.end, slot.power) for slot in slots] == [
+        (_hour(8), _hour(9), 1000),
+        (_hour(9), _hour(10), 2000),
+    ]
+    assert parse_forecast(None) == []
+
+
+def test_plan_windows_by_priority() -> None:
+    """Higher priority devices reserve their run first."""
+    forecast = _forecast({8: 1000, 9: 2500, 10: 2500, 11: 2500, 12: 500})
+    forecast.plan(
+        [
+            PlanRequest("heater", 2000, timedelta(hours=2)),
+            PlanRequest("pool", 1000, timedelta(minutes=30)),
+        ],
+        now=_hour(8),
+    )
+    # Heater fits 9-12, so it may start between 9 and 10
+    assert forecast.windows["heater"] == (_hour(9), _hour(10))
+    # Pool fits 8-9 before the heater run
+    assert forecast.windows["pool"] == (_hour(8), _hour(8) + timedelta(minutes=30))
+    assert not forecast.in_start_window("pool", _hour(8) + timedelta(minutes=40))
+    assert forecast.in_start_window("heater", _hour(9) + timedelta(minutes=30))
+
+
+def test_covers() -> None:
+    """Surplus must hold for the whole run, unknown times return None."""
+    forecast = _forecast({8: 3000, 9: 3000, 10: 800}, base_load=500)
+    assert forecast.covers(2000, _hour(8), timedelta(hours=2)) is True
+    assert forecast.covers(2000, _hour(9), timedelta(hours=2)) is False
+    assert forecast.covers(2000, _hour(6), timedelta(hours=1)) is None
@@ -0,0 +1,70 @@
+"""Tests for the Excess Solar device hysteresis."""
+
+from custom_components.aio_energy_management.excess_solar.hysteresis import (
+    STATE_OFF,
+    STATE_ON,
+    STATE_PENDING_OFF,
+    STATE_PENDING_ON,
+    DeviceHysteresis,
+)
+
+
+def test_defaults_grant_at_once() -> None:
+    """Without thresholds and delays every request is granted."""
+    hysteresis = DeviceHysteresis()
+    assert hysteresis.request(True, 0, 100.0) is True
+    hysteresis.sync(True)
+    assert hysteresis.request(False, 0, 100.0) is True
+    hysteresis.sync(False)
+    assert hysteresis.state == STATE_OFF
+    assert hysteresis.writes_avoided == 0
+
+
+def test_turn_on_waits_for_threshold_and_delay() -> None:
+    """The margin must exceed the threshold for the whole delay."""
+    hysteresis = DeviceHysteresis(on_threshold=200, on_delay=30)
+    assert hysteresis.request(True, 100, 0.0) is False
+    assert hysteresis.state == STATE_PENDING_ON
+    assert hysteresis.request(True, 300, 20.0) is False
+    assert hysteresis.request(True, 300, 30.0) is True
+    hysteresis.sync(True)
+    assert hysteresis.state == STATE_ON
+    assert not hysteresis.pending
+
+
+def test_turn_off_waits_for_threshold_and_delay() -> None:
+    """Turning off uses the off threshold and delay."""
+    hysteresis = DeviceHysteresis(on_threshold=500, off_threshold=100, off_delay=10)
+    hysteresis.sync(True)
+    assert hysteresis.request(False, 150, 0.0) is False
+    assert hysteresis.state == STATE_PENDING_OFF
+    assert hysteresis.request(False, 50, 10.0) is False
+    assert hysteresis.request(False, 150, 10.0) is True
+
+
+def test_cancel_counts_writes_avoided() -> None:
+    """A cancelled change keeps the state and counts the flip and flip back."""
+    hysteresis = DeviceHysteresis(on_delay=30, off_delay=30)
+    hysteresis.request(True, 0, 0.0)
+    hysteresis.cancel()
+    assert hysteresis.state == STATE_OFF
+    assert hysteresis.writes_avoided == 2
+
+    hysteresis.sync(True)
+    hysteresis.request(False, 0, 0.0)
+    hysteresis.cancel()
+    assert hysteresis.state == STATE_ON
+    assert hysteresis.writes_avoided == 4
+
+    # Nothing pending, nothing avoided
+    hysteresis.cancel()
+    assert hysteresis.writes_avoided == 4
+
+
+def test_direction_change_restarts_delay() -> None:
+    """Switching from pending on to pending off starts a new delay."""
+    hysteresis = DeviceHysteresis(on_delay=10, off_delay=10)
+    hysteresis.request(True, 0, 0.0)
+    assert hysteresis.request(False, 0, 15.0) is False
+    assert hysteresis.state == STATE_PENDING_OFF
+    assert hysteresis.request(False, 0, 25.0) is True
@@ -2,21 +2,35 @@
 
 from unittest.mock import MagicMock, patch
 
+from custom_components.aio_energy_management.const import COORDINATOR, DOMAIN
+from custom_components.aio_energy_management.coordinator import (
+    EnergyManagementCoordinator,
+)
 from custom_components.aio_energy_management.excess_solar import (
     ExcessSolarBinarySensor,
     ExcessSolarDeviceEnabledSwitch,
     ExcessSolarManager,
     ExcessSolarMasterSwitch,
+    ExcessSolarModulatingBinarySensor,
     build_sensors_from_config,
     create_manager_from_config,
 )
+from custom_components.aio_energy_management.excess_solar.clock import Clock
+from custom_components.aio_energy_management.excess_solar.hysteresis import (
+    STATE_ON,
+    STATE_PENDING_OFF,
+    DeviceHysteresis,
+)
 from custom_components.aio_energy_management.excess_solar.number import (
     ExcessSolarPriorityNumber,
 )
 from freezegun import freeze_time
 from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import mock_restore_cache
 
 from homeassistant.core import HomeAssistant, State
+from homeassistant.setup import async_setup_component
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -44,8 +58,8 @@ def _make_sensor(
     minimum_on_time: int = 0,
     minimum_off_time: int = 0,  # 0 for tests to avoid timing complexity
 ) -> ExcessSolarBinarySensor:
-    """Create a test binary sensor."""
-    return ExcessSolarBinarySensor(
+    """Create a test binary sensor, as if added to Home Assistant."""
+    sensor = ExcessSolarBinarySensor(
         hass=hass,
         device_entity_id=device_entity_id,
         consumption=consumption,
@@ -58,6 +72,8 @@ def _make_sensor(
         minimum_on_time=minimum_on_time,
         minimum_off_time=minimum_off_time,
     )
+    sensor.entity_id = f"binary_sensor.{sensor.unique_id}"
+    return sensor
 
 
 def _make_manager(
@@ -1144,6 +1160,12 @@ async def test_swap_floor_heating_for_water_heater(hass: HomeAssistant) -> None:
     assert water_heater.is_on is True
     assert floor_heating.is_on is False
 
+    decisions = manager.decision_log.entries()
+    assert [d["action"] for d in decisions] == ["activate", "swap"]
+    assert decisions[1]["filtered"] == -2400.0
+    assert decisions[1]["devices"] == [water_heater.name, floor_heating.name]
+    assert decisions[1]["reason"] == "swap"
+
 
 async def test_swap_does_not_happen_when_freed_power_still_insufficient(
     hass: HomeAssistant,
@@ -1210,6 +1232,9 @@ async def test_swap_respects_minimum_on_time_on_active_sensor(
 
     assert water_heater.is_on is False  # swap blocked by minimum_on_time
     assert floor_heating.is_on is True
+    decision = manager.decision_log.entries(limit=1)[0]
+    assert decision["action"] == "none"
+    assert decision["reason"] == "guard_blocked"
 
 
 async def test_swap_respects_is_on_schedule_on_active_sensor(
@@ -1331,3 +1356,799 @@ async def test_swap_does_not_trigger_when_direct_fit(hass: HomeAssistant) -> Non
 
     assert water_heater.is_on is True
     assert floor_heating.is_on is True  # should remain on (not part of a swap)
+
+
+async def test_manager_control_loop_filters_readings(hass: HomeAssistant) -> None:
+    """Filtered grid power is evaluated and reaction latency is recorded."""
+    sensor = _make_sensor(hass, consumption=1000)
+    sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[sensor],
+        buffer=50,
+        evaluation_interval=0,
+        grid_filter="median",
+        filter_window=60,
+    )
+
+    await manager.async_start()
+
+    hass.states.async_set("sensor.grid_power", "-2000")
+    hass.states.async_set("sensor.grid_power", "-2100")
+    await hass.async_block_till_done()
+    assert sensor.is_on is True
+
+    # Transient import spike does not win over the median
+    hass.states.async_set("sensor.grid_power", "800")
+    await hass.async_block_till_done()
+    assert sensor.is_on is True
+
+    info = manager.diagnostic_info
+    assert info["grid_filter"] == "median"
+    assert info["last_grid_power"] == 800
+    assert info["filter_output"] == -2000
+    assert info["reaction_latency"] >= 0
+
+    await manager.async_stop()
+
+
+async def test_manager_knapsack_allocation_converges_in_one_step(
+    hass: HomeAssistant,
+) -> None:
+    """Knapsack mode switches all devices in a single evaluation."""
+    sensors = [
+        _make_sensor(
+            hass,
+            device_entity_id=f"switch.device_{index}",
+            consumption=500,
+            priority=index,
+        )
+        for index in range(1, 9)
+    ]
+    for sensor in sensors:
+        sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=sensors,
+        buffer=50,
+        allocation_mode="knapsack",
+    )
+
+    await manager._async_evaluate(-3100.0)
+    assert [s.is_on for s in sensors] == [True] * 6 + [False] * 2
+
+    # Clouds: importing 1200W, three lowest priority devices off at once
+    await manager._async_evaluate(1200.0)
+    assert [s.is_on for s in sensors] == [True] * 3 + [False] * 5
+    assert manager.diagnostic_info["allocation_mode"] == "knapsack"
+
+
+async def test_manager_fast_shed_on_import_spike(hass: HomeAssistant) -> None:
+    """Large import sheds enough devices immediately, bypassing the timer."""
+    sensors = [
+        _make_sensor(
+            hass,
+            device_entity_id=f"switch.device_{index}",
+            consumption=1000,
+            priority=index,
+            minimum_on_time=10 if index == 4 else 0,
+        )
+        for index in range(1, 5)
+    ]
+    for sensor in sensors:
+        sensor.async_write_ha_state = MagicMock()
+        sensor.activate()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=sensors,
+        buffer=100,
+        fast_shed_threshold=1500,
+    )
+
+    await manager.async_start()
+
+    # Below threshold: waits for the evaluation timer
+    hass.states.async_set("sensor.grid_power", "1000")
+    await hass.async_block_till_done()
+    assert all(s.is_on for s in sensors)
+
+    # Oven starts: 2000W import, device 4 is guarded by minimum on-time
+    hass.states.async_set("sensor.grid_power", "2000")
+    await hass.async_block_till_done()
+    assert [s.is_on for s in sensors] == [True, False, False, True]
+
+    # Shed devices are not yet visible in the next reading, nothing more is shed
+    hass.states.async_set("sensor.grid_power", "2000", force_update=True)
+    await hass.async_block_till_done()
+    assert [s.is_on for s in sensors] == [True, False, False, True]
+    assert manager.diagnostic_info["fast_shed_count"] == 1
+
+    await manager.async_stop()
+
+
+async def test_manager_modulating_device_follows_surplus(hass: HomeAssistant) -> None:
+    """Modulating device absorbs surplus through its setpoint before lower ones."""
+    config = {
+        "sensor": "sensor.grid_power",
+        "power_devices": [
+            {
+                "name": "EV Charger",
+                "consumption": 3680,
+                "priority": 1,
+                "modulating": True,
+                "min_power": 1380,
+                "power_step": 230,
+            },
+            {"name": "Heater", "consumption": 1000, "priority": 2},
+        ],
+    }
+    sensors, _numbers, _switches = build_sensors_from_config(hass, config)
+    charger, heater = sensors
+    assert isinstance(charger, ExcessSolarModulatingBinarySensor)
+    assert charger.setpoint_sensor._attr_unique_id == "excess_solar_ev_charger_setpoint"
+    for sensor in sensors:
+        sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass, grid_sensor="sensor.grid_power", sensors=sensors, buffer=50
+    )
+
+    # Starts at the minimum power
+    await manager._async_evaluate(-2000.0)
+    assert charger.is_on is True
+    assert charger.setpoint == 1380
+    assert heater.is_on is False
+
+    # Remaining surplus is claimed by the charger, heater stays off
+    await manager._async_evaluate(-620.0)
+    assert charger.setpoint == 1610
+    assert charger.setpoint_sensor.native_value == 1610
+    assert heater.is_on is False
+
+    # More surplus than the charger can follow goes to the heater
+    await manager._async_evaluate(-4000.0)
+    assert charger.setpoint == 2530
+    assert heater.is_on is True
+
+    # Importing: setpoint is reduced instead of switching the heater off
+    await manager._async_evaluate(800.0)
+    assert charger.setpoint == 2300
+    assert heater.is_on is True
+    assert manager.diagnostic_info["sensors"][0]["setpoint"] == 2300
+
+    charger.deactivate()
+    assert charger.setpoint == 0
+    assert charger.get_consumption() == 0
+
+
+async def test_manager_reads_device_inputs_from_table(hass: HomeAssistant) -> None:
+    """Consumption and schedule states are tracked, not looked up per evaluation."""
+    _set_state(hass, "sensor.heater_power", "800")
+    _set_state(hass, "binary_sensor.schedule", "off")
+    heater = _make_sensor(
+        hass,
+        device_entity_id="switch.heater",
+        consumption=1000,
+        consumption_entity="sensor.heater_power",
+        priority=1,
+    )
+    floor = _make_sensor(
+        hass,
+        device_entity_id="switch.floor",
+        consumption=500,
+        priority=2,
+        is_on_schedule_entity="binary_sensor.schedule",
+    )
+    for sensor in (heater, floor):
+        sensor.async_write_ha_state = MagicMock()
+    manager = _make_manager(hass, sensors=[heater, floor])
+    await manager.async_start()
+    heater.activate()
+
+    _set_state(hass, "sensor.heater_power", "950")
+    _set_state(hass, "binary_sensor.schedule", "on")
+    await hass.async_block_till_done()
+
+    with patch.object(hass, "states", MagicMock(get=MagicMock(side_effect=KeyError))):
+        assert heater.get_consumption() == 950
+        assert floor.is_on_schedule() is True
+        await manager._async_evaluate(-1000.0)
+        assert floor.is_on is False
+
+    await manager.async_stop()
+    assert heater.inputs is None
+    assert heater.get_consumption() == 950
+
+
+async def test_manager_priority_index_follows_changes(hass: HomeAssistant) -> None:
+    """Priority numbers and on/off changes keep the priority index in order."""
+    config = {
+        "sensor": "sensor.grid_power",
+        "power_devices": [
+            {"name": "Heater", "consumption": 1000, "priority": 1},
+            {"name": "Floor", "consumption": 500, "priority": 2},
+        ],
+    }
+    manager = ExcessSolarManager(
+        hass=hass, grid_sensor="sensor.grid_power", sensors=[], buffer=0
+    )
+    sensors, numbers, _switches = build_sensors_from_config(hass, config, manager)
+    manager.sensors = sensors
+    heater, floor = sensors
+    for entity in (*sensors, *numbers):
+        entity.async_write_ha_state = MagicMock()
+
+    await manager._async_evaluate(-1200.0)
+    assert manager._index.active == [heater]
+    assert manager._index.inactive == [floor]
+
+    await numbers[0].async_set_native_value(3.0)
+    assert manager.sensors == [floor, heater]
+
+    await manager._async_evaluate(200.0)
+    assert heater.is_on is False
+    assert manager._index.inactive == [floor, heater]
+
+
+async def test_manager_priority_index_follows_eligibility(
+    hass: HomeAssistant,
+) -> None:
+    """Enable switch and schedule changes move the sensor in the index."""
+    _set_state(hass, "binary_sensor.schedule", "off")
+    switch = _make_enabled_switch()
+    switch.async_write_ha_state = MagicMock()
+    heater = _make_sensor(
+        hass, device_entity_id="switch.heater", enabled_switch=switch, priority=1
+    )
+    floor = _make_sensor(
+        hass,
+        device_entity_id="switch.floor",
+        is_on_schedule_entity="binary_sensor.schedule",
+        priority=2,
+    )
+    manager = _make_manager(hass, sensors=[heater, floor])
+    await manager.async_start()
+    assert list(manager._index.eligible_inactive()) == [heater, floor]
+
+    await switch.async_turn_off()
+    _set_state(hass, "binary_sensor.schedule", "on")
+    await hass.async_block_till_done()
+    assert list(manager._index.eligible_inactive()) == []
+    assert manager._index.inactive == [heater, floor]
+
+    await switch.async_turn_on()
+    _set_state(hass, "binary_sensor.schedule", "off")
+    await hass.async_block_till_done()
+    assert list(manager._index.eligible_inactive()) == [heater, floor]
+
+    await manager.async_stop()
+
+
+async def test_manager_balances_phases(hass: HomeAssistant) -> None:
+    """Devices must fit their phase, an importing phase sheds its own devices."""
+    _set_state(hass, "sensor.grid_l1", "-1500")
+    _set_state(hass, "sensor.grid_l2", "-200")
+    _set_state(hass, "sensor.grid_l3", "-100")
+    heater = _make_sensor(
+        hass, device_entity_id="switch.heater", consumption=1000, priority=1
+    )
+    heater.phase = "l2"
+    dishwasher = _make_sensor(
+        hass, device_entity_id="switch.dishwasher", consumption=1200, priority=2
+    )
+    dishwasher.phase = "l1"
+    for sensor in (heater, dishwasher):
+        sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[heater, dishwasher],
+        buffer=50,
+        phase_sensors={
+            "l1": "sensor.grid_l1",
+            "l2": "sensor.grid_l2",
+            "l3": "sensor.grid_l3",
+        },
+    )
+    await manager.async_start()
+
+    # 1800W total surplus, but only 200W on the heater's phase
+    await manager._async_evaluate(-1800.0)
+    assert heater.is_on is False
+    assert dishwasher.is_on is True
+
+    # L1 importing while the total is still exporting
+    _set_state(hass, "sensor.grid_l1", "300")
+    _set_state(hass, "sensor.grid_l2", "-500")
+    await hass.async_block_till_done()
+    await manager._async_evaluate(-300.0)
+    assert dishwasher.is_on is False
+
+    phases = manager.diagnostic_info["phases"]
+    assert phases["l1"] == {
+        "sensor": "sensor.grid_l1",
+        "available": -300.0,
+        "active_load": 0.0,
+    }
+    assert manager.diagnostic_info["sensors"][0]["phase"] == "l2"
+    await manager.async_stop()
+
+
+async def test_manager_knapsack_keeps_device_for_phase_limited_swap(
+    hass: HomeAssistant,
+) -> None:
+    """A device is not swapped out for one that does not fit its phase."""
+    _set_state(hass, "sensor.grid_l1", "-500")
+    _set_state(hass, "sensor.grid_l2", "-200")
+    _set_state(hass, "sensor.grid_l3", "-100")
+    heater = _make_sensor(
+        hass, device_entity_id="switch.heater", consumption=1500, priority=1
+    )
+    heater.phase = "l2"
+    pump = _make_sensor(
+        hass, device_entity_id="switch.pump", consumption=1000, priority=2
+    )
+    pump.phase = "l1"
+    for sensor in (heater, pump):
+        sensor.async_write_ha_state = MagicMock()
+    pump.activate()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[heater, pump],
+        buffer=50,
+        allocation_mode="knapsack",
+        phase_sensors={
+            "l1": "sensor.grid_l1",
+            "l2": "sensor.grid_l2",
+            "l3": "sensor.grid_l3",
+        },
+    )
+    await manager.async_start()
+
+    # The heater wins the total surplus with the pump's power, but only 200W
+    # are available on its phase
+    await manager._async_evaluate(-800.0)
+    assert heater.is_on is False
+    assert pump.is_on is True
+    await manager.async_stop()
+
+
+async def test_manager_uses_battery_charging_power(hass: HomeAssistant) -> None:
+    """Surplus the battery takes is available after the target state of charge."""
+    _set_state(hass, "sensor.battery_soc", "60")
+    sensor = _make_sensor(hass, consumption=1500)
+    sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[sensor],
+        buffer=50,
+        evaluation_interval=0,
+        battery_power_sensor="sensor.battery_power",
+        battery_soc_sensor="sensor.battery_soc",
+        battery_soc_target=80,
+    )
+    await manager.async_start()
+
+    _set_state(hass, "sensor.grid_power", "-20")
+    _set_state(hass, "sensor.battery_power", "2000")
+    await hass.async_block_till_done()
+    assert sensor.is_on is False
+
+    # Target reached: the next battery reading gives the charging power away
+    _set_state(hass, "sensor.battery_soc", "85")
+    _set_state(hass, "sensor.battery_power", "1990")
+    await hass.async_block_till_done()
+    assert sensor.is_on is True
+    assert manager.diagnostic_info["battery"]["device_share"] == 1.0
+    await manager.async_stop()
+
+
+@freeze_time("2024-06-01 09:15:00+00:00")
+async def test_manager_starts_in_forecast_window(hass: HomeAssistant) -> None:
+    """Forecast windows start devices early and refuse starts before sunset."""
+    hass.states.async_set(
+        "sensor.solar_forecast",
+        "ok",
+        {
+            "watts": {
+                "2024-06-01T09:00:00+00:00": 3000,
+                "2024-06-01T10:00:00+00:00": 3000,
+                "2024-06-01T11:00:00+00:00": 500,
+            }
+        },
+    )
+    heater = _make_sensor(
+        hass,
+        device_entity_id="switch.heater",
+        consumption=2000,
+        priority=1,
+        minimum_on_time=60,
+    )
+    dryer = _make_sensor(
+        hass,
+        device_entity_id="switch.dryer",
+        consumption=1500,
+        priority=2,
+        minimum_on_time=120,
+    )
+    for sensor in (heater, dryer):
+        sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[heater, dryer],
+        buffer=50,
+        forecast_entity="sensor.solar_forecast",
+    )
+    await manager.async_start()
+
+    # 300W export is far from 2000W, but the heater is in its window
+    await manager._async_evaluate(-300.0)
+    assert heater.is_on is True
+
+    # Dryer would run past 11:00 when the forecast surplus ends
+    await manager._async_evaluate(-2000.0)
+    assert dryer.is_on is False
+
+    forecast = manager.diagnostic_info["forecast"]
+    assert forecast["slots"] == 3
+    assert forecast["windows"]["excess_solar_switch_heater"][0].startswith(
+        "2024-06-01T09:15"
+    )
+    await manager.async_stop()
+
+
+@freeze_time("2024-01-01 12:05:00+00:00")
+async def test_manager_resumes_restored_sensors(hass: HomeAssistant) -> None:
+    """Restored states and guards are used on the first evaluation at start."""
+    heater = _make_sensor(
+        hass, device_entity_id="switch.heater", priority=1, minimum_on_time=10
+    )
+    dryer = _make_sensor(hass, device_entity_id="switch.dryer", priority=2)
+    for sensor in (heater, dryer):
+        sensor.async_write_ha_state = MagicMock()
+    manager = _make_manager(hass, sensors=[heater, dryer])
+
+    last_states = {
+        heater: State(
+            "binary_sensor.excess_solar_heater",
+            "on",
+            {"last_turned_on": "2024-01-01T12:00:00+00:00"},
+        ),
+        dryer: State(
+            "binary_sensor.dryer",
+            "on",
+            {"last_turned_on": "2024-01-01T11:00:00+00:00"},
+        ),
+    }
+    for sensor, last_state in last_states.items():
+        with patch.object(sensor, "async_get_last_state", return_value=last_state):
+            await sensor.async_added_to_hass()
+    assert heater.is_on is True
+    assert heater.can_turn_off() is False  # 5 of 10 minutes run
+
+    # Importing at start: the dryer is shed at once, the heater is guarded
+    _set_state(hass, "sensor.grid_power", "400")
+    await manager.async_start()
+    await hass.async_block_till_done()
+    assert heater.is_on is True
+    assert dryer.is_on is False
+    await manager.async_stop()
+
+
+async def _async_setup_yaml(hass: HomeAssistant, devices: list[dict]) -> None:
+    """Set up excess solar from YAML, the platforms load after the start."""
+    assert await async_setup_component(
+        hass,
+        DOMAIN,
+        {
+            DOMAIN: {
+                "excess_solar": {
+                    "sensor": "sensor.grid",
+                    "evaluation_interval": 0,
+                    "power_devices": devices,
+                }
+            }
+        },
+    )
+    await hass.async_block_till_done()
+
+
+async def test_manager_resumes_after_yaml_platforms(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """The YAML setup resumes once the sensors are added."""
+    _set_state(hass, "sensor.grid", "-3000")
+    await _async_setup_yaml(hass, [{"name": "Heater", "consumption": 1000}])
+
+    assert hass.states.get("binary_sensor.excess_solar_heater").state == "on"
+    assert "NoEntitySpecifiedError" not in caplog.text
+    assert "Task exception was never retrieved" not in caplog.text
+
+
+@freeze_time("2024-01-01 12:05:00+00:00")
+async def test_manager_resumes_restored_yaml_sensors(hass: HomeAssistant) -> None:
+    """The YAML setup resumes from the restored sensor states."""
+    mock_restore_cache(
+        hass,
+        [
+            State(
+                "binary_sensor.excess_solar_heater",
+                "on",
+                {"last_turned_on": "2024-01-01T12:00:00+00:00"},
+            )
+        ],
+    )
+    # Importing at start: the heater is kept on by its minimum on time
+    _set_state(hass, "sensor.grid", "400")
+    await _async_setup_yaml(
+        hass, [{"name": "Heater", "consumption": 1000, "minimum_on_time": 10}]
+    )
+
+    assert hass.states.get("binary_sensor.excess_solar_heater").state == "on"
+
+
+@freeze_time("2024-06-01 12:30:00+00:00")
+async def test_manager_adjusts_surplus_by_price(hass: HomeAssistant) -> None:
+    """Negative prices let devices run on a small import."""
+    coordinator = EnergyManagementCoordinator(hass)
+    hass.data[DOMAIN] = {COORDINATOR: coordinator}
+    sensor = _make_sensor(hass, consumption=1000)
+    sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[sensor],
+        buffer=50,
+        price_source="my_cheapest_hours",
+        price_adjustment=1500,
+    )
+    await manager.async_start()
+
+    # No prices yet: importing 200W is not a surplus
+    await manager._async_evaluate(200.0)
+    assert sensor.is_on is False
+
+    coordinator.data["my_cheapest_hours"] = {
+        "prices": {
+            "mtu": 60,
+            "today": [
+                {
+                    "start": f"2024-06-01T{hour:02}:00:00+00:00",
+                    "end": f"2024-06-01T{hour + 1:02}:00:00+00:00",
+                    "value": -0.3 if hour == 12 else 5.0,
+                }
+                for hour in range(23)
+            ],
+        }
+    }
+    coordinator._async_notify_changed(["my_cheapest_hours"])
+
+    await manager._async_evaluate(200.0)
+    assert sensor.is_on is True
+    assert manager.diagnostic_info["price"]["price"] == -0.3
+    assert manager.diagnostic_info["price"]["adjustment"] == 1500
+    await manager.async_stop()
+
+
+async def test_manager_hysteresis_suppresses_chatter(hass: HomeAssistant) -> None:
+    """A surplus hovering around the consumption doesn't flip the device."""
+
+    class SteppedClock(Clock):
+        seconds = 0.0
+
+        def monotonic(self) -> float:
+            return self.seconds
+
+    clock = SteppedClock()
+    sensor = _make_sensor(hass, consumption=1000)
+    sensor.hysteresis = DeviceHysteresis(on_threshold=200, on_delay=30, off_delay=30)
+    sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[sensor],
+        buffer=50,
+        clock=clock,
+    )
+
+    # Fits, but not by the on threshold
+    await manager._async_evaluate(-1000.0)
+    assert sensor.is_on is False
+    assert manager.decision_log.entries()[-1]["reason"] == "hysteresis"
+
+    # The surplus goes away before the delay: the change is cancelled
+    clock.seconds = 10
+    await manager._async_evaluate(-1300.0)
+    await manager._async_evaluate(0.0)
+    assert sensor.is_on is False
+    assert manager.writes_avoided == 2
+
+    clock.seconds = 20
+    await manager._async_evaluate(-1300.0)
+    clock.seconds = 50
+    await manager._async_evaluate(-1300.0)
+    assert sensor.is_on is True
+    assert sensor.hysteresis.state == STATE_ON
+
+    # Import waits for the off delay
+    await manager._async_evaluate(300.0)
+    assert sensor.is_on is True
+    assert sensor.hysteresis.state == STATE_PENDING_OFF
+    clock.seconds = 80
+    await manager._async_evaluate(300.0)
+    assert sensor.is_on is False
+    assert sensor.async_write_ha_state.call_count == 2
+    assert manager.diagnostic_info["writes_avoided"] == 2
+
+
+async def test_manager_learns_and_stores_consumption(hass: HomeAssistant) -> None:
+    """Estimates are restored from, and saved to, the coordinator store."""
+    coordinator = EnergyManagementCoordinator(hass)
+    hass.data[DOMAIN] = {COORDINATOR: coordinator}
+    heater = _make_sensor(hass, device_entity_id="switch.heater", consumption=2000)
+    pump = _make_sensor(
+        hass,
+        device_entity_id="switch.pump",
+        consumption=800,
+        consumption_entity="sensor.pump_power",
+        priority=2,
+    )
+    await coordinator.async_set_consumption_models(
+        {heater.unique_id: {"watts": 2800, "samples": 4}}
+    )
+    for sensor in (heater, pump):
+        sensor.async_write_ha_state = MagicMock()
+    _set_state(hass, "sensor.pump_power", "650")
+    manager = _make_manager(hass, sensors=[heater, pump])
+    await manager.async_start()
+    assert heater.get_expected_consumption() == 2800
+
+    # 2.5 kW surplus fits the configured, not the learned heater consumption
+    await manager._async_evaluate(-2500.0)
+    assert heater.is_on is False
+    assert pump.is_on is True
+
+    # The pump reports its draw while on
+    for _ in range(3):
+        await manager._async_evaluate(0.0)
+    assert pump.get_expected_consumption() == 650
+
+    await manager.async_stop()
+    stored = coordinator.get_consumption_models()
+    assert stored[heater.unique_id] == {"watts": 2800, "samples": 4}
+    assert stored[pump.unique_id] == {"watts": 650, "samples": 3}
+
+
+async def test_manager_shadow_strategies(hass: HomeAssistant) -> None:
+    """Shadow strategies decide on the same readings without touching entities."""
+    heater = _make_sensor(hass, device_entity_id="switch.heater", consumption=2000)
+    pump = _make_sensor(
+        hass, device_entity_id="switch.pump", consumption=800, priority=2
+    )
+    for sensor in (heater, pump):
+        sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[heater, pump],
+        buffer=50,
+        evaluation_interval=0,
+        shadow_strategies=["knapsack"],
+    )
+    await manager.async_start()
+
+    _set_state(hass, "sensor.grid_power", "-3000")
+    await hass.async_block_till_done()
+    # Live incremental mode turned on one device, the knapsack shadow both
+    assert heater.is_on is True
+    assert pump.is_on is False
+    strategies = manager.diagnostic_info["strategies"]
+    assert strategies["live"]["switches"] == 1
+    assert strategies["knapsack"]["switches"] == 2
+    assert strategies["knapsack"]["active"] == 2
+
+    # The next reading includes the heater: the shadow still sees 3 kW surplus
+    _set_state(hass, "sensor.grid_power", "-1000")
+    await hass.async_block_till_done()
+    assert pump.is_on is True
+    strategies = manager.diagnostic_info["strategies"]
+    assert strategies["live"]["switches"] == 2
+    assert strategies["knapsack"]["switches"] == 2
+    assert strategies["knapsack"]["evaluations"] == 2
+    assert pump.async_write_ha_state.call_count == 1
+    await manager.async_stop()
+
+
+async def test_manager_export_limit(hass: HomeAssistant) -> None:
+    """With an export limit devices only take the export over the limit."""
+    heater = _make_sensor(hass, device_entity_id="switch.heater", consumption=2000)
+    pump = _make_sensor(
+        hass, device_entity_id="switch.pump", consumption=800, priority=2
+    )
+    for sensor in (heater, pump):
+        sensor.async_write_ha_state = MagicMock()
+    manager = ExcessSolarManager(
+        hass=hass,
+        grid_sensor="sensor.grid_power",
+        sensors=[heater, pump],
+        buffer=50,
+        evaluation_interval=0,
+        export_limit=1000,
+    )
+
+    # The surplus would cover the pump, but the export is within the limit
+    await manager._async_evaluate(-1030)
+    assert pump.is_on is False
+    assert manager.decision_log.entries()[-1]["reason"] == "within_buffer"
+
+    # Export over the limit: the heater does not fit, the pump does
+    await manager._async_evaluate(-1500)
+    assert heater.is_on is False
+    assert pump.is_on is True
+    assert manager.decision_log.entries()[-1]["reason"] == "export_limit"
+    assert manager.diagnostic_info["export_limit"]["integral"] == 0
+
+    # Turning the pump off would push the export over the limit
+    await manager._async_evaluate(-700)
+    assert pump.is_on is True
+
+    # Enough headroom under the limit to give the pump's load back
+    await manager._async_evaluate(-100)
+    assert pump.is_on is False
+    assert manager.decision_log.entries()[-1]["action"] == "deactivate"
+    assert manager.decision_log.entries()[-1]["reason"] == "export_limit"
+
+    # Import still sheds as usual
+    pump.activate()
+    await manager._async_evaluate(300)
+    assert pump.is_on is False
+    assert manager.decision_log.entries()[-1]["reason"] == "import"
+
+
+async def test_statistic_sensors(
+    freezer: FrozenDateTimeFactory, hass: HomeAssistant
+) -> None:
+    """Statistic sensors follow the switches and restore their counters."""
+    freezer.move_to("2024-06-01 10:00:00+00:00")
+    config = {
+        "name": "Excess Solar",
+        "power_devices": [{"name": "Heater", "consumption": 2000}],
+    }
+    sensors, _numbers, _switches = build_sensors_from_config(hass, config)
+    heater = sensors[0]
+    heater.async_write_ha_state = MagicMock()
+    on_time, switches, energy = heater.statistic_sensors
+    assert on_time.unique_id == "excess_solar_heater_on_time"
+    assert switches.name == "Excess Solar Heater Switches"
+    assert energy.state_class == "total_increasing"
+    assert energy.native_unit_of_measurement == "kWh"
+
+    last_data = MagicMock(native_value=1.5)
+    with (
+        patch.object(energy, "async_get_last_sensor_data", return_value=last_data),
+        patch.object(energy, "async_get_last_state", return_value=None),
+    ):
+        await energy.async_added_to_hass()
+
+    heater.activate()
+    freezer.tick(5400)
+    assert on_time.native_value == 1.5
+    assert energy.native_value == 4.5
+    heater.deactivate()
+    freezer.tick(3600)
+    assert on_time.native_value == 1.5
+    assert switches.native_value == 2
+    assert switches.extra_state_attributes == {"today": 2, "day": "2024-06-01"}
+
+    manager = _make_manager(hass, sensors=[heater])
+    assert manager.diagnostic_info["sensors"][0]["statistics"] == {
+        "on_time_h": 1.5,
+        "switches": 2,
+        "switches_today": 2,
+        "energy_kwh": 4.5,
+    }
@@ -0,0 +1,45 @@
+"""Tests for the Excess Solar setpoint controller."""
+
+from custom_components.aio_energy_management.excess_solar.modulation import (
+    SetpointController,
+)
+
+
+def test_setpoint_moves_by_gain_and_step() -> None:
+    """Setpoint moves a share of the surplus, rounded to the step."""
+    controller = SetpointController(min_power=1380, max_power=3680, step=230)
+    # 0.5 * 1000 = 500W, rounded down to 460W
+    assert controller.next_setpoint(1380, 1000, elapsed=30) == 1840
+    # Importing 600W: 300W down, rounded towards the previous setpoint
+    assert controller.next_setpoint(1840, -600, elapsed=30) == 1610
+
+
+def test_setpoint_small_error_keeps_setpoint() -> None:
+    """Changes smaller than one step do nothing, avoiding hunting."""
+    controller = SetpointController(min_power=500, max_power=3000, step=100)
+    assert controller.next_setpoint(1000, 150, elapsed=30) == 1000
+    assert controller.next_setpoint(1000, -150, elapsed=30) == 1000
+
+
+def test_setpoint_clamped_to_limits() -> None:
+    """Setpoint stays between the minimum and maximum power."""
+    controller = SetpointController(min_power=500, max_power=3000, step=100)
+    assert controller.next_setpoint(2800, 5000, elapsed=30) == 3000
+    assert controller.next_setpoint(700, -5000, elapsed=30) == 500
+
+
+def test_setpoint_ramp_rate_limits_change() -> None:
+    """Change per second is limited by the ramp rate."""
+    controller = SetpointController(min_power=0, max_power=3000, step=100, ramp_rate=10)
+    # 10 W/s for 30 s = 300W even though the surplus would allow 1000W
+    assert controller.next_setpoint(1000, 2000, elapsed=30) == 1300
+    assert controller.next_setpoint(1000, -2000, elapsed=30) == 700
+
+
+def test_headroom() -> None:
+    """Headroom is the part of the surplus the device can follow."""
+    controller = SetpointController(min_power=500, max_power=3000, step=100)
+    assert controller.headroom(2500, 1000) == 500
+    assert controller.headroom(1000, -800) == -500
+    assert controller.headroom(3000, 1000) == 0
+    assert controller.headroom(1000, 200) == 200
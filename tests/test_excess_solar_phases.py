@@ -0,0 +1,26 @@
+"""Tests for the Excess Solar phase helpers."""
+
+from custom_components.aio_energy_management.excess_solar.phases import (
+    PHASE_ALL,
+    PHASE_L2,
+    fits_phases,
+    phase_loads,
+)
+
+
+def test_phase_loads() -> None:
+    """Three-phase devices are split evenly, single-phase use one phase."""
+    assert phase_loads(PHASE_ALL, 3000) == {"l1": 1000, "l2": 1000, "l3": 1000}
+    assert phase_loads(PHASE_L2, 2000) == {"l2": 2000}
+
+
+def test_fits_phases() -> None:
+    """Loads must fit the surplus of each measured phase."""
+    available = {"l1": 1500, "l2": -200, "l3": 800}
+    assert fits_phases({"l1": 1500}, available, buffer=0)
+    assert not fits_phases({"l2": 100}, available, buffer=0)
+    assert fits_phases({"l2": 100}, available, buffer=300)
+    assert not fits_phases(phase_loads(PHASE_ALL, 3000), available, buffer=0)
+    # Without phase sensors, or for unmeasured phases, nothing is limited
+    assert fits_phases({"l2": 5000}, None, buffer=0)
+    assert fits_phases({"l3": 5000}, {"l1": 0}, buffer=0)
@@ -0,0 +1,58 @@
+"""Tests for the Excess Solar price-aware surplus."""
+
+from datetime import datetime, timedelta
+
+from custom_components.aio_energy_management.excess_solar.prices import (
+    PricePolicy,
+    PriceTable,
+)
+
+
+def _prices(start: str, values: list[float], mtu: int = 60) -> list[dict]:
+    first = datetime.fromisoformat(start)
+    return [
+        {
+            "start": (first + timedelta(minutes=mtu * index)).isoformat(),
+            "end": (first + timedelta(minutes=mtu * (index + 1))).isoformat(),
+            "value": value,
+            "type": "nordpool",
+        }
+        for index, value in enumerate(values)
+    ]
+
+
+def test_price_table_lookup_by_slot() -> None:
+    """Today and tomorrow form one table, the slot is found by index."""
+    table = PriceTable.from_prices(
+        {
+            "mtu": 15,
+            "today": _prices("2024-06-01T23:00:00+00:00", [1.0, 2.0, 3.0, 4.0], 15),
+            "tomorrow": _prices("2024-06-02T00:00:00+00:00", [-0.5], 15),
+        }
+    )
+    assert table is not None
+    assert table.price_at(datetime.fromisoformat("2024-06-01T22:59:00+00:00")) is None
+    assert table.price_at(datetime.fromisoformat("2024-06-01T23:00:00+00:00")) == 1.0
+    assert table.price_at(datetime.fromisoformat("2024-06-01T23:44:59+00:00")) == 3.0
+    assert table.price_at(datetime.fromisoformat("2024-06-02T02:40:00+03:00")) == 3.0
+    assert table.price_at(datetime.fromisoformat("2024-06-02T00:14:00+00:00")) == -0.5
+    assert table.price_at(datetime.fromisoformat("2024-06-02T00:15:00+00:00")) is None
+    assert table.end == datetime.fromisoformat("2024-06-02T00:15:00+00:00")
+
+
+def test_price_table_without_prices() -> None:
+    """Missing or unparsable prices give no table."""
+    assert PriceTable.from_prices(None) is None
+    assert PriceTable.from_prices({"today": [], "tomorrow": []}) is None
+    assert PriceTable.from_prices({"today": [{"start": "x", "value": 1}]}) is None
+
+
+def test_price_policy() -> None:
+    """Low prices add to the surplus, high prices take from it."""
+    policy = PricePolicy(low=0.0, high=20.0, adjustment=500)
+    assert policy.surplus_adjustment(None) == 0
+    assert policy.surplus_adjustment(-1.2) == 500
+    assert policy.surplus_adjustment(0.0) == 500
+    assert policy.surplus_adjustment(10.0) == 0
+    assert policy.surplus_adjustment(25.0) == -500
+    assert PricePolicy().surplus_adjustment(25.0) == 0
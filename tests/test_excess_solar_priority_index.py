@@ -0,0 +1,121 @@
+"""Tests for the Excess Solar priority index."""
+
+from custom_components.aio_energy_management.excess_solar.priority_index import (
+    PriorityIndex,
+)
+
+
+class _Sensor:
+    def __init__(self, name: str, priority: int, is_on: bool = False) -> None:
+        self.name = name
+        self.priority = priority
+        self.is_on = is_on
+        self.enabled = True
+        self.on_schedule = False
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+    def is_on_schedule(self) -> bool:
+        return self.on_schedule
+
+
+def _names(sensors: list[_Sensor]) -> list[str]:
+    return [sensor.name for sensor in sensors]
+
+
+def test_index_orders_by_priority_and_state() -> None:
+    """Sensors are split to active and inactive, both sorted by priority."""
+    a = _Sensor("a", 3)
+    b = _Sensor("b", 1, is_on=True)
+    c = _Sensor("c", 2)
+    d = _Sensor("d", 2, is_on=True)
+    index = PriorityIndex([a, b, c, d])
+
+    assert _names(index.sensors) == ["b", "c", "d", "a"]
+    assert _names(index.active) == ["b", "d"]
+    assert _names(index.inactive) == ["c", "a"]
+
+
+def test_index_update_moves_single_sensor() -> None:
+    """State and priority changes move the sensor, ties keep configuration order."""
+    a = _Sensor("a", 1)
+    b = _Sensor("b", 2)
+    c = _Sensor("c", 2)
+    index = PriorityIndex([a, b, c])
+
+    c.is_on = True
+    index.update(c)
+    assert _names(index.active) == ["c"]
+    assert _names(index.inactive) == ["a", "b"]
+
+    a.priority = 2
+    index.update(a)
+    assert _names(index.sensors) == ["a", "b", "c"]
+
+    b.priority = 1
+    index.refresh()
+    assert _names(index.sensors) == ["b", "a", "c"]
+    assert _names(index.inactive) == ["b", "a"]
+
+
+def test_index_ignores_unknown_sensor() -> None:
+    """Updating a sensor that is not indexed does nothing."""
+    index = PriorityIndex([_Sensor("a", 1)])
+    index.update(_Sensor("b", 1, is_on=True))
+    assert _names(index.sensors) == ["a"]
+    assert index.active == []
+
+
+def test_index_tracks_eligibility() -> None:
+    """Disabled and scheduled sensors are not eligible, schedule blocks shedding."""
+    a = _Sensor("a", 1)
+    b = _Sensor("b", 2)
+    c = _Sensor("c", 3, is_on=True)
+    d = _Sensor("d", 4, is_on=True)
+    index = PriorityIndex([a, b, c, d])
+    assert _names(index.eligible_inactive()) == ["a", "b"]
+    assert _names(index.eligible_active(lowest_first=True)) == ["d", "c"]
+
+    a.enabled = False
+    index.update(a)
+    d.on_schedule = True
+    index.update(d)
+    assert _names(index.eligible_inactive()) == ["b"]
+    assert _names(index.eligible_active(lowest_first=True)) == ["c"]
+    assert _names(index.inactive) == ["a", "b"]
+    assert _names(index.active) == ["c", "d"]
+
+    # A disabled sensor that is on may still be shed
+    c.enabled = False
+    index.update(c)
+    assert _names(index.eligible_active()) == ["c"]
+
+    a.enabled = True
+    a.priority = 5
+    index.update(a)
+    assert _names(index.eligible_inactive()) == ["b", "a"]
+    assert _names(index.sensors) == ["b", "c", "d", "a"]
+
+
+def test_index_keeps_order_over_many_updates() -> None:
+    """Sets stay sorted through many moves."""
+    sensors = [_Sensor(str(n), (n * 7) % 10) for n in range(50)]
+    index = PriorityIndex(sensors)
+    for step in range(200):
+        sensor = sensors[(step * 13) % 50]
+        sensor.is_on = not sensor.is_on
+        sensor.priority = (sensor.priority + step) % 10
+        index.update(sensor)
+
+    def expected(selected: list[_Sensor]) -> list[str]:
+        return _names(sorted(selected, key=lambda s: (s.priority, sensors.index(s))))
+
+    assert _names(index.sensors) == expected(sensors)
+    assert _names(index.active) == expected([s for s in sensors if s.is_on])
+    assert _names(index.eligible_inactive()) == expected(
+        [s for s in sensors if not s.is_on]
+    )
+    assert _names(index.eligible_active(lowest_first=True)) == list(
+        reversed(expected([s for s in sensors if s.is_on]))
+    )
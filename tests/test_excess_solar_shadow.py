@@ -0,0 +1,80 @@
+"""Tests for the Excess Solar shadow strategies."""
+
+from custom_components.aio_energy_management.excess_solar.shadow import (
+    ShadowDevice,
+    StrategyStats,
+    create_shadow,
+)
+import pytest
+
+
+def _devices() -> list[ShadowDevice]:
+    return [
+        ShadowDevice("heater", 1, 2000, True, 0, 0),
+        ShadowDevice("pump", 2, 800, True, 0, 0),
+        ShadowDevice("dryer", 3, 1000, False, 0, 0),
+    ]
+
+
+def test_create_shadow() -> None:
+    """A strategy changes the allocation mode or the filter of the live one."""
+    knapsack = create_shadow("knapsack", "incremental", "median", 60, 100)
+    assert (knapsack.allocation_mode, knapsack.grid_filter) == ("knapsack", "median")
+    ema = create_shadow("ema", "incremental", "median", 60, 100)
+    assert (ema.allocation_mode, ema.grid_filter) == ("incremental", "ema")
+    with pytest.raises(ValueError):
+        create_shadow("greedy")
+
+
+def test_incremental_shadow_steps_one_device() -> None:
+    """The incremental shadow turns on one device per evaluation."""
+    shadow = create_shadow("incremental", buffer=100)
+    shadow.add(-3000.0, 0.0)
+    shadow.evaluate(_devices(), 3000.0, 0.0)
+    assert shadow.active == {"heater"}
+    shadow.evaluate(_devices(), 3000.0, 30.0)
+    assert shadow.active == {"heater", "pump"}
+    # Ineligible devices are never turned on
+    shadow.evaluate(_devices(), 3000.0, 60.0)
+    assert shadow.active == {"heater", "pump"}
+
+    # Import sheds the lowest priority device
+    shadow.add(-2000.0, 90.0)
+    shadow.evaluate(_devices(), 2000.0, 90.0)
+    assert shadow.active == {"heater"}
+    assert shadow.stats.switches == 3
+    assert shadow.stats.evaluations == 4
+
+
+def test_knapsack_shadow_plans_all_devices() -> None:
+    """The knapsack shadow reaches the target set at once."""
+    shadow = create_shadow("knapsack", buffer=100)
+    shadow.add(-3000.0, 0.0)
+    shadow.evaluate(_devices(), 3000.0, 0.0)
+    assert shadow.active == {"heater", "pump"}
+    assert shadow.as_dict()["active"] == 2
+
+
+def test_shadow_respects_minimum_times() -> None:
+    """A device the shadow turned on stays on for its minimum on-time."""
+    devices = [ShadowDevice("heater", 1, 2000, True, 600, 0)]
+    shadow = create_shadow("incremental")
+    shadow.add(-2500.0, 0.0)
+    shadow.evaluate(devices, 2500.0, 0.0)
+    shadow.add(500.0, 10.0)
+    shadow.evaluate(devices, 0.0, 30.0)
+    assert shadow.active == {"heater"}
+    shadow.evaluate(devices, 0.0, 600.0)
+    assert shadow.active == set()
+
+
+def test_strategy_stats_self_consumption() -> None:
+    """Self-consumption is the share of the surplus used by the devices."""
+    stats = StrategyStats()
+    assert stats.self_consumption is None
+    stats.account(2000, 0, 0.0)
+    stats.account(2000, 1000, 1800.0)  # 1 kWh surplus, 0.5 kWh used
+    stats.account(-500, 1000, 3600.0)  # importing: no surplus
+    assert stats.surplus_energy == 1000
+    assert stats.self_consumed_energy == 500
+    assert stats.as_dict()["self_consumption"] == 0.5
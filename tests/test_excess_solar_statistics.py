@@ -0,0 +1,72 @@
+"""Tests for the Excess Solar device statistics."""
+
+from datetime import datetime, timedelta
+
+from custom_components.aio_energy_management.excess_solar.statistics import (
+    STATISTIC_ENERGY,
+    STATISTIC_ON_TIME,
+    STATISTIC_SWITCHES,
+    DeviceStatistics,
+)
+
+import homeassistant.util.dt as dt_util
+
+START = datetime(2024, 6, 1, 10, 0, tzinfo=dt_util.UTC)
+
+
+def test_counts_finished_and_running_periods() -> None:
+    """On-time and energy include the running period when read."""
+    statistics = DeviceStatistics()
+    statistics.switched(True, 2000, START)
+    now = START + timedelta(minutes=30)
+    assert statistics.value(STATISTIC_ON_TIME, now) == 0.5
+    assert statistics.value(STATISTIC_ENERGY, now) == 1.0
+
+    statistics.switched(False, 0, START + timedelta(hours=1))
+    later = START + timedelta(hours=3)
+    assert statistics.value(STATISTIC_ON_TIME, later) == 1.0
+    assert statistics.value(STATISTIC_ENERGY, later) == 2.0
+    assert statistics.value(STATISTIC_SWITCHES, later) == 2
+
+
+def test_power_change_while_on() -> None:
+    """A new power closes the running period at the old power."""
+    statistics = DeviceStatistics()
+    statistics.switched(True, 1000, START)
+    statistics.update(True, 3000, START + timedelta(hours=1))
+    assert statistics.value(STATISTIC_ENERGY, START + timedelta(hours=2)) == 4.0
+    assert statistics.switches == 1
+
+
+def test_daily_switches_reset_at_midnight() -> None:
+    """The switches of the day start over on a new local day."""
+    statistics = DeviceStatistics()
+    statistics.switched(True, 1000, START)
+    statistics.switched(False, 0, START + timedelta(hours=1))
+    assert statistics.daily_switches(START + timedelta(hours=2)) == 2
+    tomorrow = START + timedelta(days=1)
+    assert statistics.daily_switches(tomorrow) == 0
+    statistics.switched(True, 1000, tomorrow)
+    assert statistics.daily_switches(tomorrow) == 1
+    assert statistics.switches == 3
+
+
+def test_restore() -> None:
+    """Restored sensor values continue the counters, invalid ones are ignored."""
+    statistics = DeviceStatistics()
+    statistics.restore(STATISTIC_ON_TIME, "2.5")
+    statistics.restore(STATISTIC_SWITCHES, 12)
+    statistics.restore(STATISTIC_ENERGY, 4.2)
+    statistics.restore(STATISTIC_ENERGY, "unknown")
+    statistics.restore(STATISTIC_SWITCHES, -1)
+    statistics.restore_day("2024-06-01", 5)
+    assert statistics.as_dict(START) == {
+        "on_time_h": 2.5,
+        "switches": 12,
+        "switches_today": 5,
+        "energy_kwh": 4.2,
+    }
+
+    statistics.restore_day("not a day", 3)
+    assert statistics.day is None
+    assert statistics.daily_switches(START) == 0
@@ -0,0 +1,97 @@
+"""Tests for iCalendar export."""
+
+from datetime import datetime, timedelta
+from http import HTTPStatus
+import zoneinfo
+
+from custom_components.aio_energy_management.coordinator import (
+    EnergyManagementCoordinator,
+)
+from custom_components.aio_energy_management.ics import (
+    ICS_URL,
+    EnergyManagementIcsView,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+TZINFO = zoneinfo.ZoneInfo(key="Europe/Helsinki")
+
+
+def _slot(day: int, hour: int, hours: int = 1) -> dict:
+    start = datetime(2025, 3, day, hour, 0, tzinfo=TZINFO)
+    return {"start": start, "end": start + timedelta(hours=hours)}
+
+
+async def test_ics_export(hass: HomeAssistant, hass_client) -> None:
+    """Test schedules are exported as iCalendar feed with ETag."""
+    assert await async_setup_component(hass, "http", {})
+    coordinator = EnergyManagementCoordinator(hass)
+    hass.http.register_view(EnergyManagementIcsView(coordinator))
+
+    await coordinator.async_set_data(
+        "sensor_a",
+        "Heater; cheap, hours",
+        True,
+        "Test",
+        {"list": [_slot(14, 3, 3)], "next": {"list": [_slot(15, 2)]}},
+        None,
+    )
+    await coordinator.async_set_data(
+        "sensor_b", "B", False, "Test", {"list": [_slot(14, 12)]}, None
+    )
+    client = await hass_client()
+
+    resp = await client.get(ICS_URL)
+    assert resp.status == HTTPStatus.OK
+    assert resp.content_type == "text/calendar"
+    body = await resp.text()
+    lines = body.split("\r\n")
+    assert lines[0] == "BEGIN:VCALENDAR"
+    assert lines[-2] == "END:VCALENDAR"
+    assert lines.count("BEGIN:VEVENT") == 2
+    assert r"SUMMARY:Heater\; cheap\, hours" in lines
+    assert "DTSTART:20250314T010000Z" in lines
+    assert "DTEND:20250315T010000Z" in lines
+    assert "UID:sensor_b_20250314T100000Z_20250314T110000Z" not in lines
+    etag = resp.headers["ETag"]
+
+    # Unchanged data, not modified
+    resp = await client.get(ICS_URL, headers={"If-None-Match": etag})
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["ETag"] == etag
+
+    # Filtered feed has its own ETag and includes entities hidden from calendar
+    resp = await client.get(ICS_URL, params={"entity_id": "sensor_b"})
+    body = await resp.text()
+    assert resp.headers["ETag"] != etag
+    assert "UID:sensor_b_20250314T100000Z_20250314T110000Z" in body.split("\r\n")
+    filtered_etag = resp.headers["ETag"]
+
+    # Changed data invalidates the ETag
+    await coordinator.async_set_data(
+        "sensor_a", "A", True, "Test", {"list": [_slot(14, 4)]}, None
+    )
+    resp = await client.get(ICS_URL, headers={"If-None-Match": etag})
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["ETag"] != etag
+
+    # A change of another entity does not invalidate the filtered feed
+    resp = await client.get(
+        ICS_URL,
+        params={"entity_id": "sensor_b"},
+        headers={"If-None-Match": filtered_etag},
+    )
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["ETag"] == filtered_etag
+
+    await coordinator.async_set_data(
+        "sensor_b", "B", False, "Test", {"list": [_slot(14, 13)]}, None
+    )
+    resp = await client.get(
+        ICS_URL,
+        params={"entity_id": "sensor_b"},
+        headers={"If-None-Match": filtered_etag},
+    )
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["ETag"] != filtered_etag